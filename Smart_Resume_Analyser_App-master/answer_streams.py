@@ -0,0 +1,64 @@
+"""
+Answer Stream Registry
+Keeps per-answer streaming state (keyed by session and question) between
+requests while the candidate is still answering
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+class AnswerStreamRegistry:
+    """
+    Thread-safe map of (session_id, question_number) -> stream object.
+
+    Streams are created by `factory` on first use and expire after
+    `ttl_seconds` without updates, so abandoned answers don't pile up.
+    Stream objects must expose an `updated_at` timestamp.
+    """
+
+    def __init__(self, factory: Callable[[], object], ttl_seconds: float = 900, max_streams: int = 1000):
+        self.factory = factory
+        self.ttl_seconds = ttl_seconds
+        self.max_streams = max_streams
+        self._streams: Dict[Tuple[Hashable, Hashable], object] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(session_id, question_number) -> Tuple[str, str]:
+        return str(session_id), str(question_number)
+
+    def _evict(self):
+        """Drop expired streams, then the least recently updated ones over the cap"""
+        now = time.time()
+        expired = [k for k, stream in self._streams.items() if now - stream.updated_at > self.ttl_seconds]
+        for k in expired:
+            del self._streams[k]
+        overflow = len(self._streams) - self.max_streams + 1
+        if overflow > 0:
+            oldest = sorted(self._streams, key=lambda k: self._streams[k].updated_at)[:overflow]
+            for k in oldest:
+                del self._streams[k]
+
+    def get_or_create(self, session_id, question_number):
+        key = self.key(session_id, question_number)
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                self._evict()
+                stream = self.factory()
+                self._streams[key] = stream
+            return stream
+
+    def get(self, session_id, question_number) -> Optional[object]:
+        with self._lock:
+            return self._streams.get(self.key(session_id, question_number))
+
+    def pop(self, session_id, question_number) -> Optional[object]:
+        with self._lock:
+            return self._streams.pop(self.key(session_id, question_number), None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._streams)
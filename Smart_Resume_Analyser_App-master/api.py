@@ -2,32 +2,162 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
 import re
+import string
 import time
-from pdfminer.high_level import extract_text
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTTextContainer
 import random
 from Courses import ds_course, web_course, android_course, ios_course, uiux_course
-import google.generativeai as genai
 from config import GEMINI_API_KEY, NUM_QUESTIONS, DIFFICULTY_MAPPING, GEMINI_MODEL, TEMPERATURE
+from config import (
+    QUESTION_MAX_OUTPUT_TOKENS,
+    SCORING_TEMPERATURE,
+    SCORING_MAX_OUTPUT_TOKENS,
+    SCORING_STOP_SEQUENCES,
+    LOCAL_SCORER_ENABLED,
+    LOCAL_SCORER_MIN_CONFIDENCE,
+    LOCAL_SCORER_SHORT_ANSWER_WORDS,
+    LOCAL_SCORER_STRONG_ANSWER_WORDS,
+    RESUME_DEADLINE_SECONDS,
+    RESUME_DEADLINE_MAX_SECONDS,
+    DEADLINE_HEADER,
+    GEMINI_MIN_BUDGET_SECONDS,
+    RESUME_STAGE_RESERVE_SECONDS,
+    MODEL_BACKEND,
+    MODEL_BACKEND_URL,
+    SENTIMENT_BATCH_WORKERS,
+    SENTIMENT_BATCH_CHUNK_SIZE,
+    ANSWER_STREAM_TTL_SECONDS,
+    SENTIMENT_BACKEND,
+    FRAME_WORKERS,
+    FRAME_DECODE_REDUCTION,
+    FACE_KEYFRAME_INTERVAL,
+    FACE_TRACK_MARGIN,
+    FACE_DETECT_WIDTH,
+    FACE_DETECT_SCALE_FACTOR,
+    FACE_MIN_SIZE_RATIO,
+    EMOTION_MODEL_VARIANT,
+    ORT_GRAPH_OPTIMIZATION,
+    ORT_EXECUTION_MODE,
+    ORT_INTRA_OP_THREADS,
+    ORT_INTER_OP_THREADS,
+    MODEL_ARTIFACT_DIR,
+    MODEL_OFFLINE,
+    MODEL_DOWNLOAD_TIMEOUT_SECONDS,
+    FER_MODEL_SHA256,
+    EMOTION_WARMUP_BATCH,
+    FRAME_DEDUPE_DISTANCE,
+    EMOTION_CONVERGENCE_TOLERANCE,
+    EMOTION_CONVERGENCE_MIN_FRAMES,
+    EMOTION_CONVERGENCE_STEP,
+    EMOTION_BATCH_MAX_WAIT_MS,
+    EMOTION_BATCH_MAX_SIZE,
+    CLIP_MAX_KEYFRAMES,
+    CLIP_MAX_DECODED_FRAMES,
+    CLIP_MAX_BYTES,
+    CLIP_MAX_SECONDS,
+    CLIP_MJPEG_FPS,
+    CLIP_MOTION_THRESHOLD,
+    CLIP_SCENE_THRESHOLD,
+    CLIP_MIN_KEYFRAME_GAP_SECONDS,
+    CLIP_MAX_KEYFRAME_GAP_SECONDS,
+    FACE_DETECTOR_BACKEND,
+    FACE_LBP_CASCADE_PATH,
+    FACE_DNN_PROTOTXT_PATH,
+    FACE_DNN_MODEL_PATH,
+    FACE_DNN_CONFIDENCE
+)
+import atexit
+import functools
+import threading
 import uuid
 from datetime import datetime
 from sentiment_emotion_analyzer import (
     SentimentAnalyzer, 
+    StreamingSentiment,
+    StreamingEmotion,
     FacialExpressionAnalyzer, 
     calculate_combined_score,
     TEXTBLOB_AVAILABLE,
     VADER_AVAILABLE,
-    OPENCV_AVAILABLE
+    OPENCV_AVAILABLE,
+    FER_MODEL_FILENAME
 )
+from content_scorer import LocalContentScorer
+from deadline import Deadline
+from question_bank import question_bank
+from model_backends import GeminiBackend, HttpModelBackend
+from answer_streams import AnswerStreamRegistry
+from frame_upload import FrameUploadError, parse_face_hints, parse_frame_request
+from model_artifacts import ModelArtifactCache
+from video_clip import ClipTooLargeError, VideoClipError, extract_keyframes
 
 app = Flask(__name__)
 CORS(app)
 
 # Initialize sentiment and emotion analyzers
-sentiment_analyzer = SentimentAnalyzer()
-emotion_analyzer = FacialExpressionAnalyzer()
+sentiment_analyzer = SentimentAnalyzer(backend=SENTIMENT_BACKEND, batch_workers=SENTIMENT_BATCH_WORKERS or None)
+atexit.register(sentiment_analyzer.shutdown)
+# Set by init_services(); loading it fetches and warms up the FER+ model
+emotion_analyzer = None
+
+
+def create_emotion_analyzer():
+    """FacialExpressionAnalyzer built from config, with its model loaded"""
+    analyzer = FacialExpressionAnalyzer(
+        frame_workers=FRAME_WORKERS or None,
+        decode_reduction=FRAME_DECODE_REDUCTION,
+        keyframe_interval=FACE_KEYFRAME_INTERVAL,
+        track_margin=FACE_TRACK_MARGIN,
+        detect_width=FACE_DETECT_WIDTH,
+        detect_scale_factor=FACE_DETECT_SCALE_FACTOR,
+        min_face_ratio=FACE_MIN_SIZE_RATIO,
+        model_variant=EMOTION_MODEL_VARIANT,
+        session_config={
+            'graph_optimization': ORT_GRAPH_OPTIMIZATION,
+            'execution_mode': ORT_EXECUTION_MODE,
+            'intra_op_threads': ORT_INTRA_OP_THREADS,
+            'inter_op_threads': ORT_INTER_OP_THREADS
+        },
+        artifact_cache=ModelArtifactCache(
+            MODEL_ARTIFACT_DIR,
+            offline=MODEL_OFFLINE,
+            download_timeout=MODEL_DOWNLOAD_TIMEOUT_SECONDS,
+            pinned_checksums={FER_MODEL_FILENAME: FER_MODEL_SHA256}
+        ),
+        dedupe_distance=FRAME_DEDUPE_DISTANCE,
+        convergence_tolerance=EMOTION_CONVERGENCE_TOLERANCE,
+        convergence_min_frames=EMOTION_CONVERGENCE_MIN_FRAMES,
+        convergence_step=EMOTION_CONVERGENCE_STEP,
+        batch_max_wait_ms=EMOTION_BATCH_MAX_WAIT_MS,
+        batch_max_size=EMOTION_BATCH_MAX_SIZE,
+        detector_backend=FACE_DETECTOR_BACKEND,
+        detector_config={
+            'lbp_cascade_path': FACE_LBP_CASCADE_PATH,
+            'dnn_prototxt_path': FACE_DNN_PROTOTXT_PATH,
+            'dnn_model_path': FACE_DNN_MODEL_PATH,
+            'dnn_confidence': FACE_DNN_CONFIDENCE
+        }
+    )
+    # Pay onnxruntime's lazy initialization at boot, not on the first request
+    if EMOTION_WARMUP_BATCH:
+        analyzer.warm_up(EMOTION_WARMUP_BATCH)
+    return analyzer
 
-# Configure Gemini AI
-genai.configure(api_key=GEMINI_API_KEY)
+
+transcript_streams = AnswerStreamRegistry(
+    lambda: StreamingSentiment(sentiment_analyzer),
+    ttl_seconds=ANSWER_STREAM_TTL_SECONDS
+)
+frame_streams = AnswerStreamRegistry(
+    lambda: StreamingEmotion(emotion_analyzer),
+    ttl_seconds=ANSWER_STREAM_TTL_SECONDS
+)
+content_scorer = LocalContentScorer(
+    min_confidence=LOCAL_SCORER_MIN_CONFIDENCE,
+    short_answer_words=LOCAL_SCORER_SHORT_ANSWER_WORDS,
+    strong_answer_words=LOCAL_SCORER_STRONG_ANSWER_WORDS
+)
 
 # Safety settings to prevent blocking
 safety_settings = [
@@ -49,137 +179,186 @@ safety_settings = [
     },
 ]
 
-model = genai.GenerativeModel(
-    GEMINI_MODEL,
-    generation_config={
+# Per-task generation profiles. Question generation wants variety while answer
+# scoring wants three short, repeatable lines, so each task gets its own model.
+MODEL_PROFILES = {
+    "questions": {
         "temperature": TEMPERATURE,
         "top_p": 0.95,
         "top_k": 40,
-        "max_output_tokens": 2048,
+        "max_output_tokens": QUESTION_MAX_OUTPUT_TOKENS,
     },
-    safety_settings=safety_settings
-)
+    "scoring": {
+        "temperature": SCORING_TEMPERATURE,
+        "top_p": 0.9,
+        "top_k": 20,
+        "max_output_tokens": SCORING_MAX_OUTPUT_TOKENS,
+        "stop_sequences": SCORING_STOP_SEQUENCES,
+    },
+}
+
+if MODEL_BACKEND == 'http':
+    model_backend = HttpModelBackend(MODEL_BACKEND_URL, MODEL_PROFILES)
+else:
+    model_backend = GeminiBackend(GEMINI_API_KEY, GEMINI_MODEL, MODEL_PROFILES, safety_settings)
+print(f"✅ Model backend: {model_backend.name}")
+
+# Token accounting per task (filled by _generate_for_task)
+model_usage = {
+    task: {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "total_seconds": 0.0}
+    for task in MODEL_PROFILES
+}
+model_usage_lock = threading.Lock()
+
+# Static prompt overhead per template, measured with count_tokens on first use
+template_token_counts = {}
 
 # Initialize database connection globally
 db_connection = None
 db_cursor = None
+# The pymysql connection isn't thread-safe; with threaded workers, views that
+# use it hold this lock for the whole request (see uses_db)
+db_lock = threading.RLock()
 
-try:
-    import pymysql
-    # Get database credentials from environment variables (for production) or use defaults (for local)
-    DB_HOST = os.environ.get('DB_HOST', 'localhost')
-    DB_USER = os.environ.get('DB_USER', 'root')
-    DB_PASSWORD = os.environ.get('DB_PASSWORD', '')
-    DB_NAME = os.environ.get('DB_NAME', 'sra')
-    DB_PORT = int(os.environ.get('DB_PORT', '3306'))
-    
-    # Connect to database
-    db_connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        port=DB_PORT,
-        charset='utf8mb4'
-    )
-    db_cursor = db_connection.cursor()
-    
-    # Create database if not exists (only if using localhost, cloud DBs usually pre-create)
-    if DB_HOST == 'localhost':
-        db_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME};")
-    
-    db_connection.select_db(DB_NAME)
-    
-    # Create interview_sessions table
-    session_table_sql = """
-    CREATE TABLE IF NOT EXISTS interview_sessions (
-        session_id VARCHAR(50) PRIMARY KEY,
-        user_name VARCHAR(100),
-        user_email VARCHAR(100),
-        resume_field VARCHAR(50),
-        experience_level VARCHAR(20),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    """
-    db_cursor.execute(session_table_sql)
-    
-    # Create interview_answers table
-    answers_table_sql = """
-    CREATE TABLE IF NOT EXISTS interview_answers (
-        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-        session_id VARCHAR(50) NOT NULL,
-        question_number INT NOT NULL,
-        question_text TEXT NOT NULL,
-        answer_text TEXT,
-        audio_filename VARCHAR(255),
-        feedback_score DECIMAL(3,1) DEFAULT NULL,
-        feedback_good TEXT,
-        feedback_improve TEXT,
-        content_score DECIMAL(3,1) DEFAULT NULL,
-        sentiment_score DECIMAL(3,1) DEFAULT NULL,
-        emotion_score DECIMAL(3,1) DEFAULT NULL,
-        sentiment_data JSON,
-        emotion_data JSON,
-        answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (session_id) REFERENCES interview_sessions(session_id)
-    );
-    """
-    db_cursor.execute(answers_table_sql)
-    
-    # Try to add new columns if table already exists (for backward compatibility)
-    # Update feedback_score to DECIMAL if it's INT
-    try:
-        db_cursor.execute("ALTER TABLE interview_answers MODIFY COLUMN feedback_score DECIMAL(3,1) DEFAULT NULL")
-    except:
-        pass  # Column might not exist or already correct type
-    
-    try:
-        db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN content_score DECIMAL(3,1) DEFAULT NULL")
-    except:
-        pass  # Column already exists
-    
-    try:
-        db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN sentiment_score DECIMAL(3,1) DEFAULT NULL")
-    except:
-        pass
-    
-    try:
-        db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN emotion_score DECIMAL(3,1) DEFAULT NULL")
-    except:
-        pass
-    
-    try:
-        db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN sentiment_data JSON")
-    except:
-        pass
-    
+
+def uses_db(view):
+    """Serialize a view's use of the shared database connection"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with db_lock:
+            return view(*args, **kwargs)
+    return wrapper
+
+
+# Get database credentials from environment variables (for production) or use defaults (for local)
+DB_HOST = os.environ.get('DB_HOST', 'localhost')
+DB_USER = os.environ.get('DB_USER', 'root')
+DB_PASSWORD = os.environ.get('DB_PASSWORD', '')
+DB_NAME = os.environ.get('DB_NAME', 'sra')
+DB_PORT = int(os.environ.get('DB_PORT', '3306'))
+
+
+def connect_database():
+    """Connect to MySQL and create the tables if needed (db_connection stays None on failure)"""
+    global db_connection, db_cursor
     try:
-        db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN emotion_data JSON")
-    except:
-        pass
-    
-    db_connection.commit()
-    print("✅ Database tables created successfully")
-    
-except Exception as e:
-    print(f"❌ Database setup error: {e}")
-    db_connection = None
-    db_cursor = None
+        import pymysql
+        # Connect to database
+        db_connection = pymysql.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            port=DB_PORT,
+            charset='utf8mb4'
+        )
+        db_cursor = db_connection.cursor()
+        
+        # Create database if not exists (only if using localhost, cloud DBs usually pre-create)
+        if DB_HOST == 'localhost':
+            db_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME};")
+        
+        db_connection.select_db(DB_NAME)
+        
+        # Create interview_sessions table
+        session_table_sql = """
+        CREATE TABLE IF NOT EXISTS interview_sessions (
+            session_id VARCHAR(50) PRIMARY KEY,
+            user_name VARCHAR(100),
+            user_email VARCHAR(100),
+            resume_field VARCHAR(50),
+            experience_level VARCHAR(20),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+        db_cursor.execute(session_table_sql)
+        
+        # Create interview_answers table
+        answers_table_sql = """
+        CREATE TABLE IF NOT EXISTS interview_answers (
+            id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            session_id VARCHAR(50) NOT NULL,
+            question_number INT NOT NULL,
+            question_text TEXT NOT NULL,
+            answer_text TEXT,
+            audio_filename VARCHAR(255),
+            feedback_score DECIMAL(3,1) DEFAULT NULL,
+            feedback_good TEXT,
+            feedback_improve TEXT,
+            content_score DECIMAL(3,1) DEFAULT NULL,
+            sentiment_score DECIMAL(3,1) DEFAULT NULL,
+            emotion_score DECIMAL(3,1) DEFAULT NULL,
+            sentiment_data JSON,
+            emotion_data JSON,
+            answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (session_id) REFERENCES interview_sessions(session_id)
+        );
+        """
+        db_cursor.execute(answers_table_sql)
+        
+        # Try to add new columns if table already exists (for backward compatibility)
+        # Update feedback_score to DECIMAL if it's INT
+        try:
+            db_cursor.execute("ALTER TABLE interview_answers MODIFY COLUMN feedback_score DECIMAL(3,1) DEFAULT NULL")
+        except:
+            pass  # Column might not exist or already correct type
+        
+        try:
+            db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN content_score DECIMAL(3,1) DEFAULT NULL")
+        except:
+            pass  # Column already exists
+        
+        try:
+            db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN sentiment_score DECIMAL(3,1) DEFAULT NULL")
+        except:
+            pass
+        
+        try:
+            db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN emotion_score DECIMAL(3,1) DEFAULT NULL")
+        except:
+            pass
+        
+        try:
+            db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN sentiment_data JSON")
+        except:
+            pass
+        
+        try:
+            db_cursor.execute("ALTER TABLE interview_answers ADD COLUMN emotion_data JSON")
+        except:
+            pass
+        
+        db_connection.commit()
+        print("✅ Database tables created successfully")
+        
+    except Exception as e:
+        print(f"❌ Database setup error: {e}")
+        db_connection = None
+        db_cursor = None
+
 
-# Create upload folder if it doesn't exist
+# Upload folder (created by init_services)
 UPLOAD_FOLDER = './Uploaded_Resumes'
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
 
 # Audio storage folder
 AUDIO_FOLDER = './Interview_Recordings'
-if not os.path.exists(AUDIO_FOLDER):
-    os.makedirs(AUDIO_FOLDER)
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF using pdfminer"""
+def extract_text_from_pdf(file_path, deadline=None):
+    """Extract text from PDF using pdfminer, page by page so a deadline can stop it early"""
     try:
-        text = extract_text(file_path)
-        return text
+        pages = []
+        page_layouts = extract_pages(file_path)
+        while True:
+            if pages and deadline is not None and not deadline.allows(RESUME_STAGE_RESERVE_SECONDS):
+                deadline.degrade('pdf_extraction', f'stopped after {len(pages)} page(s)')
+                break
+            page_layout = next(page_layouts, None)
+            if page_layout is None:
+                break
+            pages.append(''.join(
+                element.get_text() for element in page_layout
+                if isinstance(element, LTTextContainer)
+            ))
+        return '\f'.join(pages)
     except Exception as e:
         print(f"Error extracting text: {e}")
         return ""
@@ -216,14 +395,15 @@ def extract_name(text):
                 return line
     return "Not found"
 
-def count_pages(file_path):
+def count_pages(file_path, text=None):
     """Count number of pages in PDF"""
     try:
         from PyPDF2 import PdfReader
         reader = PdfReader(file_path)
         return len(reader.pages)
     except:
-        text = extract_text_from_pdf(file_path)
+        if text is None:
+            text = extract_text_from_pdf(file_path)
         return max(1, len(text) // 3000)
 
 def extract_skills(text):
@@ -410,8 +590,14 @@ def _extract_gemini_text(response):
     if not response:
         return segments
 
-    if getattr(response, "text", None):
-        segments.append(response.text)
+    try:
+        text = getattr(response, "text", None)
+    except ValueError:
+        # The SDK raises when there is no single usable candidate (blocked or empty)
+        text = None
+    if text:
+        segments.append(text)
+        return segments
 
     candidates = getattr(response, "candidates", None) or []
     for candidate in candidates:
@@ -440,61 +626,97 @@ def _get_block_reason(response):
     return getattr(feedback, "block_reason", None) or getattr(feedback, "safety_ratings", None)
 
 
-def generate_interview_questions(skills, field, level, resume_text, name, email, question_count=None):
-    """Generate interview questions using Google Gemini AI"""
+# Prompt templates. Fixed instructions are kept terse because they are sent
+# with every call; the static overhead is measured by _measure_prompt_templates.
+QUESTION_PROMPT_TEMPLATE = """You are interviewing {name} ({level}, {field}). Skills: {skills}.
+Resume highlights:
+{highlights}
+
+Write {count} natural, conversational questions that sound spontaneous and curious, not corporate.
+- Reference their actual projects, work and skills
+- Mix technical deep-dives, project challenges, {field} scenarios and one on how they learn
+- Vary length, tone and structure
+- Never open with "Tell me about", "Describe your experience", "Walk me through", "Can you explain" or "What is your understanding of"
+Style example: "So {skill_example} - what's been your biggest headache working with it?"
+
+Output exactly {count} questions numbered 1-{count}, nothing else:"""
+
+SCORING_PROMPT_TEMPLATE = """You are an expert technical interviewer scoring a {level} {field} candidate.
+
+QUESTION: {question}
+ANSWER: {answer}
+
+Reply with exactly these three lines (max 15 words each), then ###
+SCORE: [1-10]
+GOOD: [what was good]
+IMPROVE: [what could be better]"""
+
+PROMPT_TEMPLATES = {
+    "questions": QUESTION_PROMPT_TEMPLATE,
+    "scoring": SCORING_PROMPT_TEMPLATE,
+}
+
+
+def _measure_prompt_templates():
+    """Count the fixed tokens of each prompt template with placeholders left empty."""
+    for task, template in PROMPT_TEMPLATES.items():
+        try:
+            placeholders = {
+                field_name: ""
+                for _, field_name, _, _ in string.Formatter().parse(template)
+                if field_name
+            }
+            static_text = template.format(**placeholders)
+            template_token_counts[task] = model_backend.count_tokens(task, static_text)
+            print(f"🔢 {task} prompt template: {template_token_counts[task]} static tokens")
+        except Exception as e:
+            print(f"⚠️ Could not count tokens for {task} prompt template: {e}")
+
+
+def _generate_for_task(task, prompt, timeout=None):
+    """Run a prompt through the task's model profile and record token usage"""
+    started = time.time()
+    response = model_backend.generate(task, prompt, timeout=timeout)
+    elapsed = time.time() - started
+
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+    output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+    with model_usage_lock:
+        stats = model_usage[task]
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["output_tokens"] += output_tokens
+        stats["total_seconds"] += elapsed
+
+    print(f"🔢 {task}: {prompt_tokens} prompt + {output_tokens} output tokens in {elapsed:.2f}s")
+    return response
+
+
+def generate_interview_questions(skills, field, level, resume_text, name, email, question_count=None, deadline=None):
+    """Generate interview questions using Google Gemini AI, or the offline bank when out of budget"""
     try:
         if question_count is None:
             question_count = NUM_QUESTIONS
         question_count = max(1, min(12, int(question_count)))
+
+        if deadline is not None and not deadline.allows(GEMINI_MIN_BUDGET_SECONDS):
+            deadline.degrade('questions', 'not enough budget left for Gemini')
+            return question_bank.select(field, level, skills, question_count)
         difficulty = DIFFICULTY_MAPPING.get(level, 'intermediate-level')
         skills_str = ", ".join(skills[:15]) if skills else "general technical skills"
         
         sections = extract_resume_sections(resume_text)
         
-        # Enhanced prompt for more natural, unique questions
-        prompt = f"""You are conducting a real interview with {name}. Generate {question_count} NATURAL, CONVERSATIONAL questions that feel spontaneous and human.
-
-CANDIDATE PROFILE:
-Name: {name}
-Field: {field}  
-Level: {level}
-Skills: {skills_str}
-
-RESUME HIGHLIGHTS:
-{sections['projects'][:400]}
-{sections['experience'][:400]}
-
-CRITICAL INSTRUCTIONS:
-1. Make questions sound NATURAL - as if you're having a real conversation
-2. NEVER use templates like "Tell me about..." or "Describe your experience with..."
-3. Reference their ACTUAL projects/work when possible
-4. Be conversational: "I noticed you worked with X - what made you choose it over Y?"
-5. Mix up sentence structures - use fragments, rhetorical questions, casual language
-6. Make it feel like you're genuinely curious about their work
-7. Avoid corporate/formal language - be human and engaging
-
-FORBIDDEN PHRASES (never use these):
-- "Tell me about..."
-- "Describe your experience..."
-- "Walk me through..."
-- "Can you explain..."
-- "What is your understanding of..."
-
-GOOD EXAMPLES OF NATURAL QUESTIONS:
-- "So {skills[0] if skills else 'Python'} - what's been your biggest headache working with it?"
-- "I'm curious, when you built that {field.lower()} project, how did you handle the data persistence layer?"
-- "You mentioned {skills[1] if len(skills) > 1 else 'databases'} on your resume. What's one thing you wish you knew earlier about it?"
-- "Looking at your background, you seem to bounce between {skills[0] if skills else 'tech'} and {skills[1] if len(skills) > 1 else 'other tech'}. What draws you to both?"
-
-QUESTION MIX:
-- 3 technical deep-dives (specific to their skills)
-- 2 about actual projects/challenges they faced  
-- 2 scenario-based (relevant to {field})
-- 1 about their growth/learning approach
-
-Make each question feel different - vary length, tone, and structure. Be genuinely curious.
-
-Generate exactly {question_count} questions, numbered 1-{question_count}, nothing else:"""
+        prompt = QUESTION_PROMPT_TEMPLATE.format(
+            name=name,
+            level=level,
+            field=field,
+            skills=skills_str,
+            highlights=f"{sections['projects'][:400]}\n{sections['experience'][:400]}".strip(),
+            count=question_count,
+            skill_example=skills[0] if skills else 'Python'
+        )
 
         raw_segments = []
         block_reason = None
@@ -502,11 +724,12 @@ Generate exactly {question_count} questions, numbered 1-{question_count}, nothin
         max_attempts = 3
 
         for attempt in range(1, max_attempts + 1):
+            timeout = None
+            if deadline is not None:
+                # Leave the reserve for parsing and the response itself
+                timeout = max(1.0, deadline.remaining() - RESUME_STAGE_RESERVE_SECONDS)
             try:
-                response = model.generate_content(
-                    prompt,
-                    safety_settings=safety_settings
-                )
+                response = _generate_for_task("questions", prompt, timeout=timeout)
                 raw_segments = _extract_gemini_text(response)
                 block_reason = _get_block_reason(response)
 
@@ -519,7 +742,11 @@ Generate exactly {question_count} questions, numbered 1-{question_count}, nothin
                 print(f"⚠️ Gemini attempt {attempt} failed with error: {gen_error}")
 
             if attempt < max_attempts:
-                time.sleep(1 * attempt)  # small backoff before retry
+                backoff = 1 * attempt  # small backoff before retry
+                if deadline is not None and not deadline.allows(GEMINI_MIN_BUDGET_SECONDS + backoff):
+                    print("⏱️ Not enough budget left to retry Gemini")
+                    break
+                time.sleep(backoff)
 
         if not raw_segments:
             reason_text = block_reason or last_error or "unknown"
@@ -567,23 +794,18 @@ Generate exactly {question_count} questions, numbered 1-{question_count}, nothin
         import traceback
         traceback.print_exc()
         
-        # Natural-sounding fallback questions
-        fallback = [
-            f"What draws you to {field}? What made you choose this path?",
-            f"I see {skills[0] if skills else 'programming'} on your resume - what's your favorite aspect of working with it?",
-            f"Tell me about a project where things didn't go as planned. How'd you handle it?",
-            f"When you're learning something new in {field.lower()}, what's your process?",
-            f"You've worked with {skills[1] if len(skills) > 1 else 'various technologies'} - which one surprised you the most?",
-            "What's a technical challenge you're proud of overcoming?",
-            f"If you could improve one thing about your current {field.lower()} skills, what would it be?",
-            "Where do you see yourself going in the next few years?"
-        ]
-        return fallback[:question_count]
+        if deadline is not None:
+            deadline.degrade('questions', f'Gemini failed: {e}')
+        return question_bank.select(field, level, skills, question_count)
 
 @app.route('/api/analyze-resume', methods=['POST'])
 def analyze_resume():
     """Main endpoint to analyze resume"""
     try:
+        deadline = Deadline.from_headers(
+            request.headers, DEADLINE_HEADER, RESUME_DEADLINE_SECONDS, max_seconds=RESUME_DEADLINE_MAX_SECONDS
+        )
+        
         if 'resume' not in request.files:
             return jsonify({"error": "No resume file provided"}), 400
         
@@ -599,8 +821,9 @@ def analyze_resume():
         file.save(file_path)
         
         print(f"✅ File saved: {file_path}")
+        deadline.checkpoint('upload')
         
-        resume_text = extract_text_from_pdf(file_path)
+        resume_text = extract_text_from_pdf(file_path, deadline=deadline)
         
         if not resume_text:
             return jsonify({"error": "Failed to extract text from PDF"}), 500
@@ -610,9 +833,10 @@ def analyze_resume():
         name = extract_name(resume_text)
         email = extract_email(resume_text)
         phone = extract_phone(resume_text)
-        num_pages = count_pages(file_path)
+        num_pages = count_pages(file_path, text=resume_text)
         
         print(f"✅ Basic info extracted - Name: {name}, Email: {email}")
+        print(f"⏱️ PDF stage done, {deadline.checkpoint('pdf_extraction'):.2f}s of budget left")
         
         if num_pages == 1:
             cand_level = "Fresher"
@@ -626,6 +850,7 @@ def analyze_resume():
         
         recommended_skills, reco_field, courses = analyze_skills(skills, resume_text)
         resume_score, tips = calculate_resume_score(resume_text)
+        print(f"⏱️ Skill analysis done, {deadline.checkpoint('skill_analysis'):.2f}s of budget left")
 
         requested_questions = request.form.get('num_questions') or request.args.get('num_questions')
         question_count = NUM_QUESTIONS
@@ -647,8 +872,10 @@ def analyze_resume():
             resume_text,
             name,
             email,
-            question_count=question_count
+            question_count=question_count,
+            deadline=deadline
         )
+        deadline.checkpoint('questions')
         print(f"✅ Generated {len(questions)} personalized questions")
         
         if questions:
@@ -669,7 +896,10 @@ def analyze_resume():
             "tips": tips,
             "courses": courses,
             "interviewQuestions": questions,
-            "questionCount": question_count
+            "questionCount": question_count,
+            "degraded": deadline.degraded,
+            "degradedStages": deadline.degraded_stages,
+            "latencyBudget": deadline.summary()
         }
         
         return jsonify(response), 200
@@ -681,6 +911,7 @@ def analyze_resume():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/create-session', methods=['POST'])
+@uses_db
 def create_session():
     """Create a new interview session"""
     try:
@@ -717,6 +948,7 @@ def create_session():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/save-answer', methods=['POST'])
+@uses_db
 def save_answer():
     """Save interview answer to database with sentiment and emotion data"""
     try:
@@ -824,6 +1056,7 @@ def save_answer():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/get-session-report/<session_id>', methods=['GET'])
+@uses_db
 def get_session_report(session_id):
     """Get complete interview report for a session"""
     try:
@@ -933,6 +1166,7 @@ def get_session_report(session_id):
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/get-session-answers/<session_id>', methods=['GET'])
+@uses_db
 def get_session_answers(session_id):
     """Get all answers for a session"""
     try:
@@ -963,42 +1197,152 @@ def get_session_answers(session_id):
         print(f"❌ Error fetching answers: {e}")
         return jsonify({"error": str(e)}), 500
 
+def score_answer_with_gemini(question, answer, field, level):
+    """Score an answer with the Gemini scoring profile, returns (score, good, improve)"""
+    prompt = SCORING_PROMPT_TEMPLATE.format(
+        level=level,
+        field=field,
+        question=question,
+        answer=answer
+    )
+
+    response = _generate_for_task("scoring", prompt)
+    feedback_text = "\n".join(_extract_gemini_text(response)).strip()
+    if not feedback_text:
+        raise ValueError(f"Gemini returned no usable content for scoring (reason: {_get_block_reason(response)})")
+    
+    print(f"✅ Feedback generated: {feedback_text[:100]}...")
+    
+    # Parse the response
+    content_score = 5  # Default
+    good_points = "Good answer"
+    improve_points = "Keep practicing"
+    
+    lines = feedback_text.split('\n')
+    for line in lines:
+        line = line.strip()
+        if line.startswith('SCORE:'):
+            try:
+                content_score = int(re.findall(r'\d+', line)[0])
+                content_score = max(1, min(10, content_score))  # Clamp between 1-10
+            except:
+                content_score = 5
+        elif line.startswith('GOOD:'):
+            good_points = line.replace('GOOD:', '').strip()
+        elif line.startswith('IMPROVE:'):
+            improve_points = line.replace('IMPROVE:', '').strip()
+    
+    return content_score, good_points, improve_points
+
+def keyframes_from_clip(clip):
+    """
+    (frames, timestamps, stats) for an uploaded video clip (a FileStorage or
+    the raw request). Raises ClipTooLargeError past CLIP_MAX_BYTES.
+    """
+    if hasattr(clip, 'stream'):
+        # Multipart parts rarely carry their own length; read one byte past the cap to tell
+        data, content_type, filename = clip.stream.read(CLIP_MAX_BYTES + 1), clip.mimetype, clip.filename or ''
+    else:
+        if (clip.content_length or 0) > CLIP_MAX_BYTES:
+            raise ClipTooLargeError(f"Video clip is larger than {CLIP_MAX_BYTES // (1024 * 1024)} MB")
+        data, content_type, filename = clip.get_data(cache=False), clip.mimetype, ''
+    if len(data) > CLIP_MAX_BYTES:
+        raise ClipTooLargeError(f"Video clip is larger than {CLIP_MAX_BYTES // (1024 * 1024)} MB")
+    return extract_keyframes(
+        data,
+        content_type=content_type,
+        filename=filename,
+        max_keyframes=CLIP_MAX_KEYFRAMES,
+        max_decoded_frames=CLIP_MAX_DECODED_FRAMES,
+        mjpeg_fps=CLIP_MJPEG_FPS,
+        max_seconds=CLIP_MAX_SECONDS,
+        motion_threshold=CLIP_MOTION_THRESHOLD,
+        scene_threshold=CLIP_SCENE_THRESHOLD,
+        min_gap=CLIP_MIN_KEYFRAME_GAP_SECONDS,
+        max_gap=CLIP_MAX_KEYFRAME_GAP_SECONDS
+    )
+
 @app.route('/api/analyze-answer', methods=['POST'])
 def analyze_answer():
-    """Analyze interview answer using Gemini AI + Sentiment + Emotion"""
+    """
+    Analyze interview answer using Gemini AI + Sentiment + Emotion.
+    Video frames come as base64 strings in JSON, multipart file parts or a
+    length-prefixed binary body (see frame_upload.py). A multipart request
+    can send the whole recording as a "video_clip" part instead, and the
+    keyframes are picked server-side (see video_clip.py).
+    If frames for this answer were streamed to /api/stream-frames, the body
+    only adds the frames the stream hasn't seen: those after the last
+    streamed timestamp, or, without timestamps, those past the streamed
+    frame count (the body is then taken to hold the whole answer).
+    """
     try:
-        data = request.json
+        try:
+            data, video_frames, frame_timestamps = parse_frame_request(request, 'video_frames')
+            face_boxes, frames_are_faces = parse_face_hints(data, len(video_frames))
+            if not video_frames and 'video_clip' in request.files:
+                video_frames, frame_timestamps, clip_stats = keyframes_from_clip(request.files['video_clip'])
+                print(f"🎞️ Picked {clip_stats['keyframes_selected']} of {clip_stats['frames_decoded']} clip frames")
+        except ClipTooLargeError as e:
+            return jsonify({"error": str(e)}), 413
+        except (FrameUploadError, VideoClipError) as e:
+            return jsonify({"error": str(e)}), 400
         question = data.get('question', '')
         answer = data.get('answer', '')
         field = data.get('field', 'General')
         level = data.get('level', 'Intermediate')
-        video_frames = data.get('video_frames', [])  # List of base64 encoded frames
         
         print(f"🤖 Analyzing answer for: {question[:50]}...")
         
         if not answer or not answer.strip():
             return jsonify({"error": "No answer provided"}), 400
         
-        # 1. Analyze sentiment from text
+        # 1. Analyze sentiment from text (finalize the live transcript stream if we have one)
         print("📊 Analyzing sentiment...")
-        sentiment_data = sentiment_analyzer.analyze_sentiment(answer)
+        sentiment_data = None
+        session_id = data.get('session_id')
+        question_number = data.get('question_number')
+        if session_id and question_number is not None:
+            stream = transcript_streams.pop(session_id, question_number)
+            if stream is not None and stream.matches(answer):
+                sentiment_data = stream.finalize()
+                print("📊 Using streamed transcript sentiment")
+        if sentiment_data is None:
+            sentiment_data = sentiment_analyzer.analyze_sentiment(answer)
         # Debug: Print sentiment analysis
         print(f"📊 Sentiment state: {sentiment_data.get('emotional_state', 'unknown')}")
         print(f"📊 Confidence: {sentiment_data.get('confidence_score', 0)}")
         print(f"📊 Nervousness: {sentiment_data.get('nervousness_score', 0)}")
         
-        # 2. Analyze facial expressions from video frames
+        # 2. Analyze facial expressions from video frames (finalize the live frame stream if we have one)
         print("😊 Analyzing facial expressions...")
         print(f"📹 Received {len(video_frames) if video_frames else 0} video frames")
         emotion_data = {}
-        if video_frames and len(video_frames) > 0:
-            emotion_data = emotion_analyzer.analyze_video_frames(video_frames)
+        frame_stream = None
+        if session_id and question_number is not None:
+            frame_stream = frame_streams.pop(session_id, question_number)
+        if frame_stream is not None and (frame_stream.frame_count or video_frames):
+            # The body may repeat frames that were already streamed; only feed the rest
+            unseen = frame_stream.unseen_frames(len(video_frames), frame_timestamps) if video_frames else []
+            if unseen:
+                frame_stream.feed(
+                    [video_frames[i] for i in unseen],
+                    [frame_timestamps[i] for i in unseen] if frame_timestamps else None,
+                    [face_boxes[i] for i in unseen] if face_boxes else None,
+                    frames_are_faces
+                )
+            emotion_data = frame_stream.snapshot()
+            print(f"📊 Using streamed facial expressions ({emotion_data.get('frames_analyzed', 0)} frames)")
+        elif video_frames and len(video_frames) > 0:
+            emotion_data = emotion_analyzer.analyze_video_frames(
+                video_frames, frame_timestamps, face_boxes=face_boxes, precropped=frames_are_faces
+            )
             # Debug: Print detected emotions
             print(f"📊 Detected emotions: {emotion_data.get('emotions', {})}")
             print(f"📊 Dominant emotion: {emotion_data.get('dominant_emotion', 'unknown')}")
             print(f"📊 Interview state: {emotion_data.get('interview_state', 'unknown')}")
             print(f"📊 Detection method: {emotion_data.get('detection_method', 'unknown')}")
-            print(f"📊 Frames analyzed: {emotion_data.get('frames_analyzed', 0)}")
+            print(f"📊 Frames analyzed: {emotion_data.get('frames_analyzed', 0)} "
+                  f"(scored {emotion_data.get('frames_used', 0)} distinct)")
             
             # Check if we got default/neutral (might indicate detection failure)
             if emotion_data.get('interview_state') == 'neutral' and emotion_data.get('dominant_emotion') == 'neutral':
@@ -1008,63 +1352,30 @@ def analyze_answer():
             emotion_data = emotion_analyzer._default_emotion()
             print("⚠️ No video frames provided for emotion analysis - using default")
         
-        # 3. Get content-based score from Gemini AI
-        print("🧠 Analyzing content with AI...")
-        prompt = f"""You are an expert technical interviewer analyzing a candidate's answer.
-
-QUESTION ASKED:
-{question}
-
-CANDIDATE'S ANSWER:
-{answer}
-
-CANDIDATE INFO:
-- Field: {field}
-- Level: {level}
-
-YOUR TASK:
-Analyze this answer and provide BRIEF feedback in exactly this format:
-
-SCORE: [number 1-10]
-GOOD: [One short sentence about what was good]
-IMPROVE: [One short sentence about what could be better]
-
-Keep it very concise - max 15 words per point.
-
-Example:
-SCORE: 7
-GOOD: Clear explanation of core concepts with practical examples
-IMPROVE: Could mention performance optimization and edge cases
-
-Now analyze the answer above:"""
-
-        # Get AI analysis
-        response = model.generate_content(
-        prompt,
-        safety_settings=safety_settings
-        )
-        feedback_text = response.text.strip()
-        
-        print(f"✅ Feedback generated: {feedback_text[:100]}...")
-        
-        # Parse the response
-        content_score = 5  # Default
-        good_points = "Good answer"
-        improve_points = "Keep practicing"
+        # 3. Content score: local scorer first, Gemini only for ambiguous answers
+        local_result = content_scorer.score(question, answer, sentiment_data)
+        print(f"🧮 Local content score: {local_result['score']} (confidence {local_result['confidence']})")
         
-        lines = feedback_text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith('SCORE:'):
-                try:
-                    content_score = int(re.findall(r'\d+', line)[0])
-                    content_score = max(1, min(10, content_score))  # Clamp between 1-10
-                except:
-                    content_score = 5
-            elif line.startswith('GOOD:'):
-                good_points = line.replace('GOOD:', '').strip()
-            elif line.startswith('IMPROVE:'):
-                improve_points = line.replace('IMPROVE:', '').strip()
+        if LOCAL_SCORER_ENABLED and local_result['confidence'] >= content_scorer.min_confidence:
+            scoring_tier = 'local'
+            content_score = local_result['score']
+            good_points = local_result['good']
+            improve_points = local_result['improve']
+        else:
+            try:
+                print("🧠 Analyzing content with AI...")
+                content_score, good_points, improve_points = score_answer_with_gemini(
+                    question, answer, field, level
+                )
+                scoring_tier = 'escalated'
+            except Exception as gen_error:
+                # Degraded mode: Gemini unreachable, keep the local estimate
+                print(f"⚠️ Gemini scoring failed, using local score: {gen_error}")
+                scoring_tier = 'fallback'
+                content_score = local_result['score']
+                good_points = local_result['good']
+                improve_points = local_result['improve']
+        content_scorer.record(scoring_tier)
         
         # 4. Calculate combined score
         combined_score_data = calculate_combined_score(
@@ -1105,6 +1416,7 @@ Now analyze the answer above:"""
             "success": True,
             "sentiment_data": sentiment_data,
             "emotion_data": emotion_data,
+            "scoring_tier": scoring_tier,
             "score_breakdown": {
                 "content": combined_score_data['content_score'],
                 "sentiment": combined_score_data['sentiment_score'],
@@ -1131,19 +1443,83 @@ Now analyze the answer above:"""
             "success": True
         }), 200
 
+@app.route('/api/transcript-delta', methods=['POST'])
+def transcript_delta():
+    """Feed a live transcript delta for an answer in progress and return live sentiment"""
+    try:
+        data = request.json or {}
+        session_id = data.get('session_id')
+        question_number = data.get('question_number')
+        delta = data.get('delta', '')
+        
+        if not session_id or question_number is None:
+            return jsonify({"error": "session_id and question_number are required"}), 400
+        if not isinstance(delta, str):
+            return jsonify({"error": "delta must be a string"}), 400
+        
+        stream = transcript_streams.get_or_create(session_id, question_number)
+        stream.feed(delta)
+        
+        response = {"success": True, "hints": stream.hints()}
+        if data.get('snapshot', True):
+            response["sentiment_data"] = stream.snapshot()
+        return jsonify(response), 200
+        
+    except Exception as e:
+        print(f"❌ Error processing transcript delta: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/stream-frames', methods=['POST'])
+def stream_frames():
+    """
+    Feed video frames for an answer in progress (any frame upload format,
+    with session_id and question_number) and return the live emotion aggregate
+    """
+    try:
+        try:
+            fields, frames, frame_timestamps = parse_frame_request(request, 'frames')
+            face_boxes, frames_are_faces = parse_face_hints(fields, len(frames))
+        except FrameUploadError as e:
+            return jsonify({"error": str(e)}), 400
+        session_id = fields.get('session_id')
+        question_number = fields.get('question_number')
+        
+        if not session_id or question_number is None:
+            return jsonify({"error": "session_id and question_number are required"}), 400
+        
+        stream = frame_streams.get_or_create(session_id, question_number)
+        stream.feed(frames, frame_timestamps, face_boxes, frames_are_faces)
+        
+        response = {"success": True, "frames_received": stream.frame_count}
+        snapshot = fields.get('snapshot', True)
+        if snapshot is True or str(snapshot).lower() == 'true':
+            response["emotion_data"] = stream.snapshot()
+        return jsonify(response), 200
+        
+    except Exception as e:
+        print(f"❌ Error processing streamed frames: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/analyze-facial-expressions', methods=['POST'])
 def analyze_facial_expressions():
-    """Analyze facial expressions from video frames"""
+    """Analyze facial expressions from video frames (JSON, multipart or binary frame stream)"""
     try:
-        data = request.json
-        frames = data.get('frames', [])  # List of base64 encoded images
+        try:
+            fields, frames, frame_timestamps = parse_frame_request(request, 'frames')
+            face_boxes, frames_are_faces = parse_face_hints(fields, len(frames))
+        except FrameUploadError as e:
+            return jsonify({"error": str(e)}), 400
         
         if not frames:
             return jsonify({"error": "No frames provided"}), 400
         
         print(f"😊 Analyzing {len(frames)} video frames...")
         
-        emotion_data = emotion_analyzer.analyze_video_frames(frames)
+        emotion_data = emotion_analyzer.analyze_video_frames(
+            frames, frame_timestamps, face_boxes=face_boxes, precropped=frames_are_faces
+        )
         
         return jsonify({
             "success": True,
@@ -1160,6 +1536,93 @@ def analyze_facial_expressions():
             "emotion_data": emotion_analyzer._default_emotion()
         }), 200
 
+@app.route('/api/analyze-video-clip', methods=['POST'])
+def analyze_video_clip():
+    """
+    Analyze facial expressions over a whole video clip (WebM/MP4 or MJPEG),
+    sent as the raw request body or as a multipart "video" part
+    """
+    try:
+        clip = request.files.get('video') if request.mimetype == 'multipart/form-data' else request
+        if clip is None:
+            return jsonify({"error": "No video clip provided"}), 400
+        try:
+            frames, frame_timestamps, clip_stats = keyframes_from_clip(clip)
+        except ClipTooLargeError as e:
+            return jsonify({"error": str(e)}), 413
+        except VideoClipError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        print(f"🎞️ Analyzing {clip_stats['keyframes_selected']} keyframes from "
+              f"{clip_stats['frames_decoded']} clip frames ({clip_stats['decoder']})...")
+        
+        emotion_data = emotion_analyzer.analyze_video_frames(frames, frame_timestamps)
+        
+        return jsonify({
+            "success": True,
+            "emotion_data": emotion_data,
+            "clip": clip_stats
+        }), 200
+        
+    except Exception as e:
+        print(f"❌ Error analyzing video clip: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "emotion_data": emotion_analyzer._default_emotion()
+        }), 200
+
+@app.route('/api/analyze-sentiment-batch', methods=['POST'])
+def analyze_sentiment_batch():
+    """Analyze sentiment for many answers at once (re-scoring, bulk uploads)"""
+    try:
+        data = request.json or {}
+        answers = data.get('answers', [])
+        
+        if not isinstance(answers, list) or not answers:
+            return jsonify({"error": "No answers provided"}), 400
+        
+        print(f"📊 Batch sentiment analysis for {len(answers)} answers...")
+        started = time.time()
+        results = sentiment_analyzer.analyze_many(
+            [answer if isinstance(answer, str) else '' for answer in answers],
+            chunk_size=SENTIMENT_BATCH_CHUNK_SIZE or None
+        )
+        print(f"✅ Batch sentiment done in {time.time() - started:.2f}s")
+        
+        return jsonify({
+            "success": True,
+            "sentiment_data": results,
+            "total": len(results)
+        }), 200
+        
+    except Exception as e:
+        print(f"❌ Error in batch sentiment analysis: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/model-usage', methods=['GET'])
+def get_model_usage():
+    """Report per-task generation profiles, prompt overhead, token usage and emotion batching"""
+    with model_usage_lock:
+        usage = {task: dict(stats) for task, stats in model_usage.items()}
+    for stats in usage.values():
+        calls = stats["calls"]
+        stats["avg_prompt_tokens"] = round(stats["prompt_tokens"] / calls, 1) if calls else 0
+        stats["avg_output_tokens"] = round(stats["output_tokens"] / calls, 1) if calls else 0
+        stats["avg_seconds"] = round(stats["total_seconds"] / calls, 3) if calls else 0
+    return jsonify({
+        "backend": model_backend.name,
+        "profiles": MODEL_PROFILES,
+        "template_tokens": template_token_counts,
+        "usage": usage,
+        "scoring_cascade": content_scorer.get_stats(),
+        "emotion_batcher": emotion_analyzer.get_inference_stats()
+    }), 200
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -1168,10 +1631,32 @@ def health_check():
         "message": "Flask API is running with Gemini AI, Sentiment & Emotion Analysis",
         "features": {
             "sentiment_analysis": TEXTBLOB_AVAILABLE or VADER_AVAILABLE,
-            "facial_recognition": OPENCV_AVAILABLE
+            "sentiment_backend": sentiment_analyzer.backend.name,
+            "facial_recognition": OPENCV_AVAILABLE,
+            "face_detector": emotion_analyzer.face_detector.name if emotion_analyzer.face_detector else None
         }
     }), 200
 
+def init_services():
+    """
+    Load the emotion model, connect to the database, create the storage
+    folders and start background work. Runs once per server process at
+    import (gunicorn workers import api:app). When this file is run
+    directly, multiprocessing workers (the sentiment batch pool) re-import
+    it as __mp_main__ and skip all of this.
+    """
+    global emotion_analyzer
+    emotion_analyzer = create_emotion_analyzer()
+    connect_database()
+    for folder in (UPLOAD_FOLDER, AUDIO_FOLDER):
+        os.makedirs(folder, exist_ok=True)
+    # Measure template overhead in the background so startup never waits on the API
+    threading.Thread(target=_measure_prompt_templates, daemon=True).start()
+
+
+if __name__ != '__mp_main__':
+    init_services()
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🚀 Flask API Server Starting with Gemini AI...")
@@ -0,0 +1,28 @@
+"""
+Helpers shared by the frame benchmarks: which files count as frames, how
+a frame directory is loaded, and box overlap.
+"""
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.bmp'}
+
+
+def image_paths(frames_dir, recursive=False):
+    """Sorted image files in frames_dir (and its subdirectories when recursive)"""
+    candidates = frames_dir.rglob('*') if recursive else frames_dir.iterdir()
+    return sorted(p for p in candidates if p.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def load_gray_frames(analyzer, frames_dir):
+    """Every readable frame in frames_dir, decoded to grayscale the way the analyzer does"""
+    frames = (analyzer.decode_gray(p.read_bytes()) for p in image_paths(frames_dir))
+    return [gray for gray in frames if gray is not None]
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    inter_h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = inter_w * inter_h
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Compare FER+ model variants (fp32, int8, optimized) on a local frame set:
+per-frame latency, throughput at several batch sizes, top-1 agreement with
+fp32 and, for labelled frames, accuracy.
+
+Frames are images under FRAMES_DIR; a frame inside a sub-directory named
+after an emotion label (angry, disgust, fear, happy, neutral, sad, surprise)
+counts as labelled. Faces are cropped with the app's detector, and frames
+with no detected face are used whole (for pre-cropped datasets).
+
+Usage:
+    python benchmarks/bench_emotion_models.py path/to/frames [--repeat 5] [--batch-sizes 1,8,32]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_models import EMOTION_MODEL_VARIANTS  # noqa: E402
+from sentiment_emotion_analyzer import FacialExpressionAnalyzer  # noqa: E402
+from _common import image_paths  # noqa: E402
+
+REFERENCE_VARIANT = 'fp32'
+
+
+def load_crops(analyzer, frames_dir):
+    crops, labels = [], []
+    for path in image_paths(frames_dir, recursive=True):
+        gray = analyzer.decode_gray(path.read_bytes())
+        if gray is None:
+            continue
+        box = analyzer._detect_face(gray)
+        if box is not None:
+            x, y, w, h = box
+            gray = gray[y:y+h, x:x+w]
+        crops.append(gray)
+        label = path.parent.name.lower()
+        labels.append(label if label in analyzer.emotion_labels else None)
+    return crops, labels
+
+
+def throughput(analyzer, crops, batch_size, repeat):
+    """Frames per second scoring crops in batches of batch_size"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for start in range(0, len(crops), batch_size):
+            analyzer._analyze_emotion_batch(crops[start:start + batch_size])
+    return repeat * len(crops) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('frames_dir', type=Path)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--batch-sizes', default='1,8,32')
+    args = parser.parse_args()
+    batch_sizes = [int(b) for b in args.batch_sizes.split(',') if b]
+
+    analyzer = FacialExpressionAnalyzer(frame_workers=1)
+    if analyzer.emotion_model_session is None:
+        sys.exit("FER+ model unavailable (is onnxruntime installed?)")
+    crops, labels = load_crops(analyzer, args.frames_dir)
+    if not crops:
+        sys.exit(f"No readable frames in {args.frames_dir}")
+    labelled = sum(label is not None for label in labels)
+    print(f"{len(crops)} frames ({labelled} labelled) x {args.repeat} repeats\n")
+
+    predictions = {}
+    header = f"  {'variant':10} {'batch dim':>9} {'ms/frame':>9}"
+    header += "".join(f" {f'fps@{b}':>9}" for b in batch_sizes)
+    header += f" {'agree':>7} {'accuracy':>9}"
+    print(header)
+    for variant in EMOTION_MODEL_VARIANTS:
+        try:
+            analyzer.load_emotion_model(variant)
+        except Exception as e:
+            print(f"  {variant:10} (could not load: {e})")
+            continue
+
+        probabilities = analyzer._analyze_emotion_batch(crops)
+        if probabilities is None:
+            print(f"  {variant:10} (inference failed)")
+            continue
+        predictions[variant] = probabilities.argmax(axis=1)
+        fps = [throughput(analyzer, crops, b, args.repeat) for b in batch_sizes]
+        per_frame_ms = 1e3 / throughput(analyzer, crops, 1, args.repeat)
+
+        reference = predictions.get(REFERENCE_VARIANT)
+        agreement = (predictions[variant] == reference).mean() if reference is not None else float('nan')
+        if labelled:
+            hits = sum(
+                analyzer.emotion_labels[prediction] == label
+                for prediction, label in zip(predictions[variant], labels) if label is not None
+            )
+            accuracy = f"{hits / labelled:9.0%}"
+        else:
+            accuracy = f"{'-':>9}"
+        row = f"  {variant:10} {str(analyzer.emotion_model_batch_size or 'N'):>9} {per_frame_ms:9.2f}"
+        row += "".join(f" {value:9.0f}" for value in fps)
+        row += f" {agreement:7.0%} {accuracy}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Compare face detection settings on a local directory of sample frames:
+detection rate, time per frame, and box overlap (IoU) with full-resolution
+detection at the original settings.
+
+Usage:
+    python benchmarks/bench_face_detection.py path/to/frames [--repeat 3]
+        [--widths 0,480,320,240] [--scale-factors 1.1,1.2] [--min-ratios 0.05,0.1]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_emotion_analyzer import FacialExpressionAnalyzer  # noqa: E402
+from _common import iou, load_gray_frames  # noqa: E402
+
+
+def parse_list(raw, cast):
+    return [cast(value) for value in raw.split(',') if value]
+
+
+def detect_all(analyzer, frames, repeat):
+    """Boxes for every frame plus mean milliseconds per frame"""
+    boxes = [analyzer._detect_face(gray) for gray in frames]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for gray in frames:
+            analyzer._detect_face(gray)
+    per_frame_ms = (time.perf_counter() - started) / (repeat * len(frames)) * 1e3
+    return boxes, per_frame_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('frames_dir', type=Path)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--widths', default='0,640,480,320,240', help="detection widths (0 = full resolution)")
+    parser.add_argument('--scale-factors', default='1.1,1.2,1.3')
+    parser.add_argument('--min-ratios', default='0.05,0.1,0.15')
+    args = parser.parse_args()
+
+    analyzer = FacialExpressionAnalyzer(frame_workers=1)
+    frames = load_gray_frames(analyzer, args.frames_dir)
+    if not frames:
+        sys.exit(f"No readable frames in {args.frames_dir}")
+    height, width = frames[0].shape
+    print(f"{len(frames)} frames ({width}x{height}) x {args.repeat} repeats")
+
+    # Reference: the pre-change settings (full resolution, 1.1 steps, 30px faces)
+    analyzer.detect_width, analyzer.detect_scale_factor, analyzer.min_face_ratio = 0, 1.1, 0.0
+    reference, reference_ms = detect_all(analyzer, frames, args.repeat)
+    reference_rate = sum(box is not None for box in reference) / len(frames)
+    print(f"  reference: {reference_rate:6.0%} detected, {reference_ms:7.2f} ms/frame\n")
+
+    print(f"  {'width':>5} {'scale':>5} {'min':>5} {'detected':>9} {'ms/frame':>9} {'speedup':>8} {'IoU vs ref':>11}")
+    settings = itertools.product(
+        parse_list(args.widths, int),
+        parse_list(args.scale_factors, float),
+        parse_list(args.min_ratios, float)
+    )
+    for detect_width, scale_factor, min_ratio in settings:
+        analyzer.detect_width = detect_width
+        analyzer.detect_scale_factor = scale_factor
+        analyzer.min_face_ratio = min_ratio
+        boxes, per_frame_ms = detect_all(analyzer, frames, args.repeat)
+        rate = sum(box is not None for box in boxes) / len(frames)
+        overlaps = [iou(box, ref) for box, ref in zip(boxes, reference) if box is not None and ref is not None]
+        mean_iou = sum(overlaps) / len(overlaps) if overlaps else 0.0
+        print(f"  {detect_width or width:5d} {scale_factor:5.2f} {min_ratio:5.2f} {rate:9.0%} "
+              f"{per_frame_ms:9.2f} {reference_ms / per_frame_ms:7.1f}x {mean_iou:11.2f}")
+
+
+if __name__ == '__main__':
+    main()
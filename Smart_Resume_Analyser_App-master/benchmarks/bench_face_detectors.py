@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Compare face detector backends (haar, lbp, dnn) on a local frame set:
+detection recall, per-frame latency, batched latency for backends that
+batch, and box overlap (IoU) with the Haar detector.
+
+Every frame under FRAMES_DIR is assumed to show one face, so recall is the
+share of frames with a detection. Frames are run through the analyzer's
+full-frame path (downscaled to --detect-width first) as in production.
+
+Usage:
+    python benchmarks/bench_face_detectors.py path/to/frames [--repeat 3] [--batch-size 16]
+        [--lbp-cascade models/lbpcascade_frontalface_improved.xml]
+        [--dnn-prototxt models/deploy.prototxt]
+        [--dnn-model models/res10_300x300_ssd_iter_140000.caffemodel]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detectors import create_face_detector  # noqa: E402
+from sentiment_emotion_analyzer import FacialExpressionAnalyzer  # noqa: E402
+from _common import iou, load_gray_frames  # noqa: E402
+
+BACKENDS = ('haar', 'lbp', 'dnn')
+REFERENCE_BACKEND = 'haar'
+
+
+def per_frame_ms(fn, frames, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / (repeat * len(frames)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('frames_dir', type=Path)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--detect-width', type=int, default=320, help="0 = full resolution")
+    parser.add_argument('--lbp-cascade', default='models/lbpcascade_frontalface_improved.xml')
+    parser.add_argument('--dnn-prototxt', default='models/deploy.prototxt')
+    parser.add_argument('--dnn-model', default='models/res10_300x300_ssd_iter_140000.caffemodel')
+    parser.add_argument('--dnn-confidence', type=float, default=0.5)
+    args = parser.parse_args()
+    options = {
+        'lbp_cascade_path': args.lbp_cascade,
+        'dnn_prototxt_path': args.dnn_prototxt,
+        'dnn_model_path': args.dnn_model,
+        'dnn_confidence': args.dnn_confidence,
+    }
+
+    analyzer = FacialExpressionAnalyzer(frame_workers=1, detect_width=args.detect_width)
+    frames = load_gray_frames(analyzer, args.frames_dir)
+    if not frames:
+        sys.exit(f"No readable frames in {args.frames_dir}")
+    height, width = frames[0].shape
+    print(f"{len(frames)} frames ({width}x{height}, detected at {args.detect_width or width} wide) "
+          f"x {args.repeat} repeats\n")
+
+    batches = [frames[start:start + args.batch_size] for start in range(0, len(frames), args.batch_size)]
+    reference = None
+    print(f"  {'backend':8} {'recall':>7} {'ms/frame':>9} {f'batched@{args.batch_size}':>11} {'IoU vs haar':>12}")
+    for backend in BACKENDS:
+        try:
+            analyzer.face_detector = create_face_detector(backend, **options)
+        except Exception as e:
+            print(f"  {backend:8} (could not load: {e})")
+            continue
+
+        boxes = [analyzer._detect_full_frame(gray) for gray in frames]
+        recall = sum(box is not None for box in boxes) / len(frames)
+        single_ms = per_frame_ms(lambda: [analyzer._detect_full_frame(gray) for gray in frames], frames, args.repeat)
+        if analyzer.face_detector.supports_batch:
+            batched_ms = per_frame_ms(lambda: [analyzer._detect_full_frames(batch) for batch in batches], frames, args.repeat)
+            batched = f"{batched_ms:11.2f}"
+        else:
+            batched = f"{'-':>11}"
+
+        if backend == REFERENCE_BACKEND:
+            reference = boxes
+        overlaps = [iou(box, ref) for box, ref in zip(boxes, reference or []) if box is not None and ref is not None]
+        mean_iou = f"{sum(overlaps) / len(overlaps):12.2f}" if overlaps else f"{'-':>12}"
+        print(f"  {backend:8} {recall:7.0%} {single_ms:9.2f} {batched} {mean_iou}")
+
+
+if __name__ == '__main__':
+    main()
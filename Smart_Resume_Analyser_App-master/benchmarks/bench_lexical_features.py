@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Benchmark the single-pass lexical feature extractor against the previous
+per-keyword substring scans in SentimentAnalyzer.analyze_sentiment.
+
+Usage:
+    python benchmarks/bench_lexical_features.py [--repeat 2000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_emotion_analyzer import extract_lexical_features  # noqa: E402
+from interview_answers import INTERVIEW_ANSWERS  # noqa: E402
+
+
+def legacy_lexical_features(text):
+    """The lexical part of analyze_sentiment before the single-pass extractor"""
+    text_lower = text.lower()
+    nervousness_keywords = [
+        'um', 'uh', 'er', 'ah', 'like', 'you know', 'i mean',
+        'sorry', 'apologies', 'i think', 'maybe', 'perhaps',
+        'i guess', 'kind of', 'sort of', 'a bit', 'a little'
+    ]
+    nervousness_count = sum(1 for word in nervousness_keywords if word in text_lower)
+    negative_emotion_keywords = [
+        'crying', 'cry', 'tears', 'sad', 'upset', 'frustrated',
+        'stressed', 'anxious', 'worried', 'nervous', 'scared',
+        'afraid', 'difficult', 'hard', 'struggle', 'problem'
+    ]
+    negative_count = sum(1 for word in negative_emotion_keywords if word in text_lower)
+    hesitation_patterns = [
+        r'\b(um|uh|er|ah)\b',
+        r'\b(like|you know|i mean)\b',
+        r'\b(maybe|perhaps|i think|i guess)\b',
+        r'\.\.\.',
+        r'\?{2,}',
+    ]
+    hesitation_count = sum(len(re.findall(pattern, text_lower)) for pattern in hesitation_patterns)
+    sentences = re.split(r'[.!?]+', text)
+    avg_sentence_length = sum(len(s.split()) for s in sentences if s.strip()) / max(len([s for s in sentences if s.strip()]), 1)
+    return {
+        'word_count': len(text.split()),
+        'nervousness_keywords': nervousness_count,
+        'negative_keywords': negative_count,
+        'hesitation_count': hesitation_count,
+        'avg_sentence_length': avg_sentence_length,
+    }
+
+
+def time_it(fn, texts, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeat * len(texts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    legacy_us = time_it(legacy_lexical_features, INTERVIEW_ANSWERS, args.repeat)
+    single_pass_us = time_it(extract_lexical_features, INTERVIEW_ANSWERS, args.repeat)
+
+    print(f"Corpus: {len(INTERVIEW_ANSWERS)} answers x {args.repeat} repeats")
+    print(f"  legacy substring scans : {legacy_us:8.1f} us/answer")
+    print(f"  single-pass extractor  : {single_pass_us:8.1f} us/answer")
+    print(f"  speedup                : {legacy_us / single_pass_us:8.2f}x")
+
+    print("\nFeature differences (legacy -> single-pass):")
+    for text in INTERVIEW_ANSWERS:
+        old = legacy_lexical_features(text)
+        new = extract_lexical_features(text)
+        changed = [
+            f"{key} {old[key]:.4g}->{new[key]:.4g}"
+            for key in ('nervousness_keywords', 'negative_keywords', 'hesitation_count', 'avg_sentence_length')
+            if abs(old[key] - new[key]) > 1e-9
+        ]
+        if changed:
+            print(f"  {text[:48]!r:52} {', '.join(changed)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Compare sentiment backends on the interview answer corpus: load time,
+per-answer latency, and how often emotional_state / overall_sentiment agree
+with the 'both' (VADER + TextBlob) reference.
+
+Usage:
+    python benchmarks/bench_sentiment_backends.py [--repeat 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_emotion_analyzer import SENTIMENT_BACKENDS, SentimentAnalyzer  # noqa: E402
+from interview_answers import INTERVIEW_ANSWERS  # noqa: E402
+
+REFERENCE_BACKEND = 'both'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    results = {}
+    for name in SENTIMENT_BACKENDS:
+        analyzer = SentimentAnalyzer(backend=name)
+
+        # First call imports and initializes the libraries the backend uses
+        started = time.perf_counter()
+        analyzer.analyze_sentiment(INTERVIEW_ANSWERS[0])
+        load_ms = (time.perf_counter() - started) * 1e3
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for text in INTERVIEW_ANSWERS:
+                analyzer.analyze_sentiment(text)
+        per_answer_us = (time.perf_counter() - started) / (args.repeat * len(INTERVIEW_ANSWERS)) * 1e6
+
+        results[name] = {
+            'load_ms': load_ms,
+            'per_answer_us': per_answer_us,
+            'outputs': [analyzer.analyze_sentiment(text) for text in INTERVIEW_ANSWERS],
+            'active': analyzer.backend.use_vader or analyzer.backend.use_textblob or name == 'lexical',
+        }
+
+    reference = results[REFERENCE_BACKEND]['outputs']
+    print(f"Corpus: {len(INTERVIEW_ANSWERS)} answers x {args.repeat} repeats, reference '{REFERENCE_BACKEND}'")
+    print(f"  {'backend':10} {'load ms':>9} {'us/answer':>10} {'state agree':>12} {'sentiment agree':>16}")
+    for name, result in results.items():
+        if not result['active']:
+            print(f"  {name:10} (libraries not installed, skipped)")
+            continue
+        state_agree = sum(
+            out['emotional_state'] == ref['emotional_state'] for out, ref in zip(result['outputs'], reference)
+        ) / len(reference)
+        sentiment_agree = sum(
+            out['overall_sentiment'] == ref['overall_sentiment'] for out, ref in zip(result['outputs'], reference)
+        ) / len(reference)
+        print(f"  {name:10} {result['load_ms']:9.1f} {result['per_answer_us']:10.1f} "
+              f"{state_agree:12.0%} {sentiment_agree:16.0%}")
+
+
+if __name__ == '__main__':
+    main()
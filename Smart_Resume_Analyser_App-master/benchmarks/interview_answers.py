@@ -0,0 +1,51 @@
+"""
+Fixed corpus of interview answers shared by the sentiment benchmarks.
+Covers confident, hesitant, nervous and negative deliveries of varying length.
+"""
+
+INTERVIEW_ANSWERS = [
+    # Confident, structured
+    "In my last project I built a Flask API backed by PostgreSQL. We needed strong consistency "
+    "for payments, so I used transactions and row-level locks. I measured p95 latency before and "
+    "after adding indexes and it dropped from 800 milliseconds to about 120.",
+    "I chose React for the dashboard because the team already knew it and the component model "
+    "fit our design system. We split state into server data handled by React Query and local UI "
+    "state, which removed most of our re-render problems.",
+    "Docker made our deployments reproducible. Every service has a small image, we pin base "
+    "versions, and CI builds and scans them before anything reaches staging.",
+    "I enjoy debugging. When a memory leak showed up in our Node service I took heap snapshots, "
+    "compared them, and found an event listener that was never removed.",
+    # Hesitant
+    "Um, I think I used Python for most of it. Maybe some JavaScript too. I'm not totally sure "
+    "what the, uh, the architecture was called...",
+    "So, like, the database was kind of slow? And we, you know, added some caching I guess. "
+    "It sort of worked but I mean it was a bit messy.",
+    "I guess I would probably start by, um, looking at the logs... and then maybe the metrics?? "
+    "I'm not sure, perhaps ask someone on the team.",
+    "Well... it depends. I think the answer is maybe microservices, but, uh, a monolith could "
+    "also be fine. I mean, it kind of depends on the team.",
+    # Nervous / negative
+    "Sorry, I'm a bit nervous. The last project was really hard and we had a lot of problems "
+    "with deadlines. I was stressed and worried most of the time.",
+    "Honestly it was a difficult time. The team struggled, our tests kept failing and I felt "
+    "frustrated and anxious about the release.",
+    "I'm afraid I don't know much about Kubernetes. Sorry. I tried it once and it was hard.",
+    "It was upset customers every day, and I was scared of breaking production again.",
+    # Short / neutral
+    "Yes.",
+    "I used MySQL.",
+    "Mostly Java and Spring Boot, with some Kotlin on Android.",
+    "Git, code review and pairing.",
+    # Long, mixed
+    "When I joined, the frontend had no tests and releases broke something every week. I started "
+    "with the checkout flow because that is where bugs cost money. I wrote integration tests with "
+    "Playwright, added them to CI, and set a rule that every bug fix ships with a test. Um, it was "
+    "slow at first, and honestly a bit frustrating, but after three months regressions dropped by "
+    "about seventy percent. I think the bigger win was cultural: people stopped being afraid of "
+    "touching old code. If I did it again I would invest earlier in test data factories, because "
+    "fixtures were the hardest part to maintain.",
+    "Our recommendation model was overfitting. I noticed validation accuracy was great but online "
+    "metrics were flat, so I checked for leakage and found that a feature was computed after the "
+    "label date. After fixing that, offline accuracy went down but online click-through went up "
+    "by four percent, which was the metric that actually mattered.",
+]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Concurrency stress test for FacialExpressionAnalyzer: many threads analyze
+answers at once through one shared analyzer (as gthread workers do), and
+every result must match a single-threaded run of the same answer.
+
+Usage:
+    python benchmarks/stress_emotion_threads.py path/to/frames [--threads 16]
+        [--iterations 20] [--frames-per-answer 10] [--batch-wait-ms 0]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_emotion_analyzer import FacialExpressionAnalyzer  # noqa: E402
+from _common import image_paths  # noqa: E402
+
+RESULT_KEYS = ('interview_state', 'dominant_emotion', 'frames_analyzed', 'faces_detected')
+
+
+def same_result(a, b, tolerance=1e-4):
+    if any(a.get(key) != b.get(key) for key in RESULT_KEYS):
+        return False
+    return all(abs(a['emotions'].get(k, 0.0) - b['emotions'].get(k, 0.0)) <= tolerance for k in b['emotions'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('frames_dir', type=Path)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--iterations', type=int, default=20, help="answers analyzed per thread")
+    parser.add_argument('--frames-per-answer', type=int, default=10)
+    parser.add_argument('--batch-wait-ms', type=float, default=0.0, help="micro-batcher wait (0 = off)")
+    args = parser.parse_args()
+
+    frames = [p.read_bytes() for p in image_paths(args.frames_dir)]
+    if not frames:
+        sys.exit(f"No frames in {args.frames_dir}")
+    # Rotate through the frames so threads analyze different answers
+    answers = [
+        [frames[(start + i) % len(frames)] for i in range(args.frames_per_answer)]
+        for start in range(min(len(frames), args.threads))
+    ]
+
+    analyzer = FacialExpressionAnalyzer(batch_max_wait_ms=args.batch_wait_ms)
+    expected = [analyzer.analyze_video_frames(answer) for answer in answers]
+
+    mismatches = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(thread_index):
+        for iteration in range(args.iterations):
+            answer_index = (thread_index + iteration) % len(answers)
+            try:
+                result = analyzer.analyze_video_frames(answers[answer_index])
+            except Exception as e:
+                with lock:
+                    errors.append(f"thread {thread_index}: {e!r}")
+                continue
+            if not same_result(result, expected[answer_index]):
+                with lock:
+                    mismatches.append((thread_index, answer_index, result.get('emotions')))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = args.threads * args.iterations
+    print(f"\n{total} answers ({args.frames_per_answer} frames each) on {args.threads} threads "
+          f"in {elapsed:.1f}s: {total / elapsed:.1f} answers/s")
+    print(f"  errors: {len(errors)}, mismatched results: {len(mismatches)}")
+    for message in errors[:5]:
+        print(f"    {message}")
+    for thread_index, answer_index, emotions in mismatches[:5]:
+        print(f"    thread {thread_index} answer {answer_index}: {emotions}")
+    stats = analyzer.get_inference_stats()
+    if stats:
+        print(f"  batcher: {stats['batches']} batches, avg {stats['avg_batch_rows']} rows, "
+              f"peak queue {stats['max_queue_depth']}, histogram {stats['batch_size_histogram']}")
+    sys.exit(1 if errors or mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -20,4 +20,127 @@ DIFFICULTY_MAPPING = {
 
 # Temperature for AI creativity (0.0 = deterministic, 1.0 = creative)
 # Higher value = more unique questions each time  
-TEMPERATURE = 1.2  # Very high creativity for maximum uniqueness
\ No newline at end of file
+TEMPERATURE = 1.2  # Very high creativity for maximum uniqueness
+
+# Per-task generation profiles
+# Question generation keeps TEMPERATURE; answer scoring only needs three short lines
+QUESTION_MAX_OUTPUT_TOKENS = int(os.environ.get('QUESTION_MAX_OUTPUT_TOKENS', '1024'))
+SCORING_TEMPERATURE = float(os.environ.get('SCORING_TEMPERATURE', '0.2'))
+SCORING_MAX_OUTPUT_TOKENS = int(os.environ.get('SCORING_MAX_OUTPUT_TOKENS', '256'))
+# The scoring prompt asks the model to end its reply with this marker
+SCORING_STOP_SEQUENCES = ['###']
+
+# Local content scorer (first tier of the answer scoring cascade)
+# Answers scored locally with at least LOCAL_SCORER_MIN_CONFIDENCE skip Gemini
+LOCAL_SCORER_ENABLED = os.environ.get('LOCAL_SCORER_ENABLED', 'true').lower() == 'true'
+LOCAL_SCORER_MIN_CONFIDENCE = float(os.environ.get('LOCAL_SCORER_MIN_CONFIDENCE', '0.8'))
+LOCAL_SCORER_SHORT_ANSWER_WORDS = int(os.environ.get('LOCAL_SCORER_SHORT_ANSWER_WORDS', '8'))
+LOCAL_SCORER_STRONG_ANSWER_WORDS = int(os.environ.get('LOCAL_SCORER_STRONG_ANSWER_WORDS', '60'))
+
+# Latency budget for /api/analyze-resume (clients may send a shorter or longer
+# budget in milliseconds via the DEADLINE_HEADER request header, clamped to at
+# most RESUME_DEADLINE_MAX_SECONDS)
+RESUME_DEADLINE_SECONDS = float(os.environ.get('RESUME_DEADLINE_SECONDS', '25'))
+RESUME_DEADLINE_MAX_SECONDS = float(os.environ.get('RESUME_DEADLINE_MAX_SECONDS', str(RESUME_DEADLINE_SECONDS)))
+DEADLINE_HEADER = 'X-Request-Deadline-Ms'
+# Skip Gemini and use the offline question bank below this much remaining budget
+GEMINI_MIN_BUDGET_SECONDS = float(os.environ.get('GEMINI_MIN_BUDGET_SECONDS', '4'))
+# Budget kept back from PDF extraction for the stages after it
+RESUME_STAGE_RESERVE_SECONDS = float(os.environ.get('RESUME_STAGE_RESERVE_SECONDS', '1'))
+
+# Model backend: 'gemini' (google.generativeai) or 'http' (a JSON model service
+# such as fake_model_server.py, for offline load tests and benchmarks)
+MODEL_BACKEND = os.environ.get('MODEL_BACKEND', 'gemini')
+MODEL_BACKEND_URL = os.environ.get('MODEL_BACKEND_URL', 'http://127.0.0.1:8765')
+
+# Bulk sentiment analysis (persistent process pool); 0 workers = min(4, CPU count)
+SENTIMENT_BATCH_WORKERS = int(os.environ.get('SENTIMENT_BATCH_WORKERS', '0'))
+SENTIMENT_BATCH_CHUNK_SIZE = int(os.environ.get('SENTIMENT_BATCH_CHUNK_SIZE', '0'))
+
+# Live transcript streams are dropped after this long without a delta
+ANSWER_STREAM_TTL_SECONDS = float(os.environ.get('ANSWER_STREAM_TTL_SECONDS', '900'))
+
+# Sentiment polarity backend: 'both' (VADER + TextBlob), 'vader', 'textblob',
+# or 'lexical' (no polarity model, lexical features only - fastest)
+SENTIMENT_BACKEND = os.environ.get('SENTIMENT_BACKEND', 'both')
+
+# Threads for decoding video frames and detecting faces (0 = min(4, CPU count))
+FRAME_WORKERS = int(os.environ.get('FRAME_WORKERS', '0'))
+
+# Decode video frames at 1/N resolution (1, 2, 4 or 8); JPEG downsamples while decoding
+FRAME_DECODE_REDUCTION = int(os.environ.get('FRAME_DECODE_REDUCTION', '1'))
+
+# Face tracking: full face detection every Nth frame (1 = every frame); frames in
+# between search FACE_TRACK_MARGIN box sizes around the nearest keyframe's face
+FACE_KEYFRAME_INTERVAL = int(os.environ.get('FACE_KEYFRAME_INTERVAL', '4'))
+FACE_TRACK_MARGIN = float(os.environ.get('FACE_TRACK_MARGIN', '0.5'))
+
+# Full-frame face detection runs on a copy this many pixels wide (0 = full size),
+# with this Haar pyramid step and minimum face size as a fraction of that width
+FACE_DETECT_WIDTH = int(os.environ.get('FACE_DETECT_WIDTH', '320'))
+FACE_DETECT_SCALE_FACTOR = float(os.environ.get('FACE_DETECT_SCALE_FACTOR', '1.1'))
+FACE_MIN_SIZE_RATIO = float(os.environ.get('FACE_MIN_SIZE_RATIO', '0.1'))
+
+# FER+ model variant: 'fp32', 'int8' (quantized) or 'optimized' (pre-optimized graph)
+EMOTION_MODEL_VARIANT = os.environ.get('EMOTION_MODEL_VARIANT', 'fp32')
+# onnxruntime SessionOptions: graph optimization 'disabled'/'basic'/'extended'/'all',
+# execution mode 'sequential'/'parallel', thread counts (0 = onnxruntime default)
+ORT_GRAPH_OPTIMIZATION = os.environ.get('ORT_GRAPH_OPTIMIZATION', 'all')
+ORT_EXECUTION_MODE = os.environ.get('ORT_EXECUTION_MODE', 'sequential')
+ORT_INTRA_OP_THREADS = int(os.environ.get('ORT_INTRA_OP_THREADS', '0'))
+ORT_INTER_OP_THREADS = int(os.environ.get('ORT_INTER_OP_THREADS', '0'))
+
+# Model artifact cache: where downloaded models live, whether the network may be
+# used at all, download timeout, and an optional pinned SHA-256 for the FER+ model.
+# Without a pin, the hash seen on first download is recorded in manifest.json once
+# the file passes an ONNX format check; pin it in production (sha256sum of a trusted copy).
+MODEL_ARTIFACT_DIR = os.environ.get('MODEL_ARTIFACT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+MODEL_OFFLINE = os.environ.get('MODEL_OFFLINE', 'false').lower() == 'true'
+MODEL_DOWNLOAD_TIMEOUT_SECONDS = float(os.environ.get('MODEL_DOWNLOAD_TIMEOUT_SECONDS', '30'))
+FER_MODEL_SHA256 = os.environ.get('FER_MODEL_SHA256', '')
+# Dummy batch run through the emotion model at startup (0 = skip warm-up)
+EMOTION_WARMUP_BATCH = int(os.environ.get('EMOTION_WARMUP_BATCH', '1'))
+
+# Video frames whose perceptual hash (64-bit dHash) differs from an earlier frame
+# by at most this many bits reuse that frame's emotions (0 = analyze every frame)
+FRAME_DEDUPE_DISTANCE = int(os.environ.get('FRAME_DEDUPE_DISTANCE', '4'))
+
+# Early exit for video emotions: score frames a few at a time (spread across the
+# answer) and stop once the 95% confidence intervals of the dominant emotion and
+# of negative_sum are narrower than +/- this tolerance (0 = score every frame,
+# the default). Opt in only after checking interview_state and emotion_score
+# against full scoring on your own recordings; 0.05 is a reasonable start.
+EMOTION_CONVERGENCE_TOLERANCE = float(os.environ.get('EMOTION_CONVERGENCE_TOLERANCE', '0'))
+EMOTION_CONVERGENCE_MIN_FRAMES = int(os.environ.get('EMOTION_CONVERGENCE_MIN_FRAMES', '4'))
+EMOTION_CONVERGENCE_STEP = int(os.environ.get('EMOTION_CONVERGENCE_STEP', '2'))
+
+# Cross-request micro-batching for the FER+ model (off by default): when crops
+# from other requests are already queued, wait up to this long for more before
+# running (0 = off), capped at this many crops. A lone request never waits.
+EMOTION_BATCH_MAX_WAIT_MS = float(os.environ.get('EMOTION_BATCH_MAX_WAIT_MS', '0'))
+EMOTION_BATCH_MAX_SIZE = int(os.environ.get('EMOTION_BATCH_MAX_SIZE', '32'))
+
+# Whole-answer video clips: keyframes are picked by accumulated motion (fraction
+# of thumbnail pixels changed, summed over frames), histogram scene changes
+# (Bhattacharyya distance) or a maximum gap, at most CLIP_MAX_KEYFRAMES per clip.
+# MJPEG carries no timing, so its frames are timestamped at CLIP_MJPEG_FPS.
+# Uploads over CLIP_MAX_BYTES are refused (HTTP 413); decoding stops after
+# CLIP_MAX_DECODED_FRAMES frames or CLIP_MAX_SECONDS of video.
+CLIP_MAX_KEYFRAMES = int(os.environ.get('CLIP_MAX_KEYFRAMES', '24'))
+CLIP_MAX_DECODED_FRAMES = int(os.environ.get('CLIP_MAX_DECODED_FRAMES', '1800'))
+CLIP_MAX_BYTES = int(os.environ.get('CLIP_MAX_BYTES', str(50 * 1024 * 1024)))
+CLIP_MAX_SECONDS = float(os.environ.get('CLIP_MAX_SECONDS', '300'))
+CLIP_MJPEG_FPS = float(os.environ.get('CLIP_MJPEG_FPS', '10'))
+CLIP_MOTION_THRESHOLD = float(os.environ.get('CLIP_MOTION_THRESHOLD', '0.3'))
+CLIP_SCENE_THRESHOLD = float(os.environ.get('CLIP_SCENE_THRESHOLD', '0.3'))
+CLIP_MIN_KEYFRAME_GAP_SECONDS = float(os.environ.get('CLIP_MIN_KEYFRAME_GAP_SECONDS', '0.5'))
+CLIP_MAX_KEYFRAME_GAP_SECONDS = float(os.environ.get('CLIP_MAX_KEYFRAME_GAP_SECONDS', '4'))
+
+# Face detector backend: 'haar' (bundled with OpenCV), 'lbp' (local cascade XML)
+# or 'dnn' (local ResNet-10 SSD Caffe files, batched across frames). Model files
+# are not downloaded; a backend that can't load falls back to 'haar'.
+FACE_DETECTOR_BACKEND = os.environ.get('FACE_DETECTOR_BACKEND', 'haar')
+FACE_LBP_CASCADE_PATH = os.environ.get('FACE_LBP_CASCADE_PATH', os.path.join(MODEL_ARTIFACT_DIR, 'lbpcascade_frontalface_improved.xml'))
+FACE_DNN_PROTOTXT_PATH = os.environ.get('FACE_DNN_PROTOTXT_PATH', os.path.join(MODEL_ARTIFACT_DIR, 'deploy.prototxt'))
+FACE_DNN_MODEL_PATH = os.environ.get('FACE_DNN_MODEL_PATH', os.path.join(MODEL_ARTIFACT_DIR, 'res10_300x300_ssd_iter_140000.caffemodel'))
+FACE_DNN_CONFIDENCE = float(os.environ.get('FACE_DNN_CONFIDENCE', '0.5'))
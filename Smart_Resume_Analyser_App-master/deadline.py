@@ -0,0 +1,93 @@
+"""
+Request Deadline Module
+Carries a per-request latency budget through the resume pipeline so each
+stage can check what is left and degrade instead of overrunning the SLO
+"""
+
+import math
+import time
+from typing import Dict, List, Optional
+
+
+class Deadline:
+    """Time budget for one request, passed to every pipeline stage"""
+
+    # Shortest budget a client may ask for; below this every stage would degrade
+    MIN_BUDGET_SECONDS = 1.0
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = max(0.0, float(budget_seconds))
+        self.started = time.monotonic()
+        self.expires_at = self.started + self.budget_seconds
+        self.degraded_stages: List[Dict[str, str]] = []
+        self.stage_timings: Dict[str, int] = {}
+        self._last_checkpoint = self.started
+
+    @classmethod
+    def from_headers(
+        cls,
+        headers,
+        header_name: str,
+        default_seconds: float,
+        max_seconds: Optional[float] = None
+    ) -> 'Deadline':
+        """
+        Build a deadline from a millisecond budget header, falling back to the
+        config default. Requested budgets are clamped to
+        [MIN_BUDGET_SECONDS, max_seconds] (max_seconds defaults to the config
+        default, so clients can shorten the budget but not extend it);
+        non-finite or non-positive values are ignored.
+        """
+        budget_seconds = default_seconds
+        upper = default_seconds if max_seconds is None else max_seconds
+        raw_value: Optional[str] = headers.get(header_name) if headers else None
+        if raw_value:
+            try:
+                requested = float(raw_value) / 1000.0
+            except (TypeError, ValueError):
+                requested = None
+            if requested is None or not math.isfinite(requested) or requested <= 0:
+                print(f"⚠️ Ignoring invalid {header_name} header: {raw_value!r}")
+            else:
+                budget_seconds = min(max(requested, cls.MIN_BUDGET_SECONDS), upper)
+        return cls(budget_seconds)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        """Seconds since the request started"""
+        return time.monotonic() - self.started
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def allows(self, seconds: float) -> bool:
+        """True if at least `seconds` of budget is left"""
+        return self.remaining() >= seconds
+
+    def checkpoint(self, stage: str) -> float:
+        """Record how long a stage took and return the budget left for the next one"""
+        now = time.monotonic()
+        self.stage_timings[stage] = int((now - self._last_checkpoint) * 1000)
+        self._last_checkpoint = now
+        return self.remaining()
+
+    def degrade(self, stage: str, reason: str):
+        """Record that a stage took its fallback path"""
+        self.degraded_stages.append({'stage': stage, 'reason': reason})
+        print(f"⏱️ Stage '{stage}' degraded: {reason} ({self.remaining():.2f}s left)")
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.degraded_stages)
+
+    def summary(self) -> Dict:
+        """Budget report for the API response"""
+        return {
+            'budgetMs': int(self.budget_seconds * 1000),
+            'elapsedMs': int(self.elapsed() * 1000),
+            'remainingMs': int(self.remaining() * 1000),
+            'stageMs': dict(self.stage_timings)
+        }
@@ -0,0 +1,118 @@
+"""
+Emotion Model Variants
+Registry of FER+ ONNX builds derived from the fp32 model zoo file, plus the
+onnxruntime session settings used to load them:
+
+- fp32: the downloaded model as-is
+- int8: dynamically quantized weights (onnxruntime.quantization)
+- optimized: graph-optimized by onnxruntime and serialized, so sessions
+  skip the optimization passes at load time
+
+Derived variants are built next to the fp32 file on first use, by one
+process at a time.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from model_artifacts import file_lock, unique_temp_path
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    'disabled': 'ORT_DISABLE_ALL',
+    'basic': 'ORT_ENABLE_BASIC',
+    'extended': 'ORT_ENABLE_EXTENDED',
+    'all': 'ORT_ENABLE_ALL',
+}
+EXECUTION_MODES = {
+    'sequential': 'ORT_SEQUENTIAL',
+    'parallel': 'ORT_PARALLEL',
+}
+
+
+def make_session_options(
+    graph_optimization: str = 'all',
+    execution_mode: str = 'sequential',
+    intra_op_threads: int = 0,
+    inter_op_threads: int = 0
+):
+    """onnxruntime SessionOptions from config names (0 threads = onnxruntime's default)"""
+    import onnxruntime as ort
+
+    if graph_optimization not in GRAPH_OPTIMIZATION_LEVELS:
+        raise ValueError(f"graph_optimization must be one of: {', '.join(GRAPH_OPTIMIZATION_LEVELS)}")
+    if execution_mode not in EXECUTION_MODES:
+        raise ValueError(f"execution_mode must be one of: {', '.join(EXECUTION_MODES)}")
+    options = ort.SessionOptions()
+    options.graph_optimization_level = getattr(ort.GraphOptimizationLevel, GRAPH_OPTIMIZATION_LEVELS[graph_optimization])
+    options.execution_mode = getattr(ort.ExecutionMode, EXECUTION_MODES[execution_mode])
+    if intra_op_threads:
+        options.intra_op_num_threads = intra_op_threads
+    if inter_op_threads:
+        options.inter_op_num_threads = inter_op_threads
+    return options
+
+
+def _build_int8(fp32_path: Path, output_path: Path):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(str(fp32_path), str(output_path), weight_type=QuantType.QInt8)
+
+
+def _build_optimized(fp32_path: Path, output_path: Path):
+    import onnxruntime as ort
+
+    # 'extended' rather than 'all': layout-specific fusions from 'all' make
+    # the serialized model tied to the machine that built it
+    options = make_session_options(graph_optimization='extended')
+    options.optimized_model_filepath = str(output_path)
+    ort.InferenceSession(str(fp32_path), sess_options=options, providers=['CPUExecutionProvider'])
+
+
+# Variant name -> (filename suffix, builder from the fp32 model or None)
+EMOTION_MODEL_VARIANTS = {
+    'fp32': ('', None),
+    'int8': ('.int8', _build_int8),
+    'optimized': ('.opt', _build_optimized),
+}
+
+
+def variant_path(fp32_path: Path, variant: str) -> Path:
+    if variant not in EMOTION_MODEL_VARIANTS:
+        raise ValueError(f"Unknown emotion model variant '{variant}'. Choose from: {', '.join(EMOTION_MODEL_VARIANTS)}")
+    suffix, _ = EMOTION_MODEL_VARIANTS[variant]
+    return fp32_path.with_name(f"{fp32_path.stem}{suffix}{fp32_path.suffix}")
+
+
+def ensure_variant(fp32_path: Path, variant: str) -> Path:
+    """Path to the variant's model file, building it from the fp32 model if it's missing"""
+    path = variant_path(fp32_path, variant)
+    _, build = EMOTION_MODEL_VARIANTS[variant]
+    if build is None or path.exists():
+        return path
+
+    # Other server processes may be starting on the same cold cache
+    with file_lock(path.with_name(f".{path.name}.lock")):
+        if path.exists():
+            return path
+        print(f"🔧 Building {variant} FER+ model variant...")
+        tmp_path = unique_temp_path(path)
+        try:
+            build(fp32_path, tmp_path)
+            tmp_path.replace(path)
+            path.chmod(0o444)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    print(f"✅ Saved {variant} FER+ model to {path}")
+    return path
+
+
+def create_session(model_path: Path, session_config: Optional[Dict] = None):
+    """CPU InferenceSession for a model file with explicit SessionOptions"""
+    import onnxruntime as ort
+
+    return ort.InferenceSession(
+        str(model_path),
+        sess_options=make_session_options(**(session_config or {})),
+        providers=['CPUExecutionProvider']
+    )
@@ -0,0 +1,162 @@
+"""
+Face Detector Backends
+Interchangeable face detectors for FacialExpressionAnalyzer, selected by name:
+
+- haar: OpenCV's frontal-face Haar cascade (bundled with opencv-python)
+- lbp: an LBP cascade from a local XML file, e.g. OpenCV's
+  lbpcascade_frontalface_improved.xml; faster than Haar, a little less robust
+- dnn: OpenCV's ResNet-10 SSD face detector from local Caffe files
+  (deploy.prototxt + res10_300x300_ssd_iter_140000.caffemodel); the most
+  robust to pose and lighting, and it can detect over a batch of frames in
+  one forward pass
+
+Model files are never downloaded here; point the config at local copies.
+"""
+
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+
+class FaceDetector:
+    """
+    Finds faces in grayscale frames. detect() returns every (x, y, w, h)
+    box with sides between min_size and max_size. Backends with
+    supports_batch set detect a list of frames faster through
+    detect_batch() than one at a time. Instances are shared across threads.
+    """
+
+    name = ''
+    supports_batch = False
+
+    def detect(self, gray: np.ndarray, min_size: int, max_size: Optional[int] = None, scale_factor: float = 1.1) -> List[Box]:
+        raise NotImplementedError
+
+    def detect_batch(self, grays: List[np.ndarray], min_size: int, scale_factor: float = 1.1) -> List[List[Box]]:
+        return [self.detect(gray, min_size, scale_factor=scale_factor) for gray in grays]
+
+
+class CascadeDetector(FaceDetector):
+    """Haar or LBP cascade; each thread loads its own CascadeClassifier, since one isn't safe to share"""
+
+    def __init__(self, cascade_path: str, name: str):
+        self.cascade_path = str(cascade_path)
+        self.name = name
+        self._thread_local = threading.local()
+        # Load once up front so a bad path fails here, not on the first request
+        if cv2.CascadeClassifier(self.cascade_path).empty():
+            raise RuntimeError(f"Could not load {name} cascade from {self.cascade_path}")
+
+    def _classifier(self):
+        classifier = getattr(self._thread_local, 'classifier', None)
+        if classifier is None:
+            classifier = cv2.CascadeClassifier(self.cascade_path)
+            self._thread_local.classifier = classifier
+        return classifier
+
+    def detect(self, gray, min_size, max_size=None, scale_factor=1.1):
+        faces = self._classifier().detectMultiScale(
+            gray,
+            scaleFactor=scale_factor,
+            minNeighbors=5,
+            minSize=(min_size, min_size),
+            maxSize=(max_size, max_size) if max_size else (0, 0)
+        )
+        return [tuple(int(v) for v in face) for face in faces]
+
+
+class DnnSsdDetector(FaceDetector):
+    """
+    ResNet-10 SSD face detector through cv2.dnn. Frames are resized to
+    300x300; a batch goes through blobFromImages and one forward pass, and
+    the detections are split back per frame by their image index. Each
+    thread gets its own Net, since forward() isn't safe to call concurrently.
+    """
+
+    name = 'dnn'
+    supports_batch = True
+    # Frames per forward pass (each costs ~1 MB of float32 input)
+    max_batch = 16
+    input_size = (300, 300)
+    mean = (104.0, 177.0, 123.0)
+
+    def __init__(self, prototxt_path: str, model_path: str, confidence: float = 0.5):
+        for path in (prototxt_path, model_path):
+            if not Path(path).exists():
+                raise RuntimeError(f"DNN face detector file not found: {path}")
+        self.prototxt_path = str(prototxt_path)
+        self.model_path = str(model_path)
+        self.confidence = confidence
+        self._thread_local = threading.local()
+        self._net()
+
+    def _net(self):
+        net = getattr(self._thread_local, 'net', None)
+        if net is None:
+            net = cv2.dnn.readNetFromCaffe(self.prototxt_path, self.model_path)
+            self._thread_local.net = net
+        return net
+
+    def _forward(self, grays: List[np.ndarray]) -> np.ndarray:
+        # The network was trained on BGR input
+        images = [cv2.cvtColor(cv2.resize(gray, self.input_size), cv2.COLOR_GRAY2BGR) for gray in grays]
+        net = self._net()
+        net.setInput(cv2.dnn.blobFromImages(images, 1.0, self.input_size, self.mean))
+        # (1, 1, detections, 7): image index, class, confidence, x0, y0, x1, y1 (0-1)
+        return net.forward()[0, 0]
+
+    def _boxes(self, detections: np.ndarray, shape, min_size: int, max_size: Optional[int]) -> List[Box]:
+        height, width = shape[:2]
+        boxes = []
+        for _, _, confidence, x0, y0, x1, y1 in detections:
+            if confidence < self.confidence:
+                continue
+            x0, x1 = int(max(0.0, x0) * width), int(min(1.0, x1) * width)
+            y0, y1 = int(max(0.0, y0) * height), int(min(1.0, y1) * height)
+            w, h = x1 - x0, y1 - y0
+            if min(w, h) < min_size or (max_size and max(w, h) > max_size):
+                continue
+            boxes.append((x0, y0, w, h))
+        return boxes
+
+    def detect(self, gray, min_size, max_size=None, scale_factor=1.1):
+        return self._boxes(self._forward([gray]), gray.shape, min_size, max_size)
+
+    def detect_batch(self, grays, min_size, scale_factor=1.1):
+        results = []
+        for start in range(0, len(grays), self.max_batch):
+            chunk = grays[start:start + self.max_batch]
+            detections = self._forward(chunk)
+            for index, gray in enumerate(chunk):
+                rows = detections[detections[:, 0] == index]
+                results.append(self._boxes(rows, gray.shape, min_size, None))
+        return results
+
+
+FACE_DETECTOR_BACKENDS = {'haar', 'lbp', 'dnn'}
+
+
+def create_face_detector(
+    name: str = 'haar',
+    lbp_cascade_path: Optional[str] = None,
+    dnn_prototxt_path: Optional[str] = None,
+    dnn_model_path: Optional[str] = None,
+    dnn_confidence: float = 0.5
+) -> FaceDetector:
+    """Detector backend by config name; raises if its model files can't be loaded"""
+    if name == 'haar':
+        return CascadeDetector(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml', 'haar')
+    if name == 'lbp':
+        if not lbp_cascade_path:
+            raise RuntimeError("The lbp face detector needs a cascade XML path")
+        return CascadeDetector(lbp_cascade_path, 'lbp')
+    if name == 'dnn':
+        if not dnn_prototxt_path or not dnn_model_path:
+            raise RuntimeError("The dnn face detector needs prototxt and caffemodel paths")
+        return DnnSsdDetector(dnn_prototxt_path, dnn_model_path, dnn_confidence)
+    raise ValueError(f"Unknown face detector '{name}'. Choose from: {', '.join(sorted(FACE_DETECTOR_BACKENDS))}")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the Gemini API used by api.py when MODEL_BACKEND=http.
+
+Returns well-formed numbered question lists and SCORE/GOOD/IMPROVE replies
+with configurable latency and failure modes, so load tests and benchmarks run
+offline and repeatably.
+
+Usage:
+    python fake_model_server.py --port 8765 --latency lognormal:0.6,0.4 \
+        --error-rate 0.02 --block-rate 0.01 --empty-rate 0.01 --seed 42
+    MODEL_BACKEND=http MODEL_BACKEND_URL=http://127.0.0.1:8765 python api.py
+
+Latency specs (seconds):
+    fixed:S               always S
+    lognormal:MEDIAN,SIG  log-normal with the given median and sigma
+    longtail:MEDIAN,P,X   log-normal (sigma 0.25) around MEDIAN, except a
+                          fraction P of calls take X times longer
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUESTION_POOL = [
+    "So what's been your biggest headache working with your main stack?",
+    "I noticed a project on your resume - what made you pick that architecture?",
+    "When something broke in production, how did you track it down?",
+    "What's one thing you wish you'd known earlier about the tools you use daily?",
+    "How do you decide when code is good enough to ship?",
+    "What's a technical decision you'd make differently today?",
+    "If you had a week to learn something new, what would it be and why?",
+    "How do you keep a growing codebase from turning into spaghetti?",
+    "What's the trickiest bug you've chased down, and what gave it away?",
+    "How would you scale the project you're proudest of to ten times the users?",
+    "What do you look for when reviewing someone else's code?",
+    "When requirements change halfway through, how do you adapt?",
+]
+
+GOOD_POINTS = [
+    "Clear explanation of core concepts with practical examples",
+    "Structured answer that stays on the question",
+    "Good use of a concrete project example",
+]
+IMPROVE_POINTS = [
+    "Could mention performance trade-offs and edge cases",
+    "Add measurable results to back up the claims",
+    "Explain the reasoning behind the chosen approach",
+]
+
+
+def parse_latency(spec):
+    """Turn a latency spec string into a sampler that takes an RNG and returns seconds"""
+    kind, _, raw_args = spec.partition(':')
+    args = [float(a) for a in raw_args.split(',') if a]
+    if kind == 'fixed':
+        return lambda rng: args[0] if args else 0.0
+    if kind == 'lognormal':
+        median, sigma = args[:2]
+        return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    if kind == 'longtail':
+        median, tail_p, tail_x = args[:3]
+
+        def sample(rng):
+            base = rng.lognormvariate(math.log(median), 0.25)
+            return base * tail_x if rng.random() < tail_p else base
+        return sample
+    raise ValueError(f"Unknown latency spec '{spec}' (use fixed:, lognormal: or longtail:)")
+
+
+def count_tokens(text):
+    """Rough token estimate (about four characters per token, like Gemini's English average)"""
+    return max(1, len(text) // 4)
+
+
+def apply_generation_config(text, generation_config):
+    """Honour stop_sequences and max_output_tokens like the real API, returns (text, finish_reason)"""
+    for stop in generation_config.get('stop_sequences') or []:
+        if stop in text:
+            text = text[:text.index(stop)]
+    max_tokens = generation_config.get('max_output_tokens')
+    if max_tokens and count_tokens(text) > max_tokens:
+        return text[:max_tokens * 4], 'MAX_TOKENS'
+    return text, 'STOP'
+
+
+class FakeModel:
+    """Reply generator plus failure injection, shared by all handler threads"""
+
+    def __init__(self, latency, error_rate, block_rate, empty_rate, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.block_rate = block_rate
+        self.empty_rate = empty_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'blocked': 0, 'empty': 0}
+
+    def draw(self):
+        """Pick latency and outcome under the lock so seeded runs are repeatable"""
+        with self.lock:
+            self.stats['requests'] += 1
+            delay = self.latency(self.rng)
+            roll = self.rng.random()
+            rng_state = self.rng.random()
+        if roll < self.error_rate:
+            outcome = 'error'
+        elif roll < self.error_rate + self.block_rate:
+            outcome = 'blocked'
+        elif roll < self.error_rate + self.block_rate + self.empty_rate:
+            outcome = 'empty'
+        else:
+            outcome = 'ok'
+        if outcome != 'ok':
+            with self.lock:
+                self.stats['errors' if outcome == 'error' else outcome] += 1
+        return delay, outcome, random.Random(rng_state)
+
+    @staticmethod
+    def reply_text(task, prompt, rng):
+        if task == 'scoring':
+            answer = prompt.split('ANSWER:', 1)[-1]
+            words = len(answer.split())
+            score = max(1, min(10, 3 + words // 15 + rng.randint(-1, 1)))
+            return (
+                f"SCORE: {score}\n"
+                f"GOOD: {rng.choice(GOOD_POINTS)}\n"
+                f"IMPROVE: {rng.choice(IMPROVE_POINTS)}\n###"
+            )
+        match = re.search(r'exactly (\d+) questions', prompt)
+        count = int(match.group(1)) if match else 5
+        questions = rng.sample(QUESTION_POOL, min(count, len(QUESTION_POOL)))
+        return "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+
+    def generate(self, body):
+        """Returns (http_status, payload)"""
+        delay, outcome, rng = self.draw()
+        time.sleep(delay)
+
+        prompt = body.get('prompt', '')
+        prompt_tokens = count_tokens(prompt)
+        if outcome == 'error':
+            return 503, {'error': {'code': 503, 'message': 'The model is overloaded. Please try again later.'}}
+        if outcome == 'blocked':
+            return 200, {
+                'candidates': [{'finish_reason': 'SAFETY', 'content': {'parts': []}}],
+                'prompt_feedback': {'block_reason': 'SAFETY'},
+                'usage_metadata': {'prompt_token_count': prompt_tokens, 'candidates_token_count': 0}
+            }
+        if outcome == 'empty':
+            return 200, {
+                'candidates': [],
+                'prompt_feedback': {},
+                'usage_metadata': {'prompt_token_count': prompt_tokens, 'candidates_token_count': 0}
+            }
+
+        text = self.reply_text(body.get('task'), prompt, rng)
+        text, finish_reason = apply_generation_config(text, body.get('generation_config') or {})
+        return 200, {
+            'candidates': [{'finish_reason': finish_reason, 'content': {'parts': [{'text': text}]}}],
+            'prompt_feedback': {},
+            'usage_metadata': {
+                'prompt_token_count': prompt_tokens,
+                'candidates_token_count': count_tokens(text)
+            }
+        }
+
+
+def make_handler(fake_model):
+    class FakeModelHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                with fake_model.lock:
+                    stats = dict(fake_model.stats)
+                self._send(200, {'status': 'healthy', 'stats': stats})
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send(400, {'error': 'invalid JSON'})
+                return
+            if self.path == '/v1/generate':
+                self._send(*fake_model.generate(body))
+            elif self.path == '/v1/count_tokens':
+                self._send(200, {'total_tokens': count_tokens(body.get('text', ''))})
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            pass  # keep load tests quiet
+
+    return FakeModelHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in for offline load tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='fixed:0.3', help="fixed:S | lognormal:MEDIAN,SIGMA | longtail:MEDIAN,P,X")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of calls answered with HTTP 503")
+    parser.add_argument('--block-rate', type=float, default=0.0, help="fraction of calls answered with a safety block")
+    parser.add_argument('--empty-rate', type=float, default=0.0, help="fraction of calls answered with no candidates")
+    parser.add_argument('--seed', type=int, default=None, help="seed for repeatable latency and failures")
+    args = parser.parse_args()
+
+    fake_model = FakeModel(
+        parse_latency(args.latency),
+        args.error_rate,
+        args.block_rate,
+        args.empty_rate,
+        seed=args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake_model))
+    print(f"🧪 Fake model server on http://{args.host}:{args.port} (latency {args.latency}, "
+          f"errors {args.error_rate:.0%}, blocks {args.block_rate:.0%}, empty {args.empty_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
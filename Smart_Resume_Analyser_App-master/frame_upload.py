@@ -0,0 +1,131 @@
+"""
+Frame Upload Parsing
+Reads video frames from analysis requests in any of the accepted encodings,
+so encoded image bytes reach the decoder without a base64 round trip:
+
+- application/json: base64 strings in a list field (the original format),
+  optional "frame_timestamps" list
+- multipart/form-data: one raw JPEG/WebP file part per frame, other fields as
+  form fields (or a JSON "metadata" field), optional "frame_timestamps" JSON list
+- application/x-frame-stream: a uint32 length + JSON metadata header, then one
+  record per frame: uint32 length, float64 timestamp (seconds, NaN if unknown),
+  encoded image bytes. All integers and floats are big-endian.
+
+Any format can also carry client-side face detection results: "face_boxes",
+one [x, y, w, h] (frame pixels) or null per frame, or "frames_are_faces":
+true when the frames are already face crops.
+"""
+
+import json
+import math
+import struct
+from typing import Dict, List, Optional, Tuple
+
+FRAME_STREAM_CONTENT_TYPE = 'application/x-frame-stream'
+
+_LENGTH = struct.Struct('>I')
+_RECORD_HEADER = struct.Struct('>Id')
+
+
+class FrameUploadError(ValueError):
+    """Malformed frame upload (reported to the client as HTTP 400)"""
+
+
+def _clean_timestamps(timestamps, frame_count: int) -> Optional[List[float]]:
+    """Timestamps as floats, or None unless every frame has a finite one"""
+    if not timestamps or len(timestamps) != frame_count:
+        return None
+    try:
+        cleaned = [float(t) for t in timestamps]
+    except (TypeError, ValueError):
+        return None
+    return cleaned if all(math.isfinite(t) for t in cleaned) else None
+
+
+def parse_frame_stream(body: bytes) -> Tuple[Dict, List[memoryview], Optional[List[float]]]:
+    """Split a length-prefixed binary body into (metadata, frames, timestamps) without copying frames"""
+    view = memoryview(body)
+    if len(view) < _LENGTH.size:
+        raise FrameUploadError("Frame stream is missing its metadata header")
+    (metadata_length,) = _LENGTH.unpack_from(view, 0)
+    offset = _LENGTH.size
+    if offset + metadata_length > len(view):
+        raise FrameUploadError("Frame stream metadata is truncated")
+    try:
+        fields = json.loads(bytes(view[offset:offset + metadata_length])) if metadata_length else {}
+    except ValueError as e:
+        raise FrameUploadError(f"Frame stream metadata is not valid JSON: {e}") from e
+    if not isinstance(fields, dict):
+        raise FrameUploadError("Frame stream metadata must be a JSON object")
+    offset += metadata_length
+
+    frames, timestamps = [], []
+    while offset < len(view):
+        if offset + _RECORD_HEADER.size > len(view):
+            raise FrameUploadError(f"Frame {len(frames) + 1} header is truncated")
+        length, timestamp = _RECORD_HEADER.unpack_from(view, offset)
+        offset += _RECORD_HEADER.size
+        if offset + length > len(view):
+            raise FrameUploadError(f"Frame {len(frames) + 1} is truncated")
+        frames.append(view[offset:offset + length])
+        timestamps.append(timestamp)
+        offset += length
+    return fields, frames, _clean_timestamps(timestamps, len(frames))
+
+
+def parse_frame_request(request, frames_field: str) -> Tuple[Dict, List, Optional[List[float]]]:
+    """
+    Returns (fields, frames, timestamps) for a Flask request. Frames are
+    base64 strings for JSON bodies and raw encoded bytes otherwise;
+    timestamps is None unless every frame has one.
+    """
+    if request.mimetype == 'multipart/form-data':
+        fields = request.form.to_dict()
+        try:
+            metadata = json.loads(fields.pop('metadata')) if 'metadata' in fields else {}
+            raw_timestamps = fields.pop('frame_timestamps', None)
+            timestamps = json.loads(raw_timestamps) if raw_timestamps else None
+        except ValueError as e:
+            raise FrameUploadError(f"Invalid JSON in multipart field: {e}") from e
+        if not isinstance(metadata, dict):
+            raise FrameUploadError("Multipart metadata must be a JSON object")
+        fields.update(metadata)
+        frames = [part.read() for part in request.files.getlist(frames_field)]
+        return fields, frames, _clean_timestamps(timestamps, len(frames))
+
+    if request.mimetype == FRAME_STREAM_CONTENT_TYPE:
+        return parse_frame_stream(request.get_data(cache=False))
+
+    fields = request.get_json(silent=True)
+    if not isinstance(fields, dict):
+        raise FrameUploadError("Request body must be a JSON object")
+    frames = fields.get(frames_field) or []
+    return fields, frames, _clean_timestamps(fields.get('frame_timestamps'), len(frames))
+
+
+def parse_face_hints(fields: Dict, frame_count: int) -> Tuple[Optional[List], bool]:
+    """
+    (face_boxes, frames_are_faces) from request fields. Boxes are only
+    shape-checked here; the analyzer decides whether each one is usable.
+    """
+    face_boxes = fields.get('face_boxes')
+    frames_are_faces = fields.get('frames_are_faces', False)
+    try:
+        # Multipart form fields arrive as JSON text
+        if isinstance(face_boxes, str):
+            face_boxes = json.loads(face_boxes) if face_boxes else None
+    except ValueError as e:
+        raise FrameUploadError(f"Invalid JSON in face_boxes: {e}") from e
+    if isinstance(frames_are_faces, str):
+        frames_are_faces = frames_are_faces.lower() == 'true'
+
+    if face_boxes is not None:
+        if not isinstance(face_boxes, list) or len(face_boxes) != frame_count:
+            raise FrameUploadError("face_boxes must be a list with one entry per frame")
+        for box in face_boxes:
+            if box is not None and not (
+                isinstance(box, list) and len(box) == 4
+                and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in box)
+            ):
+                raise FrameUploadError("Each face box must be [x, y, w, h] or null")
+    return face_boxes, bool(frames_are_faces)
@@ -0,0 +1,13 @@
+"""
+Gunicorn settings for api.py. Threaded (gthread) workers share one copy of
+the analyzers and emotion model per process; see the thread-safety notes on
+FacialExpressionAnalyzer and the db_lock in api.py.
+"""
+
+import os
+
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+# Model loading and warm-up happen at import, before a worker serves requests
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
@@ -0,0 +1,145 @@
+"""
+Inference Batcher
+Process-wide micro-batcher that merges model inputs from concurrent requests
+into one model call
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict
+
+import numpy as np
+
+# Upper bounds of the batch-size histogram buckets (rows per model call)
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class InferenceBatcher:
+    """
+    Callers submit (N, ...) input arrays and get futures back. One worker
+    thread takes the first queued input and, if more are already waiting,
+    keeps collecting for up to max_wait_ms or until max_batch_size rows are
+    gathered; it then runs run_batch once on the concatenation and resolves
+    every future with its own slice. A lone input runs straight away.
+
+    An input is never split, so one large request can exceed max_batch_size
+    on its own. Thread-safe; the worker starts on first use, so creating a
+    batcher before a fork is safe.
+    """
+
+    def __init__(self, run_batch: Callable[[np.ndarray], np.ndarray], max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'batches': 0,
+            'requests': 0,
+            'rows': 0,
+            'max_queue_depth': 0,
+            'total_wait_seconds': 0.0,
+            'total_run_seconds': 0.0,
+            'failures': 0,
+        }
+        self._histogram = {self._bucket(size): 0 for size in BATCH_SIZE_BUCKETS + [BATCH_SIZE_BUCKETS[-1] + 1]}
+
+    @staticmethod
+    def _bucket(size: int) -> str:
+        for bound in BATCH_SIZE_BUCKETS:
+            if size <= bound:
+                return f"<={bound}"
+        return f">{BATCH_SIZE_BUCKETS[-1]}"
+
+    def _ensure_worker(self):
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+                self._worker.start()
+
+    def submit(self, inputs: np.ndarray) -> Future:
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((inputs, future, time.perf_counter()))
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], depth)
+        return future
+
+    def run(self, inputs: np.ndarray, timeout: float = None) -> np.ndarray:
+        """Submit and wait for this input's outputs"""
+        return self.submit(inputs).result(timeout)
+
+    def _collect(self):
+        """Block for the first item, then gather more until the wait or size limit"""
+        items = [self._queue.get()]
+        rows = len(items[0][0])
+        # Nobody else is waiting: don't add latency hoping someone shows up
+        if self._queue.empty():
+            return items, rows
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            rows += len(item[0])
+        return items, rows
+
+    def _run(self):
+        while True:
+            items, rows = self._collect()
+            started = time.perf_counter()
+            try:
+                if len(items) == 1:
+                    outputs = self.run_batch(items[0][0])
+                else:
+                    outputs = self.run_batch(np.concatenate([inputs for inputs, _, _ in items]))
+                offset = 0
+                for inputs, future, _ in items:
+                    future.set_result(outputs[offset:offset + len(inputs)])
+                    offset += len(inputs)
+                failed = False
+            except Exception as e:
+                for _, future, _ in items:
+                    future.set_exception(e)
+                failed = True
+            finished = time.perf_counter()
+            with self._stats_lock:
+                self._stats['batches'] += 1
+                self._stats['requests'] += len(items)
+                self._stats['rows'] += rows
+                self._stats['failures'] += int(failed)
+                self._stats['total_wait_seconds'] += sum(started - queued_at for _, _, queued_at in items)
+                self._stats['total_run_seconds'] += finished - started
+                self._histogram[self._bucket(rows)] += 1
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+            histogram = dict(self._histogram)
+        batches = stats['batches']
+        requests = stats['requests']
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': round(self.max_wait * 1000, 2),
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': stats['max_queue_depth'],
+            'batches': batches,
+            'requests': requests,
+            'rows': stats['rows'],
+            'failures': stats['failures'],
+            'avg_batch_rows': round(stats['rows'] / batches, 2) if batches else 0,
+            'avg_requests_per_batch': round(requests / batches, 2) if batches else 0,
+            'avg_queue_wait_ms': round(stats['total_wait_seconds'] / requests * 1000, 2) if requests else 0,
+            'avg_run_ms': round(stats['total_run_seconds'] / batches * 1000, 2) if batches else 0,
+            'batch_size_histogram': histogram,
+        }
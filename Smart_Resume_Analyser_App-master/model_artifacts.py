@@ -0,0 +1,225 @@
+"""
+Model Artifact Cache
+Local directory of downloaded model files, verified by SHA-256 before use.
+
+Checksums come from pins passed in by config or, for files without a pin,
+from manifest.json in the artifact directory, which records each file's
+hash the first time it is fetched (trust on first use). An unpinned file is
+only recorded after it passes a format check (see looks_like_onnx), so a
+truncated download or an HTML error page is never trusted. In offline mode the
+cache never touches the network and fails fast if a file is missing or
+doesn't match its checksum.
+
+Several server processes can start on a cold cache at once, so fetches
+take an exclusive file lock on the artifact directory and every write goes
+to a temporary file unique to the writer before being renamed into place.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking is per process only
+    fcntl = None
+
+MANIFEST_FILENAME = 'manifest.json'
+LOCK_FILENAME = '.lock'
+# Smaller than any real model; error pages and truncated downloads usually are
+MIN_MODEL_BYTES = 1024
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def file_lock(lock_path: Path):
+    """Exclusive lock on lock_path shared by every process on this host (flock)"""
+    with open(lock_path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def unique_temp_path(path: Path) -> Path:
+    """New empty file next to path that no other writer will use"""
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    os.close(fd)
+    return Path(name)
+
+
+def looks_like_onnx(path: Path) -> bool:
+    """
+    Cheap sanity check for an ONNX file: big enough and starting with the
+    ModelProto ir_version field (protobuf tag 0x08). When the onnx package
+    is installed the model is also loaded and run through its checker.
+    """
+    try:
+        if path.stat().st_size < MIN_MODEL_BYTES:
+            return False
+        with open(path, 'rb') as f:
+            if f.read(1) != b'\x08':
+                return False
+    except OSError:
+        return False
+    if importlib.util.find_spec('onnx') is None:
+        return True
+    import onnx
+
+    try:
+        onnx.checker.check_model(str(path))
+    except Exception as e:
+        print(f"⚠️ {path.name} failed the ONNX checker: {e}")
+        return False
+    return True
+
+
+class ModelArtifactCache:
+    """Fetches model files into artifact_dir and verifies them against pinned or recorded checksums"""
+
+    def __init__(
+        self,
+        artifact_dir: Path,
+        offline: bool = False,
+        download_timeout: float = 30.0,
+        pinned_checksums: Optional[Dict[str, str]] = None
+    ):
+        self.artifact_dir = Path(artifact_dir)
+        self.offline = offline
+        self.download_timeout = download_timeout
+        self.pinned_checksums = {name: digest.lower() for name, digest in (pinned_checksums or {}).items() if digest}
+        self._lock = threading.Lock()
+
+    def path(self, filename: str) -> Path:
+        return self.artifact_dir / filename
+
+    def _manifest_path(self) -> Path:
+        return self.artifact_dir / MANIFEST_FILENAME
+
+    def _read_manifest(self) -> Dict[str, str]:
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _record(self, filename: str, digest: str):
+        manifest = self._read_manifest()
+        manifest[filename] = digest
+        tmp_path = unique_temp_path(self._manifest_path())
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            tmp_path.chmod(0o644)
+            tmp_path.replace(self._manifest_path())
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def expected_checksum(self, filename: str) -> Optional[str]:
+        return self.pinned_checksums.get(filename) or self._read_manifest().get(filename)
+
+    @staticmethod
+    def _make_read_only(path: Path):
+        path.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.chmod(stat.S_IRUSR | stat.S_IWUSR)
+            path.unlink()
+        except OSError:
+            pass
+
+    def fetch(self, filename: str, urls: List[str], validate: Callable[[Path], bool] = looks_like_onnx) -> Path:
+        """
+        Path to a verified local copy of filename, downloading it from the
+        first working URL unless it's already cached. Without a known
+        checksum, a file must pass validate before it is trusted and
+        recorded. Raises RuntimeError if no verified copy can be produced.
+        Online fetches hold the artifact directory's file lock, so only one
+        process downloads while the others wait and then reuse its copy;
+        offline mode never writes model files and skips it.
+        """
+        with self._lock:
+            if self.offline:
+                return self._fetch(filename, urls, validate)
+            self.artifact_dir.mkdir(parents=True, exist_ok=True)
+            with file_lock(self.artifact_dir / LOCK_FILENAME):
+                return self._fetch(filename, urls, validate)
+
+    def _fetch(self, filename: str, urls: List[str], validate: Callable[[Path], bool]) -> Path:
+        """fetch() body, run under the locks"""
+        path = self.path(filename)
+        expected = self.expected_checksum(filename)
+        if path.exists():
+            actual = sha256_file(path)
+            if expected is None:
+                if validate(path):
+                    print(f"⚠️ No pinned checksum for {filename}; trusting the cached copy ({actual[:12]}...)")
+                    self._record(filename, actual)
+                    self._make_read_only(path)
+                    return path
+                print(f"⚠️ Cached {filename} is not a valid model file")
+            elif actual == expected:
+                return path
+            else:
+                print(f"⚠️ Checksum mismatch for cached {filename} (expected {expected[:12]}..., got {actual[:12]}...)")
+            if self.offline:
+                raise RuntimeError(f"Cached {filename} failed verification and offline mode is on")
+            self._remove(path)
+        elif self.offline:
+            raise RuntimeError(f"{filename} is not in {self.artifact_dir} and offline mode is on")
+
+        self._download(filename, urls, expected, validate)
+        return path
+
+    def _download(self, filename: str, urls: List[str], expected: Optional[str], validate: Callable[[Path], bool]):
+        path = self.path(filename)
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        last_error = None
+        for url in urls:
+            print(f"⬇️ Downloading {filename} from {url} ...")
+            tmp_path = unique_temp_path(path)
+            try:
+                request = urllib.request.Request(url, headers=headers)
+                with urllib.request.urlopen(request, timeout=self.download_timeout) as response, \
+                        open(tmp_path, 'wb') as out_file:
+                    shutil.copyfileobj(response, out_file)
+                actual = sha256_file(tmp_path)
+                if expected is not None and actual != expected:
+                    raise ValueError(f"checksum mismatch (expected {expected[:12]}..., got {actual[:12]}...)")
+                if expected is None and not validate(tmp_path):
+                    raise ValueError("downloaded file is not a valid model (truncated or an error page?)")
+                tmp_path.replace(path)
+                if expected is None:
+                    print(f"⚠️ No pinned checksum for {filename}; recording {actual[:12]}... in {MANIFEST_FILENAME}")
+                    self._record(filename, actual)
+                self._make_read_only(path)
+                print(f"✅ {filename} downloaded and verified at {path}")
+                return
+            except Exception as e:
+                last_error = e
+                print(f"⚠️ Download attempt failed: {e}")
+                if tmp_path.exists():
+                    os.unlink(tmp_path)
+        raise RuntimeError(f"Failed to download {filename}: {last_error}") from last_error
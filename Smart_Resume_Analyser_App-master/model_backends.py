@@ -0,0 +1,119 @@
+"""
+Model Backends
+Pluggable text-generation backends for api.py: the real Gemini SDK, or an
+HTTP service such as fake_model_server.py for offline load tests
+"""
+
+import json
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+
+class GeminiBackend:
+    """google.generativeai backend with one GenerativeModel per task profile"""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str, model_name: str, profiles: Dict[str, Dict], safety_settings: List[Dict]):
+        # Imported here so offline backends work without the SDK installed
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.safety_settings = safety_settings
+        self.models = {
+            task: genai.GenerativeModel(
+                model_name,
+                generation_config=generation_config,
+                safety_settings=safety_settings
+            )
+            for task, generation_config in profiles.items()
+        }
+
+    def generate(self, task: str, prompt: str, timeout: Optional[float] = None):
+        return self.models[task].generate_content(
+            prompt,
+            safety_settings=self.safety_settings,
+            request_options={"timeout": timeout} if timeout else None
+        )
+
+    def count_tokens(self, task: str, text: str) -> int:
+        return self.models[task].count_tokens(text).total_tokens
+
+
+class HttpModelResponse:
+    """
+    Mirrors the parts of the Gemini SDK response api.py reads: candidates,
+    prompt_feedback, usage_metadata and a .text that raises ValueError when
+    there is no usable candidate
+    """
+
+    def __init__(self, payload: Dict):
+        self.candidates = [
+            SimpleNamespace(
+                finish_reason=candidate.get('finish_reason'),
+                content=SimpleNamespace(parts=[
+                    SimpleNamespace(text=part.get('text', ''))
+                    for part in (candidate.get('content') or {}).get('parts', [])
+                ])
+            )
+            for candidate in payload.get('candidates', [])
+        ]
+        feedback = payload.get('prompt_feedback') or {}
+        self.prompt_feedback = SimpleNamespace(
+            block_reason=feedback.get('block_reason'),
+            safety_ratings=feedback.get('safety_ratings')
+        ) if feedback else None
+        usage = payload.get('usage_metadata') or {}
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=usage.get('prompt_token_count', 0),
+            candidates_token_count=usage.get('candidates_token_count', 0)
+        )
+
+    @property
+    def text(self) -> str:
+        if not self.candidates:
+            raise ValueError("Response has no candidates (prompt may have been blocked)")
+        parts = self.candidates[0].content.parts
+        if not parts:
+            raise ValueError(
+                f"Candidate has no text parts (finish_reason={self.candidates[0].finish_reason})"
+            )
+        return "".join(part.text for part in parts)
+
+
+class HttpModelBackend:
+    """Backend that posts prompts to a JSON model service"""
+
+    name = 'http'
+
+    def __init__(self, base_url: str, profiles: Dict[str, Dict], default_timeout: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.profiles = profiles
+        self.default_timeout = default_timeout
+
+    def _post(self, path: str, body: Dict, timeout: Optional[float]) -> Dict:
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=json.dumps(body).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.default_timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"Model service returned HTTP {e.code}: {e.read()[:200]!r}") from e
+
+    def generate(self, task: str, prompt: str, timeout: Optional[float] = None) -> HttpModelResponse:
+        payload = self._post('/v1/generate', {
+            'task': task,
+            'prompt': prompt,
+            'generation_config': self.profiles.get(task, {})
+        }, timeout)
+        return HttpModelResponse(payload)
+
+    def count_tokens(self, task: str, text: str) -> int:
+        return self._post('/v1/count_tokens', {'task': task, 'text': text}, None)['total_tokens']
+
@@ -0,0 +1,187 @@
+"""
+Offline Question Bank
+Pre-written interview questions indexed by field, level and skill, used when
+Gemini is skipped (latency budget) or unavailable
+"""
+
+import random
+from typing import Dict, List, Optional
+
+# Keys are lowercase skill names as produced by extract_skills(...).lower()
+SKILL_QUESTIONS: Dict[str, List[str]] = {
+    'python': [
+        "So Python - what's been your biggest headache working with it?",
+        "When a Python service got slow on you, how did you figure out where the time went?",
+    ],
+    'java': [
+        "What's one thing about the JVM you only understood after it bit you in production?",
+    ],
+    'javascript': [
+        "JavaScript's async model trips a lot of people up - what was your 'aha' moment with it?",
+    ],
+    'typescript': [
+        "Was moving to TypeScript worth it on your projects? What did it actually catch?",
+    ],
+    'react': [
+        "In your React work, how do you decide what belongs in state and what can be derived?",
+        "Ever had a React app re-rendering way too much? How did you track it down?",
+    ],
+    'node.js': [
+        "What's your approach to keeping a Node.js server responsive when some requests are CPU heavy?",
+    ],
+    'django': [
+        "How do you keep Django ORM queries from quietly turning into N+1 problems?",
+    ],
+    'flask': [
+        "What did you have to add yourself to get a Flask app production-ready?",
+    ],
+    'sql': [
+        "How do you go about fixing a SQL query that was fast last month and slow today?",
+    ],
+    'mysql': [
+        "What's a MySQL indexing decision you made that paid off - or backfired?",
+    ],
+    'mongodb': [
+        "What made MongoDB the right - or wrong - choice for the data you were storing?",
+    ],
+    'docker': [
+        "What's the most useful thing Docker changed about how you ship code?",
+    ],
+    'kubernetes': [
+        "When a pod kept restarting in Kubernetes, what was your debugging path?",
+    ],
+    'aws': [
+        "Which AWS service surprised you the most once you had it in production?",
+    ],
+    'git': [
+        "What's your branching habit when several people touch the same code at once?",
+    ],
+    'machine learning': [
+        "How do you tell whether a model is actually good or just fitting your validation set?",
+    ],
+    'deep learning': [
+        "When a deep learning model wouldn't converge, what did you try first?",
+    ],
+    'tensorflow': [
+        "What pushed you towards TensorFlow for that project, and would you pick it again?",
+    ],
+    'pytorch': [
+        "What's a PyTorch trick that saved you a lot of training time?",
+    ],
+    'pandas': [
+        "Your pandas pipeline runs out of memory on a big file - what are your options?",
+    ],
+    'android': [
+        "How do you keep an Android app smooth when the main thread has a lot going on?",
+    ],
+    'kotlin': [
+        "What's your favourite Kotlin feature compared to writing the same thing in Java?",
+    ],
+    'flutter': [
+        "Where did Flutter make life easier for you, and where did it fight you?",
+    ],
+    'swift': [
+        "How do you handle memory and retain cycles when writing Swift closures?",
+    ],
+    'figma': [
+        "How do you keep a Figma design system from drifting once developers start building?",
+    ],
+}
+
+FIELD_QUESTIONS: Dict[str, List[str]] = {
+    'Data Science': [
+        "I'm curious - how do you explain a model's predictions to someone non-technical?",
+        "You get a messy dataset with missing values everywhere. Where do you start?",
+        "What's a data science result you were proud of that turned out to be wrong?",
+    ],
+    'Web Development': [
+        "A page that loads fine locally takes eight seconds in production. What do you check?",
+        "How do you decide between rendering on the server and in the browser?",
+        "What's your go-to for keeping a growing frontend codebase from turning into spaghetti?",
+    ],
+    'Android Development': [
+        "How do you deal with the huge range of Android devices and OS versions out there?",
+        "What's your strategy for offline support in a mobile app?",
+    ],
+    'IOS Development': [
+        "SwiftUI or UIKit for a new screen today - how do you choose?",
+        "How do you test an iOS app beyond just tapping through it yourself?",
+    ],
+    'UI-UX Development': [
+        "How do you find out whether a design actually works for users, not just looks good?",
+        "A developer says your design is too expensive to build. How do you handle it?",
+    ],
+    'General': [
+        "What draws you to this field? What made you choose this path?",
+        "What's a technical challenge you're proud of overcoming?",
+    ],
+}
+
+LEVEL_QUESTIONS: Dict[str, List[str]] = {
+    'Fresher': [
+        "What's one project from your studies that taught you more than any lecture?",
+        "When you're learning something new, what's your process?",
+    ],
+    'Intermediate': [
+        "What's a technical decision you made that you'd do differently now?",
+        "How do you balance shipping quickly with keeping the code maintainable?",
+    ],
+    'Experienced': [
+        "How do you get a team to agree on a technical direction when opinions differ?",
+        "What's the biggest system you've had to change without breaking it for users?",
+    ],
+}
+
+GENERAL_QUESTIONS: List[str] = [
+    "Tell me about a project where things didn't go as planned. How'd you handle it?",
+    "If you had to pick one technology to master deeply, what would it be and why?",
+    "What's a technical decision you made that you'd do differently now?",
+    "Where do you see yourself going in the next few years?",
+]
+
+
+class OfflineQuestionBank:
+    """Question lookup indexed once at import by skill, field and level"""
+
+    def __init__(self):
+        self.skill_index = {skill.lower(): list(questions) for skill, questions in SKILL_QUESTIONS.items()}
+        self.field_index = {field.lower(): list(questions) for field, questions in FIELD_QUESTIONS.items()}
+        self.level_index = {level.lower(): list(questions) for level, questions in LEVEL_QUESTIONS.items()}
+
+    def select(self, field: str, level: str, skills: Optional[List[str]], count: int) -> List[str]:
+        """
+        Pick `count` questions, most specific first: the candidate's skills and
+        field, then their level, then general ones
+        """
+        skill_pool = []
+        for skill in skills or []:
+            skill_pool.extend(self.skill_index.get(skill.lower(), []))
+        field_pool = list(self.field_index.get((field or '').lower(), self.field_index['general']))
+        level_pool = list(self.level_index.get((level or '').lower(), []))
+        general_pool = list(GENERAL_QUESTIONS)
+
+        # Shuffle within each tier so repeat candidates don't get identical sets
+        for pool in (skill_pool, field_pool, level_pool, general_pool):
+            random.shuffle(pool)
+
+        # Interleave skill and field questions so a skill-heavy resume still
+        # gets some field scenarios
+        ordered = []
+        for i in range(max(len(skill_pool), len(field_pool))):
+            if i < len(skill_pool):
+                ordered.append(skill_pool[i])
+            if i < len(field_pool):
+                ordered.append(field_pool[i])
+        ordered.extend(level_pool)
+        ordered.extend(general_pool)
+
+        selected = []
+        for question in ordered:
+            if question not in selected:
+                selected.append(question)
+            if len(selected) >= count:
+                break
+        return selected
+
+
+question_bank = OfflineQuestionBank()
@@ -4,39 +4,41 @@ Analyzes text sentiment and facial expressions for interview assessment
 """
 
 import re
+import os
+import importlib.util
+import math
+import multiprocessing
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-import base64
+from typing import Dict, List, Tuple, Optional, Union
+import binascii
 import cv2
-from io import BytesIO
 from pathlib import Path
-import urllib.request
-import shutil
-from PIL import Image
-
-# Try to import sentiment analysis libraries
-try:
-    from textblob import TextBlob
-    TEXTBLOB_AVAILABLE = True
-except ImportError:
-    TEXTBLOB_AVAILABLE = False
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import threading
+import time
+
+# Sentiment libraries are imported lazily by the backend that uses them;
+# availability is checked here without paying their import cost
+TEXTBLOB_AVAILABLE = importlib.util.find_spec('textblob') is not None
+if not TEXTBLOB_AVAILABLE:
     print("⚠️ TextBlob not available. Install with: pip install textblob")
 
-try:
-    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-    VADER_AVAILABLE = True
-except ImportError:
-    VADER_AVAILABLE = False
+VADER_AVAILABLE = importlib.util.find_spec('vaderSentiment') is not None
+if not VADER_AVAILABLE:
     print("⚠️ VADER not available. Install with: pip install vaderSentiment")
 
-# Try to import onnxruntime for FER+ model inference
-try:
-    import onnxruntime as ort
-    ONNXRUNTIME_AVAILABLE = True
-except ImportError:
-    ONNXRUNTIME_AVAILABLE = False
+# onnxruntime is imported by emotion_models when a FER+ session is created
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec('onnxruntime') is not None
+if not ONNXRUNTIME_AVAILABLE:
     print("⚠️ onnxruntime not available. Install with: pip install onnxruntime")
 
+from emotion_models import create_session, ensure_variant
+from model_artifacts import ModelArtifactCache
+from inference_batcher import InferenceBatcher
+from face_detectors import FaceDetector, create_face_detector
+
 # OpenCV is always available (we use opencv-python-headless)
 OPENCV_AVAILABLE = True
 print("✅ OpenCV available for emotion detection")
@@ -63,12 +65,305 @@ FERPLUS_TO_APP_LABEL = {
 }
 MODELS_DIR = Path(__file__).resolve().parent / "models"
 
+# Lexical keyword tables, compiled once at import into token/bigram lookups.
+# Matching is on whole tokens, so 'er' and 'ah' no longer hit inside words.
+FILLER_KEYWORDS = ['um', 'uh', 'er', 'ah', 'like', 'you know', 'i mean']
+HEDGE_KEYWORDS = ['maybe', 'perhaps', 'i think', 'i guess', 'kind of', 'sort of', 'a bit', 'a little']
+APOLOGY_KEYWORDS = ['sorry', 'apologies']
+# Keywords that also count towards hesitation (the rest only signal nervousness)
+HESITATION_KEYWORDS = frozenset([
+    'um', 'uh', 'er', 'ah', 'like', 'you know', 'i mean',
+    'maybe', 'perhaps', 'i think', 'i guess'
+])
+# Negative emotion keywords with the inflections that map onto them
+NEGATIVE_EMOTION_KEYWORDS = {
+    'crying': [], 'cry': ['cries', 'cried'], 'tears': [], 'sad': ['sadly', 'sadness'],
+    'upset': [], 'frustrated': ['frustrating', 'frustration'],
+    'stressed': ['stress', 'stressful'], 'anxious': ['anxiety'],
+    'worried': ['worry', 'worries', 'worrying'], 'nervous': ['nervousness'],
+    'scared': [], 'afraid': [], 'difficult': ['difficulty', 'difficulties'],
+    'hard': ['harder', 'hardest'], 'struggle': ['struggled', 'struggles', 'struggling'],
+    'problem': ['problems']
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+|\.+|\?+|!+")
+
+
+def _build_lexicon():
+    """Map single tokens and token bigrams to (category, keyword)"""
+    unigrams, bigrams = {}, {}
+    categories = [
+        ('filler', FILLER_KEYWORDS),
+        ('hedge', HEDGE_KEYWORDS),
+        ('apology', APOLOGY_KEYWORDS),
+    ]
+    for category, keywords in categories:
+        for keyword in keywords:
+            words = tuple(keyword.split())
+            target = unigrams if len(words) == 1 else bigrams
+            target[words[0] if len(words) == 1 else words] = (category, keyword)
+    for keyword, inflections in NEGATIVE_EMOTION_KEYWORDS.items():
+        for form in [keyword] + inflections:
+            unigrams[form] = ('negative', keyword)
+    return unigrams, bigrams
+
+
+_UNIGRAM_LEXICON, _BIGRAM_LEXICON = _build_lexicon()
+_BIGRAM_STARTS = frozenset(first for first, _ in _BIGRAM_LEXICON)
+
+
+class LexicalCounter:
+    """
+    Single-pass accumulator for the lexical features SentimentAnalyzer uses:
+    keyword hits, ellipses, question-mark runs, word and sentence counts.
+    feed() can be called repeatedly with consecutive chunks of lowercase text
+    as long as chunks end on token boundaries.
+    """
+
+    def __init__(self):
+        self.keyword_hits: List[Tuple[str, str]] = []
+        self.word_count = 0
+        self.sentence_count = 0
+        self.current_sentence_words = 0
+        self.ellipsis_count = 0
+        self.question_run_count = 0
+        self._prev_word = None
+
+    def feed(self, text_lower: str) -> 'LexicalCounter':
+        """Consume a chunk of lowercase text"""
+        # Hot loop: keep state in locals and only build a bigram key when the
+        # previous word can start one
+        unigrams = _UNIGRAM_LEXICON
+        bigrams = _BIGRAM_LEXICON
+        bigram_starts = _BIGRAM_STARTS
+        hits = self.keyword_hits
+        prev = self._prev_word
+        words = self.word_count
+        sentences = self.sentence_count
+        current = self.current_sentence_words
+        ellipses = self.ellipsis_count
+        question_runs = self.question_run_count
+
+        for token in _TOKEN_PATTERN.findall(text_lower):
+            first = token[0]
+            if first == '.' or first == '?' or first == '!':
+                if first == '.':
+                    ellipses += len(token) // 3
+                elif first == '?' and len(token) >= 2:
+                    question_runs += 1
+                if current:
+                    sentences += 1
+                    current = 0
+                prev = None
+                continue
+            words += 1
+            current += 1
+            entry = unigrams.get(token)
+            if entry is not None:
+                hits.append(entry)
+            if prev in bigram_starts:
+                entry = bigrams.get((prev, token))
+                if entry is not None:
+                    hits.append(entry)
+            prev = token
+
+        self._prev_word = prev
+        self.word_count = words
+        self.sentence_count = sentences
+        self.current_sentence_words = current
+        self.ellipsis_count = ellipses
+        self.question_run_count = question_runs
+        return self
+
+    def features(self) -> Dict:
+        """Snapshot of the accumulated features (an unterminated last sentence counts)"""
+        sentence_count = self.sentence_count + (1 if self.current_sentence_words else 0)
+        keyword_counts: Dict[str, int] = {}
+        category_counts = {'filler': 0, 'hedge': 0, 'apology': 0, 'negative': 0}
+        distinct = {'filler': 0, 'hedge': 0, 'apology': 0, 'negative': 0}
+        hesitation_hits = 0
+        for category, keyword in self.keyword_hits:
+            if keyword not in keyword_counts:
+                keyword_counts[keyword] = 0
+                distinct[category] += 1
+            keyword_counts[keyword] += 1
+            category_counts[category] += 1
+            if keyword in HESITATION_KEYWORDS:
+                hesitation_hits += 1
+        return {
+            'word_count': self.word_count,
+            'sentence_count': sentence_count,
+            'avg_sentence_length': self.word_count / max(sentence_count, 1),
+            'filler_count': category_counts['filler'],
+            'hedge_count': category_counts['hedge'],
+            'apology_count': category_counts['apology'],
+            'negative_count': category_counts['negative'],
+            # Distinct keywords, which is what the nervousness score is calibrated on
+            'nervousness_keywords': distinct['filler'] + distinct['hedge'] + distinct['apology'],
+            'negative_keywords': distinct['negative'],
+            'hesitation_count': hesitation_hits + self.ellipsis_count + self.question_run_count,
+            'ellipsis_count': self.ellipsis_count,
+            'question_run_count': self.question_run_count,
+            'keyword_counts': keyword_counts
+        }
+
+
+def extract_lexical_features(text: str) -> Dict:
+    """Compute all lexical features of a text in one tokenizer pass"""
+    return LexicalCounter().feed(text.lower()).features()
+
+
+class PolarityBackend:
+    """
+    Polarity scorer built from VADER and/or TextBlob. Each library is
+    imported and initialized on first use, so unused ones cost nothing.
+    """
+    
+    def __init__(self, name: str, use_vader: bool, use_textblob: bool):
+        self.name = name
+        self.use_vader = use_vader and VADER_AVAILABLE
+        self.use_textblob = use_textblob and TEXTBLOB_AVAILABLE
+        self._vader = None
+        self._textblob = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+    
+    def _load(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            if self.use_vader:
+                from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+                self._vader = SentimentIntensityAnalyzer()
+            if self.use_textblob:
+                from textblob import TextBlob
+                self._textblob = TextBlob
+            self._loaded = True
+            print(f"✅ Sentiment backend '{self.name}' loaded")
+    
+    def score(self, text: str) -> Tuple[Dict, Dict]:
+        """Returns (vader_scores, textblob_scores); either is empty when not used"""
+        if not self._loaded:
+            self._load()
+        vader_scores = self._vader.polarity_scores(text) if self._vader else {}
+        textblob_scores = {}
+        if self._textblob:
+            sentiment = self._textblob(text).sentiment
+            textblob_scores = {
+                'polarity': sentiment.polarity,  # -1 to 1
+                'subjectivity': sentiment.subjectivity  # 0 to 1
+            }
+        return vader_scores, textblob_scores
+
+
+# Backend name -> (use VADER, use TextBlob). 'lexical' is the lexicon-free fast
+# mode: no polarity model, emotional state comes from lexical features alone.
+SENTIMENT_BACKENDS = {
+    'both': (True, True),
+    'vader': (True, False),
+    'textblob': (False, True),
+    'lexical': (False, False),
+}
+
+
+def create_sentiment_backend(name: str) -> PolarityBackend:
+    if name not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{name}'. Choose from: {', '.join(SENTIMENT_BACKENDS)}")
+    use_vader, use_textblob = SENTIMENT_BACKENDS[name]
+    return PolarityBackend(name, use_vader, use_textblob)
+
+
+# Analyzer owned by each analyze_many worker process
+_worker_sentiment_analyzer = None
+
+
+def _init_sentiment_worker(backend: str):
+    """Process pool initializer: build and warm one analyzer per worker"""
+    global _worker_sentiment_analyzer
+    _worker_sentiment_analyzer = SentimentAnalyzer(backend=backend)
+    _worker_sentiment_analyzer.analyze_sentiment("Warm up the sentiment lexicons.")
+
+
+def _analyze_sentiment_in_worker(text: str) -> Dict:
+    return _worker_sentiment_analyzer.analyze_sentiment(text)
+
 
 class SentimentAnalyzer:
-    """Analyzes sentiment and tone from text"""
+    """
+    Analyzes sentiment and tone from text.
     
-    def __init__(self):
-        self.vader_analyzer = SentimentIntensityAnalyzer() if VADER_AVAILABLE else None
+    analyze_many runs on one persistent process pool, started on first use
+    and kept warm across requests. Workers are started with forkserver (or
+    spawn), never fork: the parent is a threaded server process holding
+    onnxruntime and OpenCV state. The forkserver preloads only this module,
+    but workers still re-import the main script as __mp_main__, so a script
+    using analyze_many must keep its heavy setup out of that import (see
+    init_services in api.py). Call shutdown() when the app exits.
+    """
+    
+    # Below this many texts the pool round trip costs more than it saves
+    MIN_PARALLEL_TEXTS = 32
+    # Worker processes when batch_workers isn't given (capped so one server
+    # process doesn't claim every core)
+    DEFAULT_BATCH_WORKERS = 4
+    
+    def __init__(self, backend: str = 'both', batch_workers: Optional[int] = None):
+        self.backend = create_sentiment_backend(backend)
+        self.batch_workers = batch_workers or min(self.DEFAULT_BATCH_WORKERS, os.cpu_count() or 1)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                if 'forkserver' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('forkserver')
+                    # The default preload is __main__, i.e. the whole server;
+                    # workers only need this module
+                    context.set_forkserver_preload([__name__])
+                else:
+                    context = multiprocessing.get_context('spawn')
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.batch_workers,
+                    mp_context=context,
+                    initializer=_init_sentiment_worker,
+                    initargs=(self.backend.name,)
+                )
+            return self._pool
+    
+    def shutdown(self):
+        """Stop the batch worker processes (they restart on the next analyze_many)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+    
+    def analyze_many(self, texts: List[str], chunk_size: Optional[int] = None) -> List[Dict]:
+        """
+        Analyze many texts across the process pool, returning results in input order.
+        
+        Args:
+            texts: Answers to analyze
+            chunk_size: Texts sent to a worker per task (default: about four
+                chunks per worker, which balances load without much IPC)
+        """
+        texts = list(texts)
+        if self.batch_workers <= 1 or len(texts) < self.MIN_PARALLEL_TEXTS:
+            return [self.analyze_sentiment(text) for text in texts]
+        
+        if chunk_size is None:
+            chunk_size = max(1, math.ceil(len(texts) / (self.batch_workers * 4)))
+        
+        pool = self._get_pool()
+        try:
+            return list(pool.map(_analyze_sentiment_in_worker, texts, chunksize=chunk_size))
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time
+            print(f"⚠️ Sentiment worker pool broke ({e}); analyzing inline")
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = None
+            return [self.analyze_sentiment(text) for text in texts]
     
     def analyze_sentiment(self, text: str) -> Dict:
         """
@@ -90,56 +385,31 @@ class SentimentAnalyzer:
         if not text or not text.strip():
             return self._default_sentiment()
         
-        text_lower = text.lower()
+        # Polarity from the configured backend (VADER and/or TextBlob, or none)
+        vader_scores, textblob_scores = self.backend.score(text)
         
-        # Use VADER for sentiment analysis (better for social media/text)
-        vader_scores = {}
-        if self.vader_analyzer:
-            vader_scores = self.vader_analyzer.polarity_scores(text)
+        features = extract_lexical_features(text)
+        return self._build_sentiment(features, vader_scores, textblob_scores)
+    
+    def _build_sentiment(self, features: Dict, vader_scores: Dict, textblob_scores: Dict) -> Dict:
+        """Combine lexical features and polarity scores into the sentiment result"""
+        word_count = features['word_count']
         
-        # Use TextBlob for additional analysis
-        textblob_scores = {}
-        if TEXTBLOB_AVAILABLE:
-            blob = TextBlob(text)
-            textblob_scores = {
-                'polarity': blob.sentiment.polarity,  # -1 to 1
-                'subjectivity': blob.sentiment.subjectivity  # 0 to 1
-            }
+        # Nervousness indicators (fillers, hedges, apologies)
+        nervousness_count = features['nervousness_keywords']
+        nervousness_score = min(1.0, nervousness_count / max(word_count / 50, 1))
         
-        # Detect nervousness indicators
-        nervousness_keywords = [
-            'um', 'uh', 'er', 'ah', 'like', 'you know', 'i mean',
-            'sorry', 'apologies', 'i think', 'maybe', 'perhaps',
-            'i guess', 'kind of', 'sort of', 'a bit', 'a little'
-        ]
-        nervousness_count = sum(1 for word in nervousness_keywords if word in text_lower)
-        nervousness_score = min(1.0, nervousness_count / max(len(text.split()) / 50, 1))
-        
-        # Detect negative emotional indicators (crying, distress, etc.)
-        negative_emotion_keywords = [
-            'crying', 'cry', 'tears', 'sad', 'upset', 'frustrated',
-            'stressed', 'anxious', 'worried', 'nervous', 'scared',
-            'afraid', 'difficult', 'hard', 'struggle', 'problem'
-        ]
-        negative_count = sum(1 for word in negative_emotion_keywords if word in text_lower)
+        # Negative emotional indicators (crying, distress, etc.)
+        negative_count = features['negative_keywords']
         if negative_count > 0:
             # Boost nervousness score if negative emotions detected
             nervousness_score = min(1.0, nervousness_score + (negative_count * 0.2))
         
-        # Detect hesitation indicators
-        hesitation_patterns = [
-            r'\b(um|uh|er|ah)\b',
-            r'\b(like|you know|i mean)\b',
-            r'\b(maybe|perhaps|i think|i guess)\b',
-            r'\.\.\.',  # Ellipsis
-            r'\?{2,}',  # Multiple question marks
-        ]
-        hesitation_count = sum(len(re.findall(pattern, text_lower)) for pattern in hesitation_patterns)
-        hesitation_score = min(1.0, hesitation_count / max(len(text.split()) / 30, 1))
+        # Hesitation indicators (fillers, hedges, ellipses, repeated question marks)
+        hesitation_score = min(1.0, features['hesitation_count'] / max(word_count / 30, 1))
         
         # Calculate clarity (based on sentence structure and length)
-        sentences = re.split(r'[.!?]+', text)
-        avg_sentence_length = sum(len(s.split()) for s in sentences if s.strip()) / max(len([s for s in sentences if s.strip()]), 1)
+        avg_sentence_length = features['avg_sentence_length']
         clarity_score = min(1.0, 1.0 - abs(avg_sentence_length - 15) / 15)  # Optimal around 15 words
         
         # Determine overall sentiment
@@ -215,7 +485,14 @@ class SentimentAnalyzer:
             'tone_scores': tone_scores,
             'emotional_state': emotional_state,
             'vader_compound': round(vader_scores.get('compound', 0), 2) if vader_scores else 0,
-            'textblob_polarity': round(textblob_scores.get('polarity', 0), 2) if textblob_scores else 0
+            'textblob_polarity': round(textblob_scores.get('polarity', 0), 2) if textblob_scores else 0,
+            'lexical_features': {
+                'word_count': word_count,
+                'sentence_count': features['sentence_count'],
+                'filler_count': features['filler_count'],
+                'hedge_count': features['hedge_count'],
+                'negative_count': features['negative_count']
+            }
         }
     
     def _default_sentiment(self) -> Dict:
@@ -233,45 +510,320 @@ class SentimentAnalyzer:
         }
 
 
+_SENTENCE_END_PATTERN = re.compile(r'[.!?]+')
+
+
+class StreamingSentiment:
+    """
+    Incremental sentiment over a live transcript fed as append-only deltas.
+    
+    Each delta is tokenized once into a running LexicalCounter, and the
+    analyzer's polarity backend scores each sentence once it is complete,
+    so work is O(delta). Document-level polarity is the mean of the sentence
+    scores, which tracks whole-text VADER closely for interview answers.
+    """
+    
+    # Live hint thresholds (share of words)
+    FILLER_HINT_RATE = 0.06
+    HEDGE_HINT_RATE = 0.05
+    
+    def __init__(self, analyzer: 'SentimentAnalyzer'):
+        self.analyzer = analyzer
+        self.counter = LexicalCounter()
+        self.lock = threading.Lock()
+        self.updated_at = time.time()
+        self._pending = ''          # tail after the last whitespace, may be a partial word
+        self._sentence_parts: List[str] = []  # complete words of the unfinished sentence
+        self._vader_totals = {'compound': 0.0, 'pos': 0.0, 'neu': 0.0, 'neg': 0.0}
+        self._polarity_total = 0.0
+        self._scored_sentences = 0
+        self._normalized_parts: List[str] = []
+    
+    def feed(self, delta: str):
+        """Append a transcript delta"""
+        if not delta:
+            return
+        with self.lock:
+            self.updated_at = time.time()
+            self._normalized_parts.append(delta)
+            text = self._pending + delta
+            # Tokens never span whitespace, so everything up to the last
+            # whitespace character can be processed now
+            cut = max(text.rfind(' '), text.rfind('\n'), text.rfind('\t')) + 1
+            self._pending = text[cut:]
+            complete = text[:cut]
+            if complete:
+                self._consume(complete)
+    
+    def _consume(self, complete: str):
+        self.counter.feed(complete.lower())
+        last_end = 0
+        for match in _SENTENCE_END_PATTERN.finditer(complete):
+            self._sentence_parts.append(complete[last_end:match.end()])
+            self._score_sentence(''.join(self._sentence_parts))
+            self._sentence_parts = []
+            last_end = match.end()
+        if last_end < len(complete):
+            self._sentence_parts.append(complete[last_end:])
+    
+    def _score_sentence(self, sentence: str):
+        if not sentence.strip(' \n\t.!?'):
+            return
+        vader_scores, textblob_scores = self.analyzer.backend.score(sentence)
+        for key in self._vader_totals:
+            self._vader_totals[key] += vader_scores.get(key, 0.0)
+        self._polarity_total += textblob_scores.get('polarity', 0.0)
+        self._scored_sentences += 1
+    
+    def _polarity_scores(self) -> Tuple[Dict, Dict]:
+        count = self._scored_sentences
+        if not count:
+            return {}, {}
+        backend = self.analyzer.backend
+        vader_scores = {}
+        if backend.use_vader:
+            vader_scores = {key: total / count for key, total in self._vader_totals.items()}
+        textblob_scores = {'polarity': self._polarity_total / count} if backend.use_textblob else {}
+        return vader_scores, textblob_scores
+    
+    def snapshot(self) -> Dict:
+        """Current sentiment over everything received so far (partial last word excluded)"""
+        with self.lock:
+            if not self.counter.word_count:
+                return self.analyzer._default_sentiment()
+            vader_scores, textblob_scores = self._polarity_scores()
+            return self.analyzer._build_sentiment(self.counter.features(), vader_scores, textblob_scores)
+    
+    def finalize(self) -> Dict:
+        """Flush the tail and unfinished sentence, then return the final sentiment"""
+        with self.lock:
+            if self._pending:
+                self._consume(self._pending)
+                self._pending = ''
+            if self._sentence_parts:
+                self._score_sentence(''.join(self._sentence_parts))
+                self._sentence_parts = []
+        return self.snapshot()
+    
+    def matches(self, text: str) -> bool:
+        """True if the streamed transcript is the given text (ignoring whitespace differences)"""
+        with self.lock:
+            streamed = ''.join(self._normalized_parts)
+        return streamed.split() == text.split()
+    
+    def hints(self) -> List[str]:
+        """Live coaching hints derived from the running counts"""
+        with self.lock:
+            features = self.counter.features()
+        words = features['word_count']
+        hints = []
+        if words >= 20:
+            if features['filler_count'] / words >= self.FILLER_HINT_RATE:
+                hints.append("You're using a lot of filler words - try pausing instead.")
+            if features['hedge_count'] / words >= self.HEDGE_HINT_RATE:
+                hints.append("Lots of hedging - state your points more decisively.")
+            if features['avg_sentence_length'] > 35:
+                hints.append("Long sentences - try breaking your points up.")
+        return hints
+
+
+class ArrayPool:
+    """
+    Small thread-safe free list of reusable NumPy arrays keyed by shape and
+    dtype, so per-request scratch tensors aren't reallocated every time.
+    """
+    
+    def __init__(self, max_per_key: int = 4):
+        self.max_per_key = max_per_key
+        self._free: Dict[Tuple, List[np.ndarray]] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, shape: Tuple[int, ...], dtype=np.float32) -> np.ndarray:
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                return free.pop()
+        return np.empty(shape, dtype=dtype)
+    
+    def release(self, array: np.ndarray):
+        key = (array.shape, array.dtype.str)
+        with self._lock:
+            free = self._free.setdefault(key, [])
+            if len(free) < self.max_per_key:
+                free.append(array)
+
+
+# cv2.imdecode flags by decode reduction factor (JPEG downsamples while decoding)
+GRAY_DECODE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Rule-based emotion fallback, columns in FacialExpressionAnalyzer.emotion_labels
+# order: angry, disgust, fear, happy, neutral, sad, surprise
+HEURISTIC_BASE_SCORES = np.array([0.15, 0.1, 0.1, 0.15, 0.25, 0.15, 0.1])
+# Score deltas per rule, rows in _score_heuristic_stack's rule order
+HEURISTIC_RULE_DELTAS = np.array([
+    [0.0, 0.0, 0.0, 0.5, -0.2, -0.15, 0.0],     # bright mouth (smile)
+    [0.2, 0.0, 0.0, 0.0, -0.3, 0.4, 0.0],       # dark mouth (frown)
+    [0.0, 0.0, 0.2, 0.0, -0.3, 0.0, 0.4],       # surprise
+    [0.0, 0.0, 0.3, 0.0, -0.25, 0.0, 0.2],      # fear
+    [0.35, 0.0, 0.0, 0.0, -0.25, 0.15, 0.0],    # angry
+    [0.15, 0.3, 0.0, 0.0, -0.2, 0.0, 0.0],      # disgust
+    [0.0, 0.0, 0.0, -0.15, -0.2, 0.4, 0.0],     # sad
+])
+HEURISTIC_NEUTRAL_ONLY = np.array([0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0])
+
+
 class FacialExpressionAnalyzer:
-    """Analyzes facial expressions from images/video frames using OpenCV"""
+    """
+    Analyzes facial expressions from images/video frames using OpenCV.
     
-    def __init__(self):
-        self.face_cascade = None
+    Frames are decoded straight to grayscale (optionally at reduced
+    resolution) and stay grayscale through detection and inference.
+    Decoding and face detection run on a shared, bounded thread pool
+    (OpenCV releases the GIL in its C code).
+    
+    The face detector is a backend from face_detectors.py (Haar, LBP or DNN
+    SSD), chosen by detector_backend; a backend that can batch gets all of
+    an answer's full-frame detections in one call.
+    
+    Full-frame detection runs on a copy downscaled to detect_width pixels
+    wide (0 = full resolution), with the minimum face size given as a
+    fraction of the frame width, and boxes mapped back to full resolution.
+    With keyframe_interval > 1, only every Nth frame gets a full-frame face
+    detection; the frames in between search a window around the nearest
+    keyframe's face (track_margin box sizes on each side) and fall back to a
+    full detection if the face isn't there.
+    
+    With dedupe_distance > 0, near-identical frames (by dHash Hamming
+    distance) skip detection and inference and add their weight to the
+    earlier frame they match.
+    
+    With convergence_tolerance > 0, frames are scored in a spread-out order
+    (first, last, middle, ...) a few at a time, stopping once the 95%
+    confidence intervals of the dominant emotion and of the negative
+    emotion sum are within the tolerance.
+    
+    Clients that run their own face detection can send a box per frame or
+    pre-cropped faces; these are sanity-checked (size, aspect ratio, inside
+    the frame) and go straight to inference, skipping the detector.
+    
+    With batch_max_wait_ms > 0, face crops from concurrent requests are
+    merged into shared FER+ calls by an InferenceBatcher.
+    
+    Thread safety: one instance can serve concurrent requests (gthread
+    workers). Detector backends keep their cascades and nets per thread
+    (request threads and frame pool threads each load their own on first
+    use); the FER+ InferenceSession is
+    shared, since onnxruntime's run() is thread-safe, and is only swapped
+    under _model_lock. The frame pool, ArrayPool and InferenceBatcher have
+    their own locks, and per-request state lives in locals. Don't fork
+    after the first analysis: onnxruntime and the pools' threads don't
+    survive a fork.
+    """
+    
+    # Client-supplied face boxes/crops outside these sides (decoded pixels)
+    # are ignored and the frame goes through server-side detection
+    MIN_SUPPLIED_FACE_SIDE = 16
+    MAX_PRECROPPED_FACE_SIDE = 256
+    
+    def __init__(
+        self,
+        frame_workers: Optional[int] = None,
+        decode_reduction: int = 1,
+        keyframe_interval: int = 1,
+        track_margin: float = 0.5,
+        detect_width: int = 0,
+        detect_scale_factor: float = 1.1,
+        min_face_ratio: float = 0.0,
+        model_variant: str = 'fp32',
+        session_config: Optional[Dict] = None,
+        artifact_cache: Optional[ModelArtifactCache] = None,
+        dedupe_distance: int = 0,
+        convergence_tolerance: float = 0.0,
+        convergence_min_frames: int = 4,
+        convergence_step: int = 2,
+        batch_max_wait_ms: float = 0.0,
+        batch_max_size: int = 32,
+        detector_backend: str = 'haar',
+        detector_config: Optional[Dict] = None
+    ):
+        if decode_reduction not in GRAY_DECODE_FLAGS:
+            raise ValueError(f"decode_reduction must be one of {sorted(GRAY_DECODE_FLAGS)}")
+        self.decode_reduction = decode_reduction
+        self._decode_flag = GRAY_DECODE_FLAGS[decode_reduction]
+        # Haar cascades are trained on 24x24 windows; scale the 30px floor with the decode
+        self.min_face_size = max(24, 30 // decode_reduction)
+        self.tensor_pool = ArrayPool()
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.track_margin = track_margin
+        self.detect_width = detect_width
+        self.detect_scale_factor = detect_scale_factor
+        self.min_face_ratio = min_face_ratio
+        # Frames whose dHash is within this many bits of an earlier frame reuse its result (0 = off)
+        self.dedupe_distance = dedupe_distance
+        # Adaptive early exit (0 tolerance = score every frame)
+        self.convergence_tolerance = convergence_tolerance
+        self.convergence_min_frames = max(2, convergence_min_frames)
+        self.convergence_step = max(1, convergence_step)
+        # Cross-request micro-batching of FER+ calls (0 wait = each request runs its own)
+        self.inference_batcher = None
+        if batch_max_wait_ms > 0:
+            self.inference_batcher = InferenceBatcher(
+                self._run_emotion_model,
+                max_batch_size=batch_max_size,
+                max_wait_ms=batch_max_wait_ms
+            )
+        self.face_detector: Optional[FaceDetector] = None
+        self.frame_workers = frame_workers or min(4, os.cpu_count() or 1)
+        self._frame_pool = None
+        self._frame_pool_lock = threading.Lock()
+        self._model_lock = threading.Lock()
         self.emotion_model_session = None
         self.emotion_model_input = None
-        self.emotion_model_path = MODELS_DIR / FER_MODEL_FILENAME
+        # Verified local model files (downloads, checksums, offline mode)
+        self.artifact_cache = artifact_cache or ModelArtifactCache(MODELS_DIR)
+        self.emotion_model_path = self.artifact_cache.path(FER_MODEL_FILENAME)
+        # FER+ build (see emotion_models.py) and onnxruntime SessionOptions settings
+        self.model_variant = model_variant
+        self.session_config = session_config or {}
         self.emotion_labels = ['angry', 'disgust', 'fear', 'happy', 'neutral', 'sad', 'surprise']
+        # Batch size fixed by the model's input shape, or None if it accepts any
+        self.emotion_model_batch_size = None
         
-        # Initialize OpenCV face detector
-        try:
-            # Try Haar Cascade first (built into OpenCV)
-            cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            self.face_cascade = cv2.CascadeClassifier(cascade_path)
-            if self.face_cascade.empty():
-                print("⚠️ Failed to load Haar Cascade, trying DNN face detector...")
-                # Try DNN face detector (more accurate)
-                self._init_dnn_face_detector()
-            else:
-                print("✅ OpenCV Haar Cascade face detector initialized")
-        except Exception as e:
-            print(f"⚠️ Face detector initialization failed: {e}")
-            try:
-                self._init_dnn_face_detector()
-            except Exception as e2:
-                print(f"⚠️ DNN face detector also failed: {e2}")
+        # (FER+ classes x app labels) 0/1 matrix: probabilities @ projection
+        # folds the 8 FER+ classes into the 7 app labels for a whole batch
+        self.ferplus_projection = np.zeros((len(FERPLUS_LABELS), len(self.emotion_labels)), dtype=np.float32)
+        for row, fer_label in enumerate(FERPLUS_LABELS):
+            target = FERPLUS_TO_APP_LABEL.get(fer_label, 'neutral')
+            self.ferplus_projection[row, self.emotion_labels.index(target)] = 1.0
+        
+        # Initialize the configured face detector, falling back to Haar
+        self._init_face_detector(detector_backend, detector_config or {})
         
         # Initialize FER+ ONNX model if available, fallback to heuristics
         self._ensure_emotion_model()
     
-    def _init_dnn_face_detector(self):
-        """Initialize OpenCV DNN face detector (more accurate)"""
+    def _init_face_detector(self, backend: str, detector_config: Dict):
+        """Load a face detector backend (see face_detectors.py)"""
+        try:
+            self.face_detector = create_face_detector(backend, **detector_config)
+            print(f"✅ OpenCV {backend} face detector initialized")
+            return
+        except Exception as e:
+            if backend == 'haar':
+                print(f"⚠️ Face detector initialization failed: {e}")
+                return
+            print(f"⚠️ {backend} face detector failed ({e}), falling back to Haar Cascade")
         try:
-            # Download DNN model files if needed (we'll use a simple approach)
-            # For now, we'll use Haar Cascade as fallback
-            print("🔄 Using Haar Cascade as face detector")
+            self.face_detector = create_face_detector('haar')
+            print("✅ OpenCV haar face detector initialized")
         except Exception as e:
-            print(f"⚠️ DNN face detector failed: {e}")
+            print(f"⚠️ Haar Cascade face detector also failed: {e}")
     
     def _ensure_emotion_model(self):
         """Load the FER+ ONNX model if onnxruntime is available"""
@@ -283,246 +835,318 @@ class FacialExpressionAnalyzer:
             return
         
         try:
-            MODELS_DIR.mkdir(parents=True, exist_ok=True)
-            if self.emotion_model_path.exists() and self.emotion_model_path.stat().st_size < 1024:
-                # Remove corrupt/partial downloads before re-fetching
-                print("⚠️ Detected incomplete FER+ model download. Removing and retrying...")
-                self.emotion_model_path.unlink()
-            if not self.emotion_model_path.exists():
-                self._download_emotion_model()
-            self.emotion_model_session = ort.InferenceSession(
-                str(self.emotion_model_path),
-                providers=['CPUExecutionProvider']
-            )
-            self.emotion_model_input = self.emotion_model_session.get_inputs()[0].name
-            print("✅ FER+ ONNX emotion model initialized")
+            self.artifact_cache.fetch(FER_MODEL_FILENAME, FER_MODEL_URLS)
+            self.load_emotion_model(self.model_variant)
         except Exception as e:
             self.emotion_model_session = None
             self.emotion_model_input = None
+            self.emotion_model_batch_size = None
             print(f"⚠️ Could not initialize FER+ emotion model: {e}")
             print("   Falling back to OpenCV heuristic analyzer")
     
-    def _download_emotion_model(self):
-        """Download the FER+ ONNX model to the models directory"""
-        tmp_path = self.emotion_model_path.with_suffix(".tmp")
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        last_error = None
-        for url in FER_MODEL_URLS:
-            print(f"⬇️ Downloading FER+ emotion model from {url} ...")
-            try:
-                request = urllib.request.Request(url, headers=headers)
-                with urllib.request.urlopen(request) as response, open(tmp_path, "wb") as out_file:
-                    shutil.copyfileobj(response, out_file)
-                tmp_path.replace(self.emotion_model_path)
-                print(f"✅ FER+ model downloaded successfully to {self.emotion_model_path}")
-                return
-            except Exception as e:
-                last_error = e
-                print(f"⚠️ Download attempt failed: {e}")
-                try:
-                    if tmp_path.exists():
-                        tmp_path.unlink()
-                except OSError:
-                    pass
-        raise RuntimeError(f"Failed to download FER+ model: {last_error}") from last_error
-    
-    def decode_image(self, image_data: str) -> Optional[np.ndarray]:
-        """Decode base64 image data to numpy array"""
+    def load_emotion_model(self, variant: str):
+        """Switch to a FER+ variant, building it from the fp32 model if needed"""
+        model_path = ensure_variant(self.emotion_model_path, variant)
+        session = create_session(model_path, self.session_config)
+        model_input = session.get_inputs()[0]
+        # The model zoo FER+ export pins the batch dim to 1; symbolic dims take any N
+        batch_dim = model_input.shape[0] if model_input.shape else None
+        with self._model_lock:
+            self.emotion_model_batch_size = batch_dim if isinstance(batch_dim, int) and batch_dim > 0 else None
+            self.emotion_model_input = model_input.name
+            self.emotion_model_session = session
+            self.model_variant = variant
+        print(f"✅ FER+ ONNX emotion model initialized ({variant})")
+    
+    def get_inference_stats(self) -> Optional[Dict]:
+        """Micro-batcher queue and batch-size stats, or None when batching is off"""
+        return self.inference_batcher.get_stats() if self.inference_batcher else None
+    
+    def warm_up(self, batch_size: int = 1):
+        """
+        Run a dummy batch through the FER+ session so onnxruntime finishes
+        its lazy initialization before the first real request
+        """
+        if self.emotion_model_session is None:
+            return
+        started = time.perf_counter()
         try:
-            # Remove data URL prefix if present
-            if ',' in image_data:
-                image_data = image_data.split(',')[1]
-            
-            # Decode base64
-            image_bytes = base64.b64decode(image_data)
-            image = Image.open(BytesIO(image_bytes))
-            
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Convert to numpy array
-            img_array = np.array(image)
-            
-            # Convert RGB to BGR for OpenCV
-            img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+            self._run_emotion_model(np.zeros((max(1, batch_size), 1, 64, 64), dtype=np.float32))
+            print(f"✅ FER+ model warmed up in {(time.perf_counter() - started) * 1000:.0f}ms")
+        except Exception as e:
+            print(f"⚠️ FER+ warm-up inference failed: {e}")
+    
+    def decode_gray(self, image_data: Union[str, bytes, np.ndarray]) -> Optional[np.ndarray]:
+        """
+        Decode a frame straight to a grayscale array.
+        Accepts a base64 string (with or without a data URL prefix) or raw
+        encoded bytes. a2b_base64 reads the ASCII str directly, so the only
+        copy is the slice past a data URL prefix; the decoder downsamples
+        when decode_reduction > 1.
+        Already-decoded frames (from video clips) are converted to grayscale
+        and downsampled the same way.
+        """
+        try:
+            if isinstance(image_data, np.ndarray):
+                gray = image_data if image_data.ndim == 2 else cv2.cvtColor(image_data, cv2.COLOR_BGR2GRAY)
+                if self.decode_reduction > 1:
+                    height, width = gray.shape
+                    size = (max(1, width // self.decode_reduction), max(1, height // self.decode_reduction))
+                    gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+                return gray if gray.size else None
+            if isinstance(image_data, str):
+                # Data URL headers are short; don't scan megabytes for a comma
+                comma = image_data.find(',', 0, 256)
+                image_bytes = binascii.a2b_base64(image_data[comma + 1:] if comma >= 0 else image_data)
+            else:
+                image_bytes = image_data
             
-            # Verify image is valid
-            if img_bgr.size == 0:
+            gray = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), self._decode_flag)
+            if gray is None or gray.size == 0:
                 print("❌ Decoded image is empty")
                 return None
-            
-            return img_bgr
+            return gray
         except Exception as e:
             print(f"❌ Error decoding image: {e}")
             return None
     
-    def _detect_face(self, img: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
-        """Detect face in image, returns (x, y, w, h) or None"""
-        if self.face_cascade is None or self.face_cascade.empty():
+    def _detect_in_window(self, gray: np.ndarray, search_box: Tuple[int, int, int, int]) -> Optional[Tuple[int, int, int, int]]:
+        """Look for a face of similar size in a window around search_box"""
+        x, y, w, h = search_box
+        margin_x, margin_y = int(w * self.track_margin), int(h * self.track_margin)
+        x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+        x1, y1 = min(gray.shape[1], x + w + margin_x), min(gray.shape[0], y + h + margin_y)
+        min_side = max(self.min_face_size, int(min(w, h) * 0.7))
+        max_side = int(max(w, h) * 1.4)
+        faces = self.face_detector.detect(gray[y0:y1, x0:x1], min_side, max_side)
+        if not faces:
             return None
+        fx, fy, fw, fh = max(faces, key=lambda f: f[2] * f[3])
+        return fx + x0, fy + y0, fw, fh
+    
+    def _detect_face(
+        self,
+        img: np.ndarray,
+        search_box: Optional[Tuple[int, int, int, int]] = None
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Detect face in image, returns (x, y, w, h) or None.
+        With search_box (the face in a nearby frame) only a window around it
+        is scanned, falling back to the full frame when the face isn't there.
+        """
+        if self.face_detector is None:
+            return None
+        
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if search_box is not None:
+            tracked = self._detect_in_window(gray, search_box)
+            if tracked is not None:
+                return tracked
         
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(30, 30)
+        return self._detect_full_frame(gray)
+    
+    def _detect_full_frame(self, gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Largest face in the whole frame, detected on a downscaled copy"""
+        small, scale, min_side = self._detection_input(gray)
+        faces = self.face_detector.detect(small, min_side, scale_factor=self.detect_scale_factor)
+        return self._largest_face(faces, scale)
+    
+    def _detect_full_frames(self, images: List[np.ndarray]) -> List[Optional[Tuple[int, int, int, int]]]:
+        """_detect_full_frame for many frames through the detector's batch path"""
+        inputs = [self._detection_input(gray) for gray in images]
+        # One min size for the whole batch: frames of an answer share a resolution
+        min_side = min(min_side for _, _, min_side in inputs)
+        batch_faces = self.face_detector.detect_batch(
+            [small for small, _, _ in inputs], min_side, scale_factor=self.detect_scale_factor
         )
+        return [self._largest_face(faces, scale) for faces, (_, scale, _) in zip(batch_faces, inputs)]
+    
+    def _detection_input(self, gray: np.ndarray) -> Tuple[np.ndarray, float, int]:
+        """(frame downscaled to detect_width, scale, minimum face side at that scale)"""
+        scale = 1.0
+        small = gray
+        if self.detect_width and gray.shape[1] > self.detect_width:
+            scale = self.detect_width / gray.shape[1]
+            small_height = max(1, int(round(gray.shape[0] * scale)))
+            small = cv2.resize(gray, (self.detect_width, small_height), interpolation=cv2.INTER_AREA)
         
-        if len(faces) > 0:
-            # Return the largest face
-            largest_face = max(faces, key=lambda f: f[2] * f[3])
-            return tuple(largest_face)
-        return None
+        if self.min_face_ratio > 0:
+            min_side = int(small.shape[1] * self.min_face_ratio)
+        else:
+            min_side = int(self.min_face_size * scale)
+        min_side = max(24, min_side)  # the cascade's own window size
+        return small, scale, min_side
+    
+    @staticmethod
+    def _largest_face(faces: List[Tuple[int, int, int, int]], scale: float) -> Optional[Tuple[int, int, int, int]]:
+        """Largest detected face, in full-resolution coordinates"""
+        if not faces:
+            return None
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        if scale == 1.0:
+            return x, y, w, h
+        return tuple(int(round(v / scale)) for v in (x, y, w, h))
     
     def _analyze_emotion_simple(self, face_roi: np.ndarray) -> Dict[str, float]:
         """
         Improved rule-based emotion detection using facial feature analysis
         Analyzes mouth curvature, eye regions, and facial symmetry
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-        
-        # Resize for processing
-        face_resized = cv2.resize(gray, (96, 96))
-        h, w = face_resized.shape
-        
-        # Initialize emotion scores
-        emotions = {
-            'neutral': 0.25,
-            'happy': 0.15,
-            'sad': 0.15,
-            'angry': 0.15,
-            'fear': 0.1,
-            'surprise': 0.1,
-            'disgust': 0.1
-        }
+        probabilities = self._analyze_emotion_heuristic_batch([face_roi])[0]
+        return dict(zip(self.emotion_labels, probabilities.tolist()))
+    
+    def _analyze_emotion_heuristic_batch(self, face_rois: List[np.ndarray]) -> np.ndarray:
+        """
+        (N, 7) rule-based emotion probabilities for face crops, in
+        emotion_labels order. Crops are resized into one pooled (N, 96, 96)
+        stack, the region statistics come from reshaped sums over the whole
+        stack, and each rule is a boolean mask column whose score deltas are
+        applied with one matrix product.
+        """
+        capacity = 1 << (len(face_rois) - 1).bit_length()
+        stack = self.tensor_pool.acquire((capacity, 96, 96), np.uint8)
+        try:
+            for i, face_roi in enumerate(face_rois):
+                # Convert to grayscale (crops from decode_gray already are)
+                gray = face_roi if face_roi.ndim == 2 else cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+                cv2.resize(gray, (96, 96), dst=stack[i])
+            return self._score_heuristic_stack(stack[:len(face_rois)])
+        finally:
+            self.tensor_pool.release(stack)
+    
+    @staticmethod
+    def _score_heuristic_stack(stack: np.ndarray) -> np.ndarray:
+        """Emotion heuristics over an (N, 96, 96) uint8 stack -> (N, 7) probabilities"""
+        n = len(stack)
+        pixels = stack.astype(np.float32)
         
-        # Analyze face regions
-        # Top third: forehead/eyebrows
-        # Middle third: eyes
-        # Bottom third: nose/mouth
-        top_third = face_resized[:h//3, :]
-        middle_third = face_resized[h//3:2*h//3, :]
-        bottom_third = face_resized[2*h//3:, :]
-        
-        top_mean = np.mean(top_third)
-        middle_mean = np.mean(middle_third)
-        bottom_mean = np.mean(bottom_third)
-        
-        # Calculate intensity variations (indicates expression)
-        std_intensity = np.std(face_resized)
-        mean_intensity = np.mean(face_resized)
-        
-        # Analyze mouth region (bottom center)
-        mouth_region = bottom_third[h//6:, w//4:3*w//4]
-        mouth_mean = np.mean(mouth_region)
-        mouth_std = np.std(mouth_region)
-        
-        # Analyze eye regions (middle third, left and right)
-        left_eye = middle_third[:, :w//2]
-        right_eye = middle_third[:, w//2:]
-        eye_mean = (np.mean(left_eye) + np.mean(right_eye)) / 2
-        
-        # Emotion detection heuristics
-        
-        # 1. Happy: Mouth area brighter (smile), eyes may be slightly closed
-        mouth_brightness_ratio = mouth_mean / mean_intensity
-        if mouth_brightness_ratio > 1.15:  # Bright mouth (smile)
-            emotions['happy'] += 0.5
-            emotions['neutral'] -= 0.2
-            emotions['sad'] -= 0.15
-        elif mouth_brightness_ratio < 0.85:  # Dark mouth (frown)
-            emotions['sad'] += 0.4
-            emotions['angry'] += 0.2
-            emotions['neutral'] -= 0.3
-        
-        # 2. Surprise: High variation, eyes wide open
-        if std_intensity > 30 and middle_mean > mean_intensity * 1.1:
-            emotions['surprise'] += 0.4
-            emotions['fear'] += 0.2
-            emotions['neutral'] -= 0.3
-        
-        # 3. Fear: High variation, eyes wide, mouth area tense
-        if std_intensity > 25 and middle_mean > mean_intensity * 1.05 and mouth_std < 15:
-            emotions['fear'] += 0.3
-            emotions['surprise'] += 0.2
-            emotions['neutral'] -= 0.25
-        
-        # 4. Angry: Darker overall, especially in eye/forehead region
-        if top_mean < mean_intensity * 0.9 and middle_mean < mean_intensity * 0.95:
-            emotions['angry'] += 0.35
-            emotions['sad'] += 0.15
-            emotions['neutral'] -= 0.25
-        
-        # 5. Disgust: Similar to angry but with mouth region variation
-        if top_mean < mean_intensity * 0.92 and mouth_std > 20:
-            emotions['disgust'] += 0.3
-            emotions['angry'] += 0.15
-            emotions['neutral'] -= 0.2
-        
-        # 6. Sad: Overall darker, especially mouth, low variation
-        if mean_intensity < 100 and mouth_mean < mean_intensity * 0.9 and std_intensity < 20:
-            emotions['sad'] += 0.4
-            emotions['neutral'] -= 0.2
-            emotions['happy'] -= 0.15
-        
-        # Ensure all values are non-negative
-        emotions = {k: max(0, v) for k, v in emotions.items()}
-        
-        # Normalize to sum to 1.0
-        total = sum(emotions.values())
-        if total > 0:
-            emotions = {k: v / total for k, v in emotions.items()}
-        else:
-            emotions = {'neutral': 1.0}
+        # Thirds of the face: forehead/eyebrows, eyes, nose/mouth (32 rows each)
+        third_means = pixels.reshape(n, 3, 32 * 96).mean(axis=2, dtype=np.float64)
+        top_mean, middle_mean = third_means[:, 0], third_means[:, 1]
+        mean_intensity = third_means.mean(axis=1)
+        std_intensity = np.sqrt(np.maximum(
+            np.square(pixels).reshape(n, -1).mean(axis=1, dtype=np.float64) - mean_intensity ** 2, 0
+        ))
+        
+        # Mouth region: lower half of the bottom third, middle half of the width
+        mouth = pixels[:, 80:, 24:72].reshape(n, -1)
+        mouth_mean = mouth.mean(axis=1, dtype=np.float64)
+        mouth_std = np.sqrt(np.maximum(np.square(mouth).mean(axis=1, dtype=np.float64) - mouth_mean ** 2, 0))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mouth_brightness_ratio = mouth_mean / mean_intensity
+        
+        # One column per rule in HEURISTIC_RULE_DELTAS
+        rules = np.stack([
+            mouth_brightness_ratio > 1.15,                        # bright mouth (smile)
+            mouth_brightness_ratio < 0.85,                        # dark mouth (frown)
+            (std_intensity > 30) & (middle_mean > mean_intensity * 1.1),  # surprise: eyes wide
+            (std_intensity > 25) & (middle_mean > mean_intensity * 1.05) & (mouth_std < 15),  # fear
+            (top_mean < mean_intensity * 0.9) & (middle_mean < mean_intensity * 0.95),  # angry
+            (top_mean < mean_intensity * 0.92) & (mouth_std > 20),  # disgust
+            (mean_intensity < 100) & (mouth_mean < mean_intensity * 0.9) & (std_intensity < 20),  # sad
+        ], axis=1)
         
-        return emotions
+        scores = HEURISTIC_BASE_SCORES + rules.astype(np.float64) @ HEURISTIC_RULE_DELTAS
+        np.maximum(scores, 0, out=scores)
+        totals = scores.sum(axis=1, keepdims=True)
+        empty = totals[:, 0] <= 0
+        scores[empty] = HEURISTIC_NEUTRAL_ONLY
+        totals[empty] = 1.0
+        return (scores / totals).astype(np.float32)
     
-    def _analyze_emotion_model(self, face_roi: np.ndarray) -> Optional[Dict[str, float]]:
+    def _fill_model_batch(self, face_rois: List[np.ndarray]) -> np.ndarray:
         """
-        Run the FER+ ONNX model on the detected face ROI.
-        Returns normalized emotion probabilities or None if model unavailable.
+        Resize face crops into a pooled (capacity, 1, 64, 64) float32 tensor
+        scaled to roughly -1..1. Capacity is rounded up to a power of two so
+        the pool sees few distinct shapes; release it after inference.
+        """
+        capacity = 1 << (len(face_rois) - 1).bit_length()
+        tensor = self.tensor_pool.acquire((capacity, 1, 64, 64), np.float32)
+        resized = np.empty((64, 64), dtype=np.uint8)
+        for i, face_roi in enumerate(face_rois):
+            gray = face_roi if face_roi.ndim == 2 else cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+            cv2.resize(gray, (64, 64), dst=resized)
+            # (x / 255 - 0.5) / 0.5, written straight into the batch slot
+            np.multiply(resized, 2.0 / 255.0, out=tensor[i, 0], casting='unsafe')
+            tensor[i, 0] -= 1.0
+        return tensor
+    
+    def _run_emotion_model(self, tensor: np.ndarray) -> np.ndarray:
+        """
+        (N, 1, 64, 64) -> (N, 8) FER+ logits in as few session runs as the
+        model's batch dimension allows
+        """
+        # Consistent view of the model even if load_emotion_model swaps it meanwhile
+        with self._model_lock:
+            session = self.emotion_model_session
+            input_name = self.emotion_model_input
+            batch_size = self.emotion_model_batch_size
+        if batch_size is None:
+            try:
+                return session.run(None, {input_name: tensor})[0]
+            except Exception as e:
+                if len(tensor) == 1:
+                    raise
+                print(f"⚠️ Batched FER+ inference failed ({e}); running face crops one at a time")
+                batch_size = 1
+                with self._model_lock:
+                    if self.emotion_model_session is session:
+                        self.emotion_model_batch_size = 1
+        
+        outputs = []
+        for start in range(0, len(tensor), batch_size):
+            chunk = tensor[start:start + batch_size]
+            padding = batch_size - len(chunk)
+            if padding:
+                chunk = np.concatenate([chunk, np.zeros((padding,) + chunk.shape[1:], dtype=chunk.dtype)])
+            outputs.append(session.run(None, {input_name: chunk})[0][:len(chunk) - padding])
+        return np.concatenate(outputs)
+    
+    def _analyze_emotion_batch(self, face_rois: List[np.ndarray]) -> Optional[np.ndarray]:
         """
-        if self.emotion_model_session is None or self.emotion_model_input is None:
+        Run the FER+ ONNX model on all face crops at once.
+        Returns an (N, 7) array of probabilities in emotion_labels order,
+        or None if the model is unavailable.
+        """
+        if self.emotion_model_session is None or self.emotion_model_input is None or not face_rois:
             return None
         
+        tensor = None
         try:
-            gray = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-            resized = cv2.resize(gray, (64, 64))
-            normalized = resized.astype(np.float32) / 255.0
-            normalized = (normalized - 0.5) / 0.5  # scale to roughly -1..1
-            tensor = normalized.reshape(1, 1, 64, 64)
-            
-            outputs = self.emotion_model_session.run(
-                None,
-                {self.emotion_model_input: tensor}
-            )[0][0]
-            
-            probabilities = self._softmax(outputs)
-            mapped = {label: 0.0 for label in self.emotion_labels}
-            
-            for fer_label, prob in zip(FERPLUS_LABELS, probabilities):
-                target = FERPLUS_TO_APP_LABEL.get(fer_label, 'neutral')
-                mapped[target] = mapped.get(target, 0.0) + float(prob)
-            
-            total = sum(mapped.values())
-            if total > 0:
-                mapped = {k: v / total for k, v in mapped.items()}
-            return mapped
+            tensor = self._fill_model_batch(face_rois)
+            batch = tensor[:len(face_rois)]
+            if self.inference_batcher is not None:
+                logits = self.inference_batcher.run(batch)
+            else:
+                logits = self._run_emotion_model(batch)
+            probabilities = self._softmax(logits)
+            mapped = probabilities @ self.ferplus_projection
+            totals = mapped.sum(axis=1, keepdims=True)
+            return mapped / np.where(totals > 0, totals, 1.0)
         except Exception as e:
             print(f"⚠️ FER+ model inference failed: {e}")
             return None
+        finally:
+            if tensor is not None:
+                self.tensor_pool.release(tensor)
+    
+    def _analyze_emotion_model(self, face_roi: np.ndarray) -> Optional[Dict[str, float]]:
+        """
+        Run the FER+ ONNX model on the detected face ROI.
+        Returns normalized emotion probabilities or None if model unavailable.
+        """
+        probabilities = self._analyze_emotion_batch([face_roi])
+        if probabilities is None:
+            return None
+        return {label: float(prob) for label, prob in zip(self.emotion_labels, probabilities[0])}
     
     @staticmethod
     def _softmax(logits: np.ndarray) -> np.ndarray:
-        """Stable softmax computation."""
+        """Stable softmax over the last axis (one row per face for batches)."""
         logits = np.array(logits, dtype=np.float32)
-        logits -= np.max(logits)
-        exps = np.exp(logits)
-        total = np.sum(exps)
-        return exps / total if total > 0 else np.ones_like(exps) / len(exps)
+        exps = np.exp(logits - np.max(logits, axis=-1, keepdims=True))
+        return exps / np.sum(exps, axis=-1, keepdims=True)
     
     def analyze_facial_expressions(self, image_data: str) -> Dict:
         """
@@ -535,7 +1159,7 @@ class FacialExpressionAnalyzer:
             'emotion_scores': {...}
         }
         """
-        img_array = self.decode_image(image_data)
+        img_array = self.decode_gray(image_data)
         if img_array is None:
             print("⚠️ Failed to decode image")
             return self._default_emotion()
@@ -661,53 +1285,394 @@ class FacialExpressionAnalyzer:
             'detection_method': 'default'
         }
     
-    def analyze_video_frames(self, frames_data: List[str]) -> Dict:
+    def _detect_face_safe(self, task: Tuple[int, Optional[np.ndarray], Optional[Tuple[int, int, int, int]]]):
+        """Pool task: (face box or None, error or None) for one numbered frame"""
+        i, gray, search_box = task
+        if gray is None:
+            return None, None
+        try:
+            return self._detect_face(gray, search_box), None
+        except Exception as e:
+            return None, f"Frame {i+1} analysis failed: {e}"
+    
+    def _get_frame_pool(self) -> ThreadPoolExecutor:
+        with self._frame_pool_lock:
+            if self._frame_pool is None:
+                self._frame_pool = ThreadPoolExecutor(
+                    max_workers=self.frame_workers,
+                    thread_name_prefix='frame-worker'
+                )
+            return self._frame_pool
+    
+    def _map_frames(self, fn, items: List) -> List:
+        """fn over items in order, on the shared pool when there's more than one"""
+        if self.frame_workers <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        return list(self._get_frame_pool().map(fn, items))
+    
+    def _detect_keyframes(self, tasks: List[Tuple]) -> List[Tuple[Optional[Tuple], Optional[str]]]:
+        """Full-frame detection for (i, gray, None) tasks: one batch call when the detector batches, else the pool"""
+        if self.face_detector is None or not self.face_detector.supports_batch or len(tasks) <= 1:
+            return self._map_frames(self._detect_face_safe, tasks)
+        results: List[Tuple[Optional[Tuple], Optional[str]]] = [(None, None)] * len(tasks)
+        present = [j for j, (_, gray, _) in enumerate(tasks) if gray is not None]
+        if not present:
+            return results
+        try:
+            boxes = self._detect_full_frames([tasks[j][1] for j in present])
+        except Exception as e:
+            print(f"⚠️ Batched face detection failed ({e}); detecting frames one at a time")
+            return self._map_frames(self._detect_face_safe, tasks)
+        for j, box in zip(present, boxes):
+            results[j] = (box, None)
+        return results
+    
+    def _locate_faces(self, images: List[Optional[np.ndarray]]) -> List[Tuple[Optional[Tuple], Optional[str]]]:
+        """
+        (face box or None, error or None) per frame: full detection on
+        keyframes, then a tracked window search on the frames in between
+        """
+        interval = self.keyframe_interval
+        if interval <= 1 or len(images) <= 2:
+            return self._detect_keyframes([(i, gray, None) for i, gray in enumerate(images)])
+        
+        keyframes = list(range(0, len(images), interval))
+        results: List[Optional[Tuple]] = [None] * len(images)
+        keyframe_tasks = [(i, images[i], None) for i in keyframes]
+        for i, result in zip(keyframes, self._detect_keyframes(keyframe_tasks)):
+            results[i] = result
+        
+        tracked_tasks = []
+        for i, gray in enumerate(images):
+            if results[i] is None:
+                nearest = min(int(round(i / interval)), len(keyframes) - 1) * interval
+                tracked_tasks.append((i, gray, results[nearest][0]))
+        for task, result in zip(tracked_tasks, self._map_frames(self._detect_face_safe, tracked_tasks)):
+            results[task[0]] = result
+        return results
+    
+    def _check_face_box(self, gray: np.ndarray, box) -> Optional[Tuple[int, int, int, int]]:
+        """
+        A client-supplied [x, y, w, h] box (in uploaded-frame pixels) scaled
+        to the decoded frame and clipped to it, or None if it doesn't look
+        like a usable face box
+        """
+        if box is None:
+            return None
+        try:
+            x, y, w, h = (float(v) / self.decode_reduction for v in box)
+        except (TypeError, ValueError):
+            return None
+        if w <= 0 or h <= 0:
+            return None
+        height, width = gray.shape[:2]
+        x0, y0 = max(0, int(x)), max(0, int(y))
+        x1, y1 = min(width, int(x + w)), min(height, int(y + h))
+        clipped_w, clipped_h = x1 - x0, y1 - y0
+        if clipped_w < self.MIN_SUPPLIED_FACE_SIDE or clipped_h < self.MIN_SUPPLIED_FACE_SIDE:
+            return None
+        # Mostly inside the frame and roughly face-shaped
+        if clipped_w * clipped_h < 0.5 * w * h or not 0.5 <= clipped_w / clipped_h <= 2.0:
+            return None
+        return x0, y0, clipped_w, clipped_h
+    
+    def _check_face_crop(self, gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Whole-image box for a pre-cropped face, or None if it's not face-crop sized"""
+        height, width = gray.shape[:2]
+        if min(height, width) < self.MIN_SUPPLIED_FACE_SIDE or max(height, width) > self.MAX_PRECROPPED_FACE_SIDE:
+            return None
+        return 0, 0, width, height
+    
+    def _crop_faces(
+        self,
+        images: List[Optional[np.ndarray]],
+        boxes: Optional[List[Optional[Tuple[int, int, int, int]]]] = None
+    ) -> List[Tuple[Optional[np.ndarray], Optional[str]]]:
+        """
+        (face crop or None, error or None) per decoded frame, in frame order.
+        Frames with a (checked) supplied box skip detection.
+        """
+        boxes = boxes or [None] * len(images)
+        pending = [j for j, box in enumerate(boxes) if box is None]
+        located = dict(zip(pending, self._locate_faces([images[j] for j in pending])))
+        crops = []
+        for j, gray in enumerate(images):
+            face_rect, error = (boxes[j], None) if boxes[j] is not None else located[j]
+            if face_rect is None:
+                crops.append((None, error))
+            else:
+                x, y, w, h = face_rect
+                crops.append((gray[y:y+h, x:x+w], None))
+        return crops
+    
+    @staticmethod
+    def _dhash(gray: np.ndarray) -> int:
+        """64-bit difference hash: brightness gradients of a 9x8 thumbnail"""
+        thumb = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        bits = np.packbits(thumb[:, 1:] > thumb[:, :-1])
+        return int.from_bytes(bits.tobytes(), 'big')
+    
+    def _dedupe_frames(
+        self,
+        images: List[Optional[np.ndarray]],
+        kept: Optional[List[Tuple[int, int]]] = None,
+        offset: int = 0
+    ) -> List[int]:
+        """
+        For each frame, the index of the first earlier frame within
+        dedupe_distance bits of it (itself if none); undecodable frames
+        always stand alone. Frames are numbered from offset, and a kept list
+        of (frame index, hash) from earlier calls carries over and is
+        extended, so streamed chunks dedupe against the whole answer.
+        """
+        owners = list(range(offset, offset + len(images)))
+        if self.dedupe_distance <= 0:
+            return owners
+        kept = [] if kept is None else kept
+        for i, gray in enumerate(images):
+            if gray is None:
+                continue
+            frame_hash = self._dhash(gray)
+            for kept_index, kept_hash in kept:
+                if bin(frame_hash ^ kept_hash).count('1') <= self.dedupe_distance:
+                    owners[i] = kept_index
+                    break
+            else:
+                kept.append((offset + i, frame_hash))
+        return owners
+    
+    def _supplied_face_boxes(
+        self,
+        images: List[Optional[np.ndarray]],
+        indices: List[int],
+        face_boxes: Optional[List],
+        precropped: bool
+    ) -> Dict[int, Tuple[int, int, int, int]]:
+        """Client-side detection results for the frames at indices that pass the sanity checks"""
+        supplied_boxes = {}
+        for i in indices:
+            gray = images[i]
+            if gray is None:
+                continue
+            if precropped:
+                box = self._check_face_crop(gray)
+            elif face_boxes and i < len(face_boxes):
+                box = self._check_face_box(gray, face_boxes[i])
+            else:
+                box = None
+            if box is not None:
+                supplied_boxes[i] = box
+        return supplied_boxes
+    
+    def _emotion_vectors(self, face_rois: List[np.ndarray]) -> Tuple[np.ndarray, str]:
+        """(N, 7) emotion probabilities for face crops: one FER+ batch, else one heuristic batch"""
+        probabilities = self._analyze_emotion_batch(face_rois)
+        if probabilities is not None:
+            return probabilities, 'FER+ (ONNX)'
+        return self._analyze_emotion_heuristic_batch(face_rois), 'OpenCV (heuristic)'
+    
+    @staticmethod
+    def _frame_weights(timestamps: Optional[List[float]], count: int) -> np.ndarray:
         """
-        Analyze multiple video frames and aggregate results
+        Per-frame weights proportional to the time each frame covers (half the
+        gap to each neighbour), or uniform when timestamps are missing
         """
-        if not frames_data:
+        if not timestamps or len(timestamps) != count or count < 2:
+            return np.ones(count)
+        times = np.asarray(timestamps, dtype=np.float64)
+        order = np.argsort(times, kind='stable')
+        half_gaps = np.diff(times[order]) / 2
+        covered = np.zeros(count)
+        covered[:-1] += half_gaps
+        covered[1:] += half_gaps
+        # The first and last frames also cover half a gap on their outer side
+        covered[0] += half_gaps[0]
+        covered[-1] += half_gaps[-1]
+        weights = np.empty(count)
+        weights[order] = covered
+        if not np.isfinite(weights).all() or weights.sum() <= 0:
+            return np.ones(count)
+        return weights
+    
+    @staticmethod
+    def _spread_order(count: int) -> List[int]:
+        """0..count-1 as first, last, then midpoints of ever smaller gaps"""
+        if count <= 2:
+            return list(range(count))
+        order = [0, count - 1]
+        gaps = deque([(0, count - 1)])
+        while gaps:
+            low, high = gaps.popleft()
+            if high - low < 2:
+                continue
+            middle = (low + high) // 2
+            order.append(middle)
+            gaps.append((low, middle))
+            gaps.append((middle, high))
+        return order
+    
+    def _has_converged(self, vectors: List[np.ndarray], weights: List[float]) -> bool:
+        """
+        True once the 95% confidence intervals of the dominant emotion's
+        probability and of negative_sum are within convergence_tolerance
+        """
+        if len(vectors) < self.convergence_min_frames:
+            return False
+        matrix = np.asarray(vectors, dtype=np.float64)
+        w = np.asarray(weights, dtype=np.float64)
+        weight_total = w.sum()
+        if weight_total <= 0:
+            return False
+        dominant = int(np.argmax(w @ matrix))
+        negative = [self.emotion_labels.index(k) for k in ('sad', 'fear', 'angry', 'disgust')]
+        series = np.stack([matrix[:, dominant], matrix[:, negative].sum(axis=1)], axis=1)
+        series_mean = w @ series / weight_total
+        variance = w @ (series - series_mean) ** 2 / weight_total
+        # Effective sample size for weighted frames, with the unbiased correction
+        n_eff = weight_total ** 2 / (w ** 2).sum()
+        if n_eff <= 1:
+            return False
+        variance *= n_eff / (n_eff - 1)
+        half_width = 1.96 * np.sqrt(variance / n_eff)
+        return bool((half_width <= self.convergence_tolerance).all())
+    
+    def analyze_video_frames(
+        self,
+        frames_data: List[Union[str, bytes, np.ndarray]],
+        timestamps: Optional[List[float]] = None,
+        face_boxes: Optional[List] = None,
+        precropped: bool = False
+    ) -> Dict:
+        """
+        Analyze multiple video frames and aggregate results.
+        Frames are base64 strings, raw encoded bytes or decoded arrays
+        (keyframes from extract_keyframes). Face crops are
+        collected first and then scored together, so the FER+ model runs once
+        per answer (once per round with early exit) instead of per frame. With
+        per-frame timestamps (seconds) each frame is weighted by the time it
+        covers. 'frames_used' is how many distinct frames were scored.
+        
+        Clients that detect faces themselves can pass face_boxes (one
+        [x, y, w, h] or None per frame) or send the face crops as the frames
+        with precropped=True; boxes and crops that pass a sanity check skip
+        server-side detection.
+        """
+        if len(frames_data) == 0:
             return self._default_emotion()
         
         print(f"🔍 Analyzing {len(frames_data)} video frames...")
+        frame_weights = self._frame_weights(timestamps, len(frames_data))
         
-        all_emotions = []
-        successful_frames = 0
+        # Stage 1: decode every frame (in parallel) and fold near-duplicates
+        # into the earlier frame they match, carrying their weight over
+        images = self._map_frames(self.decode_gray, frames_data)
+        owners = self._dedupe_frames(images)
+        unique_frames = sorted(set(owners))
+        weights = {i: 0.0 for i in unique_frames}
+        covered = {i: 0 for i in unique_frames}
+        for i, owner in enumerate(owners):
+            weights[owner] += frame_weights[i]
+            covered[owner] += 1
+        deduplicated_frames = len(frames_data) - len(unique_frames)
         
-        for i, frame_data in enumerate(frames_data):
-            print(f"  Frame {i+1}/{len(frames_data)}...")
-            try:
-                result = self.analyze_facial_expressions(frame_data)
-                if result and result.get('emotions'):
-                    all_emotions.append(result['emotions'])
-                    successful_frames += 1
-            except Exception as e:
-                print(f"  ⚠️ Frame {i+1} analysis failed: {e}")
-                continue
+        # Client-side detection results that pass the sanity checks
+        supplied_boxes = self._supplied_face_boxes(images, unique_frames, face_boxes, precropped)
+        
+        # Stage 2: detect, crop and score faces, a round at a time. Without
+        # early exit everything is one round; with it, frames come in a
+        # spread-out order until the aggregate stops moving.
+        adaptive = self.convergence_tolerance > 0
+        if adaptive:
+            order = [unique_frames[j] for j in self._spread_order(len(unique_frames))]
+            round_size = self.convergence_min_frames
+        else:
+            order = unique_frames
+            round_size = len(order)
+        
+        neutral = self._neutral_vector()
+        vectors, row_weights = [], []
+        faces_detected = 0
+        successful_frames = 0
+        frames_used = 0
+        detection_method = 'FER+ (ONNX)' if self.emotion_model_session else 'OpenCV (heuristic)'
+        position = 0
+        while position < len(order):
+            round_frames = sorted(order[position:position + round_size])
+            position += len(round_frames)
+            frames_used += len(round_frames)
+            round_size = self.convergence_step
+            
+            face_rois, face_weights = [], []
+            crops = self._crop_faces(
+                [images[i] for i in round_frames],
+                [supplied_boxes.get(i) for i in round_frames]
+            )
+            for i, (face_roi, error) in zip(round_frames, crops):
+                if error:
+                    print(f"  ⚠️ {error}")
+                    continue
+                successful_frames += covered[i]
+                if face_roi is None:
+                    # Frames without a usable face count as neutral
+                    vectors.append(neutral)
+                    row_weights.append(weights[i])
+                else:
+                    face_rois.append(face_roi)
+                    face_weights.append(weights[i])
+            if face_rois:
+                # All of this round's face crops in one inference pass
+                round_vectors, detection_method = self._emotion_vectors(face_rois)
+                vectors.extend(round_vectors)
+                row_weights.extend(face_weights)
+                faces_detected += len(face_rois)
+            
+            if adaptive and position < len(order) and self._has_converged(vectors, row_weights):
+                print(f"⏱️ Emotions converged after {frames_used}/{len(unique_frames)} distinct frames")
+                break
         
-        print(f"✅ Successfully analyzed {successful_frames}/{len(frames_data)} frames")
+        print(f"✅ Successfully analyzed {successful_frames}/{len(frames_data)} frames "
+              f"({faces_detected} faces scored, {deduplicated_frames} near-duplicate frames reused)")
         
-        if not all_emotions:
+        if not successful_frames:
             print("⚠️ No frames analyzed successfully")
             return self._default_emotion()
         
-        # Aggregate emotions across frames
-        aggregated = {}
-        for emotion in self.emotion_labels:
-            aggregated[emotion] = np.mean([e.get(emotion, 0) for e in all_emotions])
-        
-        # Normalize
-        total = sum(aggregated.values())
+        # Stage 3: weighted aggregate
+        result = self._emotion_summary(
+            vectors,
+            row_weights,
+            detection_method,
+            frames_analyzed=successful_frames,
+            faces_detected=faces_detected,
+            frames_deduplicated=deduplicated_frames,
+            frames_used=frames_used,
+            faces_supplied=len(supplied_boxes)
+        )
+        print(f"📊 Aggregated emotions: {result['emotions']}")
+        dominant_emotion = result['dominant_emotion']
+        print(f"📊 Dominant: {dominant_emotion} ({result['emotions'][dominant_emotion]:.2%})")
+        return result
+    
+    def _neutral_vector(self) -> np.ndarray:
+        """Emotion vector for frames without a usable face"""
+        neutral = np.zeros(len(self.emotion_labels))
+        neutral[self.emotion_labels.index('neutral')] = 1.0
+        return neutral
+    
+    def _emotion_summary(self, vectors, row_weights, detection_method: str, **counts) -> Dict:
+        """Result dict for per-frame emotion vectors and their weights; counts are added as-is"""
+        row_weights = np.asarray(row_weights, dtype=np.float64)
+        totals = row_weights @ np.asarray(vectors, dtype=np.float64)
+        weight_total = row_weights.sum()
+        mean = totals / weight_total if weight_total > 0 else totals
+        total = mean.sum()
         if total > 0:
-            aggregated = {k: float(v / total) for k, v in aggregated.items()}
+            aggregated = {label: float(value / total) for label, value in zip(self.emotion_labels, mean)}
         else:
             aggregated = {'neutral': 1.0}
         
         dominant_emotion = max(aggregated, key=aggregated.get)
         max_confidence = aggregated[dominant_emotion]
-        
-        print(f"📊 Aggregated emotions: {aggregated}")
-        print(f"📊 Dominant: {dominant_emotion} ({max_confidence:.2%})")
-        
         interview_state, metrics = self._map_emotion_to_state(dominant_emotion, aggregated)
         
         return {
@@ -718,11 +1683,133 @@ class FacialExpressionAnalyzer:
             'max_confidence': round(max_confidence, 2),
             'emotion_scores': aggregated,
             'emotion_metrics': metrics,
-            'detection_method': 'FER+ (ONNX)' if self.emotion_model_session else 'OpenCV (heuristic)',
-            'frames_analyzed': successful_frames
+            'detection_method': detection_method,
+            **counts
         }
 
 
+class StreamingEmotion:
+    """
+    Incremental facial-expression analysis for frames posted in chunks
+    while the candidate is still answering.
+    
+    Each chunk is decoded, deduplicated against every earlier frame of the
+    answer, cropped and scored as soon as it arrives; only one emotion
+    vector per frame is kept. snapshot() weights them by the time each
+    frame covers, as analyze_video_frames does, which is O(frames).
+    """
+    
+    def __init__(self, analyzer: FacialExpressionAnalyzer):
+        self.analyzer = analyzer
+        self.lock = threading.Lock()
+        self.updated_at = time.time()
+        self._frames_received = 0
+        self._kept_hashes: List[Tuple[int, int]] = []
+        self._unique_vectors: Dict[int, Optional[np.ndarray]] = {}  # frame index -> vector (None = failed)
+        self._vectors: List[np.ndarray] = []  # one per analyzed frame, duplicates included
+        self._timestamps: List[Optional[float]] = []
+        self._last_timestamp: Optional[float] = None  # None once any chunk came without timestamps
+        self._faces_detected = 0
+        self._faces_supplied = 0
+        self._detection_method = 'FER+ (ONNX)' if analyzer.emotion_model_session else 'OpenCV (heuristic)'
+    
+    @property
+    def frame_count(self) -> int:
+        with self.lock:
+            return self._frames_received
+    
+    def unseen_frames(self, count: int, timestamps: Optional[List[float]] = None) -> List[int]:
+        """
+        Indices of the frames in a final upload of count frames that this
+        stream hasn't analyzed yet. When both the streamed chunks and the
+        upload carry timestamps, frames at or before the last streamed one
+        are skipped. Otherwise the upload is taken to be the whole answer
+        from its first frame, and the first frame_count frames are skipped.
+        """
+        with self.lock:
+            if not self._frames_received:
+                return list(range(count))
+            if timestamps and self._last_timestamp is not None:
+                return [i for i, t in enumerate(timestamps) if t > self._last_timestamp]
+            return list(range(self._frames_received, count))
+    
+    def feed(
+        self,
+        frames: List[Union[str, bytes, np.ndarray]],
+        timestamps: Optional[List[float]] = None,
+        face_boxes: Optional[List] = None,
+        precropped: bool = False
+    ):
+        """Analyze a chunk of frames and fold them into the running aggregate"""
+        if len(frames) == 0:
+            return
+        analyzer = self.analyzer
+        # Chunks of one answer are processed in arrival order
+        with self.lock:
+            self.updated_at = time.time()
+            offset = self._frames_received
+            self._frames_received += len(frames)
+            if timestamps and offset == 0:
+                self._last_timestamp = max(timestamps)
+            elif timestamps and self._last_timestamp is not None:
+                self._last_timestamp = max(self._last_timestamp, max(timestamps))
+            else:
+                self._last_timestamp = None
+            
+            images = analyzer._map_frames(analyzer.decode_gray, frames)
+            owners = analyzer._dedupe_frames(images, self._kept_hashes, offset)
+            new_frames = [i for i, owner in enumerate(owners) if owner == offset + i]
+            supplied_boxes = analyzer._supplied_face_boxes(images, new_frames, face_boxes, precropped)
+            self._faces_supplied += len(supplied_boxes)
+            
+            crops = analyzer._crop_faces(
+                [images[i] for i in new_frames],
+                [supplied_boxes.get(i) for i in new_frames]
+            )
+            face_frames, face_rois = [], []
+            for i, (face_roi, error) in zip(new_frames, crops):
+                if error:
+                    print(f"  ⚠️ {error}")
+                    self._unique_vectors[offset + i] = None
+                elif face_roi is None:
+                    # Frames without a usable face count as neutral
+                    self._unique_vectors[offset + i] = analyzer._neutral_vector()
+                else:
+                    face_frames.append(i)
+                    face_rois.append(face_roi)
+            if face_rois:
+                chunk_vectors, self._detection_method = analyzer._emotion_vectors(face_rois)
+                for i, vector in zip(face_frames, chunk_vectors):
+                    self._unique_vectors[offset + i] = vector
+                self._faces_detected += len(face_rois)
+            
+            for i, owner in enumerate(owners):
+                vector = self._unique_vectors.get(owner)
+                if vector is not None:
+                    self._vectors.append(vector)
+                    self._timestamps.append(timestamps[i] if timestamps else None)
+    
+    def snapshot(self) -> Dict:
+        """Aggregate emotions over every frame received so far"""
+        with self.lock:
+            if not self._vectors:
+                return self.analyzer._default_emotion()
+            timestamps = self._timestamps
+            if any(t is None for t in timestamps):
+                timestamps = None
+            count = len(self._vectors)
+            return self.analyzer._emotion_summary(
+                self._vectors,
+                self.analyzer._frame_weights(timestamps, count),
+                self._detection_method,
+                frames_analyzed=count,
+                faces_detected=self._faces_detected,
+                frames_deduplicated=self._frames_received - len(self._unique_vectors),
+                frames_used=len(self._unique_vectors),
+                faces_supplied=self._faces_supplied
+            )
+
+
 def calculate_combined_score(
     content_score: float,
     sentiment_data: Dict,
@@ -0,0 +1,294 @@
+"""
+Video Clip Keyframes
+Decodes a whole-answer video clip from memory and picks the frames worth
+analyzing, so clients can upload the recording they already have instead of
+sampling stills on a timer:
+
+- MJPEG (multipart/x-mixed-replace or bare concatenated JPEGs): split on the
+  JPEG start/end markers without copying; selected frames stay encoded and
+  go to the analyzer as bytes
+- WebM/MP4/other containers: decoded with PyAV from an in-memory buffer when
+  it is installed, otherwise through a temporary file and cv2.VideoCapture
+
+Every decoded frame is scored on a small grayscale thumbnail. A frame is kept
+when the motion accumulated since the last kept frame (expression changes and
+head movement show up as changed pixels) or its histogram distance from that
+frame (a scene or lighting change) crosses a threshold, or when too much time
+has passed without one.
+"""
+
+import importlib.util
+import os
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+PYAV_AVAILABLE = importlib.util.find_spec('av') is not None
+
+MJPEG_CONTENT_TYPES = {'video/x-motion-jpeg', 'video/mjpeg', 'multipart/x-mixed-replace'}
+
+_JPEG_SOI = b'\xff\xd8'
+_JPEG_EOI = b'\xff\xd9'
+
+# Frames are scored on thumbnails this wide
+_THUMB_WIDTH = 64
+# Thumbnail pixels changing by more than this many gray levels count as motion
+# (sensor noise on an INTER_AREA thumbnail stays well below it)
+_MOTION_PIXEL_DELTA = 16
+
+
+class VideoClipError(ValueError):
+    """Clip that can't be decoded (reported to the client as HTTP 400)"""
+
+
+class ClipTooLargeError(VideoClipError):
+    """Clip over the upload size cap (reported to the client as HTTP 413)"""
+
+
+def split_mjpeg(data: Union[bytes, memoryview]) -> List[memoryview]:
+    """
+    JPEG frames of an MJPEG body as memoryviews into data. Boundary lines
+    and part headers between frames are skipped. The first EOI after an SOI
+    ends a frame: baseline webcam JPEGs don't embed thumbnails.
+    """
+    view = memoryview(data)
+    raw = view.obj if isinstance(view.obj, bytes) and len(view) == len(view.obj) else bytes(view)
+    frames = []
+    start = raw.find(_JPEG_SOI)
+    while start != -1:
+        end = raw.find(_JPEG_EOI, start + 2)
+        if end == -1:
+            break
+        frames.append(view[start:end + 2])
+        start = raw.find(_JPEG_SOI, end + 2)
+    return frames
+
+
+def _iter_mjpeg(data, fps: float, max_frames: int) -> Iterator[Tuple[float, np.ndarray, memoryview]]:
+    """(timestamp, thumbnail-scale gray frame, encoded JPEG) per MJPEG frame"""
+    for index, jpeg in enumerate(split_mjpeg(data)[:max_frames]):
+        # 1/8-scale decode is all scoring needs and skips most of the IDCT work
+        small = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if small is not None and small.size:
+            yield index / fps, small, jpeg
+
+
+def _iter_pyav(data, max_frames: int) -> Iterator[Tuple[float, np.ndarray, np.ndarray]]:
+    """(timestamp, gray frame, gray frame) per decoded frame, read from memory with PyAV"""
+    import av
+    from io import BytesIO
+
+    try:
+        container = av.open(BytesIO(data))
+    except Exception as e:
+        raise VideoClipError(f"Could not open video clip: {e}") from e
+    with container:
+        if not container.streams.video:
+            raise VideoClipError("Clip has no video stream")
+        stream = container.streams.video[0]
+        stream.thread_type = 'AUTO'
+        for index, frame in enumerate(container.decode(stream)):
+            if index >= max_frames:
+                break
+            gray = frame.to_ndarray(format='gray')
+            timestamp = float(frame.time) if frame.time is not None else index / float(stream.average_rate or 25)
+            yield timestamp, gray, gray
+
+
+def _iter_video_capture(data, suffix: str, max_frames: int) -> Iterator[Tuple[float, np.ndarray, np.ndarray]]:
+    """(timestamp, gray frame, gray frame) per decoded frame via a temp file (VideoCapture needs a path)"""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        capture = cv2.VideoCapture(path)
+        if not capture.isOpened():
+            raise VideoClipError("Could not open video clip (is PyAV or an FFmpeg-enabled OpenCV installed?)")
+        try:
+            for _ in range(max_frames):
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                yield capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, gray, gray
+        finally:
+            capture.release()
+    finally:
+        os.unlink(path)
+
+
+def _thumbnail(gray: np.ndarray) -> np.ndarray:
+    height, width = gray.shape[:2]
+    if width > _THUMB_WIDTH:
+        gray = cv2.resize(gray, (_THUMB_WIDTH, max(1, height * _THUMB_WIDTH // width)), interpolation=cv2.INTER_AREA)
+    return gray
+
+
+class KeyframeSelector:
+    """
+    Online keyframe picker. offer() each frame in order; a frame is kept
+    when at least min_gap seconds have passed since the last kept frame and
+    either the motion accumulated since then (sum over frames of the
+    fraction of thumbnail pixels that changed) reaches motion_threshold, its
+    histogram distance (Bhattacharyya, 0-1) from the last kept frame reaches
+    scene_threshold, or max_gap seconds have passed.
+    The first frame is always kept.
+    """
+
+    def __init__(
+        self,
+        motion_threshold: float = 0.3,
+        scene_threshold: float = 0.3,
+        min_gap: float = 0.5,
+        max_gap: float = 4.0
+    ):
+        self.motion_threshold = motion_threshold
+        self.scene_threshold = scene_threshold
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        self._previous = None
+        self._kept_hist = None
+        self._kept_at = None
+        self._motion = 0.0
+
+    @staticmethod
+    def _histogram(thumb: np.ndarray) -> np.ndarray:
+        hist = cv2.calcHist([thumb], [0], None, [32], [0, 256])
+        return cv2.normalize(hist, hist).flatten()
+
+    def offer(self, timestamp: float, gray: np.ndarray) -> Optional[str]:
+        """Why the frame was kept ('first', 'motion', 'scene', 'interval') or None"""
+        thumb = _thumbnail(gray)
+        if self._previous is not None and self._previous.shape == thumb.shape:
+            self._motion += float(np.count_nonzero(cv2.absdiff(thumb, self._previous) > _MOTION_PIXEL_DELTA)) / thumb.size
+        self._previous = thumb
+
+        if self._kept_at is None:
+            reason, hist = 'first', self._histogram(thumb)
+        elif timestamp - self._kept_at < self.min_gap:
+            return None
+        else:
+            hist = self._histogram(thumb)
+            if self._motion >= self.motion_threshold:
+                reason = 'motion'
+            elif cv2.compareHist(self._kept_hist, hist, cv2.HISTCMP_BHATTACHARYYA) >= self.scene_threshold:
+                reason = 'scene'
+            elif timestamp - self._kept_at >= self.max_gap:
+                reason = 'interval'
+            else:
+                return None
+
+        self._kept_hist = hist
+        self._kept_at = timestamp
+        self._motion = 0.0
+        return reason
+
+
+def _thin(selected: List, max_keyframes: int) -> List:
+    """Evenly spaced subset of at most max_keyframes, keeping the first and last"""
+    if len(selected) <= max_keyframes:
+        return selected
+    if max_keyframes == 1:
+        return selected[:1]
+    step = (len(selected) - 1) / (max_keyframes - 1)
+    return [selected[round(i * step)] for i in range(max_keyframes)]
+
+
+class _StridedBuffer:
+    """
+    Every stride-th of the frames added, with the stride doubling whenever
+    more than capacity are held. What's left is always evenly spaced over
+    everything added so far, so memory stays bounded without favouring
+    either end of the clip.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(2, capacity)
+        self.stride = 1
+        self.items = []
+        self._added = 0
+
+    def add(self, item) -> None:
+        if self._added % self.stride == 0:
+            self.items.append(item)
+            if len(self.items) > self.capacity:
+                self.stride *= 2
+                self.items = self.items[::2]
+        self._added += 1
+
+
+def extract_keyframes(
+    data: Union[bytes, memoryview],
+    content_type: str = '',
+    filename: str = '',
+    max_keyframes: int = 24,
+    max_decoded_frames: int = 1800,
+    mjpeg_fps: float = 10.0,
+    max_seconds: Optional[float] = None,
+    **selector_options
+) -> Tuple[List[Union[memoryview, np.ndarray]], List[float], Dict]:
+    """
+    (frames, timestamps, stats) for a video clip. MJPEG frames come back
+    still encoded; other formats come back as decoded grayscale arrays.
+    Both go straight into FacialExpressionAnalyzer.analyze_video_frames.
+    Decoding stops after max_decoded_frames frames or max_seconds of video.
+    Candidate keyframes are held in a strided buffer of twice the cap and
+    thinned to max_keyframes once at the end; selection_reasons counts the
+    frames actually returned.
+    """
+    if not data:
+        raise VideoClipError("Empty video clip")
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    is_mjpeg = content_type in MJPEG_CONTENT_TYPES or bytes(memoryview(data)[:2]) == _JPEG_SOI
+    if is_mjpeg:
+        decoded = _iter_mjpeg(data, mjpeg_fps, max_decoded_frames)
+        decoder = 'mjpeg'
+    elif PYAV_AVAILABLE:
+        decoded = _iter_pyav(bytes(data), max_decoded_frames)
+        decoder = 'pyav'
+    else:
+        suffix = os.path.splitext(filename)[1] or '.webm'
+        decoded = _iter_video_capture(bytes(data), suffix, max_decoded_frames)
+        decoder = 'opencv'
+
+    selector = KeyframeSelector(**selector_options)
+    # Decoded frames are big; don't hold more than twice the cap
+    candidates = _StridedBuffer(2 * max_keyframes)
+    frames_decoded = 0
+    duration = 0.0
+    truncated = False
+    try:
+        for timestamp, gray, frame in decoded:
+            if max_seconds and timestamp > max_seconds:
+                truncated = True
+                break
+            frames_decoded += 1
+            duration = timestamp
+            reason = selector.offer(timestamp, gray)
+            if reason is not None:
+                candidates.add((timestamp, frame, reason))
+    except VideoClipError:
+        raise
+    except Exception as e:
+        # Browser recordings are often cut off mid-cluster; keep what decoded
+        if not candidates.items:
+            raise VideoClipError(f"Could not decode video clip: {e}") from e
+        print(f"⚠️ Video clip decoding stopped after {frames_decoded} frames: {e}")
+    if not candidates.items:
+        raise VideoClipError("No frames could be decoded from the clip")
+
+    selected = _thin(candidates.items, max_keyframes)
+    reasons: Dict[str, int] = {}
+    for _, _, reason in selected:
+        reasons[reason] = reasons.get(reason, 0) + 1
+    stats = {
+        'decoder': decoder,
+        'frames_decoded': frames_decoded,
+        'keyframes_selected': len(selected),
+        'selection_reasons': reasons,
+        'clip_seconds': round(duration, 2),
+        'truncated': truncated or frames_decoded >= max_decoded_frames,
+    }
+    return [frame for _, frame, _ in selected], [timestamp for timestamp, _, _ in selected], stats